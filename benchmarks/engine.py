@@ -0,0 +1,302 @@
+"""
+Measures the throughput and the peak memory of the text transformation and of the GUI hot paths.
+
+Usage:
+    python benchmarks/engine.py [--lines 1000 10000 ...] [--cases NAME ...] [--repeat N]
+                                [--save-baseline] [--baseline PATH] [--threshold 0.2]
+
+Every case transforms synthetic lists of the given counts of lines with TextTransformer.transform(). The cases
+cover the features of TransformSettings one by one. ui.get_count_text_lines() and VicoPreferences.load/save
+are measured as well; the former is skipped if PySimpleGUI is not installed.
+
+The throughput is the best of --repeat runs, each of them taking at least 0.2 seconds. The peak memory is
+measured by tracemalloc in a separate run, as tracing slows down the transformation. With --save-baseline
+the results are written to the baseline file.
+Otherwise they are compared with the baseline file if it exists: the exit status is 1 if the throughput of a
+case dropped or its peak memory grew by more than the threshold. The baseline depends on the machine,
+so it should be saved on the machine the benchmark is run on.
+"""
+import os
+import sys
+import json
+import timeit
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from teksto import TransformSettings, TransformSettingsPreset, TextTransformer, \
+    SORT_MODE_LEXICAL, SORT_MODE_NUMERIC, ESCAPE_DIALECT_SQL, ESCAPE_DIALECT_JSON, TRIM_MODE_NONE, TRIM_MODE_LEFT, \
+    TRIM_MODE_RIGHT, COLUMN_DELIMITER_TAB, COLUMN_DELIMITER_COMMA, ColumnSettings  # noqa: E402
+from preferences import VicoPreferences  # noqa: E402
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'engine_baseline.json')
+# Relative drop of the throughput or growth of the peak memory reported as a regression
+DEFAULT_THRESHOLD = 0.2
+# Count of presets saved and loaded by the preferences case
+PREFERENCES_PRESET_COUNT = 200
+
+# The transform settings of every transformation case
+TRANSFORM_CASES = {
+    'plain': TransformSettings(prefix='', suffix='', delimiter=''),
+    'delimited': TransformSettings(prefix="'", suffix="'", delimiter=','),
+    'line_up': TransformSettings(prefix="'", suffix="'", delimiter=',', line_up=True),
+    'quoting': TransformSettings(prefix="'", suffix="'", delimiter=',', quote_text=True, quote_char="'",
+                                 escape_char="'"),
+    'surrounding_text': TransformSettings(prefix="'", suffix="'", delimiter=',', surrounding_text="IN ({0})"),
+    'surrounding_text_format': TransformSettings(prefix="'", suffix="'", delimiter=',',
+                                                 surrounding_text="IN ({0}) -- {0}"),
+    'long_prefix': TransformSettings(prefix='SELECT * FROM customers WHERE customer_name = ' * 4, suffix=';',
+                                     delimiter=''),
+    'chunk_size': TransformSettings(prefix="'", suffix="'", delimiter=',', surrounding_text="OR id IN ({0})",
+                                    chunk_size=1000),
+    'remove_duplicates': TransformSettings(prefix="'", suffix="'", delimiter=',', remove_duplicates=True),
+    'sort_lexical': TransformSettings(prefix="'", suffix="'", delimiter=',', sort_mode=SORT_MODE_LEXICAL),
+    'sort_numeric': TransformSettings(prefix='', suffix='', delimiter=',', sort_mode=SORT_MODE_NUMERIC),
+    'escape_sql': TransformSettings(prefix="'", suffix="'", delimiter=',', escape_dialect=ESCAPE_DIALECT_SQL),
+    'escape_json': TransformSettings(prefix='"', suffix='"', delimiter=',', escape_dialect=ESCAPE_DIALECT_JSON),
+    'trim_none': TransformSettings(prefix="'", suffix="'", delimiter=',', trim_mode=TRIM_MODE_NONE),
+    'trim_left': TransformSettings(prefix="'", suffix="'", delimiter=',', trim_mode=TRIM_MODE_LEFT),
+    'trim_right': TransformSettings(prefix="'", suffix="'", delimiter=',', trim_mode=TRIM_MODE_RIGHT),
+    'collapse_whitespace': TransformSettings(prefix="'", suffix="'", delimiter=',', collapse_whitespace=True),
+    'collapse_trim_none': TransformSettings(prefix="'", suffix="'", delimiter=',', trim_mode=TRIM_MODE_NONE,
+                                            collapse_whitespace=True),
+    'keep_blank_lines': TransformSettings(prefix="'", suffix="'", delimiter=',', drop_blank_lines=False),
+    'columns_tab': TransformSettings(prefix='(', suffix=')', delimiter=',', column_delimiter=COLUMN_DELIMITER_TAB,
+                                     columns=[ColumnSettings(0, "'", "'", ESCAPE_DIALECT_SQL), ColumnSettings(2)]),
+    'columns_csv': TransformSettings(prefix='(', suffix=')', delimiter=',', column_delimiter=COLUMN_DELIMITER_COMMA,
+                                     columns=[ColumnSettings(0, "'", "'", ESCAPE_DIALECT_SQL), ColumnSettings(2)]),
+    'columns_all': TransformSettings(prefix='', suffix='', delimiter='', column_delimiter=COLUMN_DELIMITER_TAB),
+    'columns_template': TransformSettings(prefix='', suffix='', delimiter=',', column_delimiter=COLUMN_DELIMITER_TAB,
+                                          columns=[ColumnSettings(0, "'", "'", ESCAPE_DIALECT_SQL)],
+                                          item_template='({index}, {item}, {column[2]})'),
+    'item_template': TransformSettings(prefix="'", suffix="'", delimiter=',', item_template='({index}, {item})'),
+    'item_template_affixes': TransformSettings(prefix='', suffix='', delimiter=',', item_template="('{item}')"),
+    'output_template': TransformSettings(prefix="'", suffix="'", delimiter=',', surrounding_text="OR id IN ({0})",
+                                         chunk_size=1000, output_template="WHERE 1 = 0\n{0};"),
+    'ranges': TransformSettings(prefix='', suffix='', delimiter=',', line_up=True, surrounding_text="id IN ({0})",
+                                sort_mode=SORT_MODE_NUMERIC, range_text="OR id BETWEEN {0} AND {1}"),
+}
+
+
+def create_names_text(count_lines):
+    """
+    Returns a text containing the given count of padded names, some of them containing a quote char
+    and some of them repeated, one per line.
+    """
+    rng = random.Random(42)
+    first_names = ['Steve', 'Tim', 'Carver', "Tim O'Reilly", 'Ada', 'Grace', 'Linus', 'Guido']
+    lines = (" {0} {1} ".format(rng.choice(first_names), rng.randrange(count_lines)) for _ in range(count_lines))
+    return '\n'.join(lines) + '\n'
+
+
+def create_ids_text(count_lines):
+    """
+    Returns a text containing the given count of numeric IDs, one per line. Half of the IDs are part
+    of runs of consecutive IDs.
+    """
+    rng = random.Random(42)
+    ids = []
+    while len(ids) < count_lines:
+        start = rng.randrange(10 ** 9)
+        ids.extend(range(start, start + rng.choice((1, 1, 10))))
+    return '\n'.join(map(str, ids[:count_lines])) + '\n'
+
+
+def create_padded_text(count_lines):
+    """
+    Returns a text containing the given count of lines of names padded and separated by runs of spaces
+    and tabs. Every tenth line is blank.
+    """
+    rng = random.Random(42)
+    paddings = ['', ' ', '  ', '\t', ' \t ']
+    lines = ("{0}Name{1}{2}{3}".format(rng.choice(paddings), rng.choice(paddings) or ' ', rng.randrange(count_lines),
+                                       rng.choice(paddings)) if index % 10 else rng.choice(paddings)
+             for index in range(count_lines))
+    return '\n'.join(lines) + '\n'
+
+
+def create_rows_text(count_lines, column_delimiter):
+    """
+    Returns a text containing the given count of rows of a name, a city and an amount, like a paste from
+    a spreadsheet. Fields containing the column delimiter are quoted.
+    """
+    rng = random.Random(42)
+    names = ['Steve', 'Tim', "Tim O'Reilly", 'Ada', 'Grace, Lady', 'Linus']
+    cities = ['Berlin', 'New York', 'Paris', 'Zurich']
+    lines = (column_delimiter.join('"{0}"'.format(field) if column_delimiter in field else field
+                                   for field in (rng.choice(names), rng.choice(cities), str(rng.randrange(10 ** 6))))
+             for _ in range(count_lines))
+    return '\n'.join(lines) + '\n'
+
+
+def create_text(case, count_lines):
+    """
+    Returns the synthetic input text of a case.
+    """
+    if case in ('sort_numeric', 'ranges'):
+        return create_ids_text(count_lines)
+    if case.startswith('columns_'):
+        return create_rows_text(count_lines, TRANSFORM_CASES[case].column_delimiter)
+    if case.startswith(('trim_', 'collapse_', 'keep_blank_lines')):
+        return create_padded_text(count_lines)
+    return create_names_text(count_lines)
+
+
+def measure(func, repeat):
+    """
+    Returns the best wall time in seconds of calling func and the peak count of bytes allocated by a call.
+    Fast calls are looped until a measurement takes at least 0.2 seconds, so small inputs are not dominated
+    by the resolution of the timer.
+    """
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    timings = [seconds / loops for seconds in timer.repeat(repeat, loops)]
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak_bytes
+
+
+def run_transform_case(case, count_lines, repeat):
+    """
+    Measures a transformation case. The throughput is given in lines per second.
+    """
+    text = create_text(case, count_lines)
+    text_transformer = TextTransformer(TRANSFORM_CASES[case])
+    seconds, peak_bytes = measure(lambda: text_transformer.transform(text), repeat)
+    return count_lines / seconds, peak_bytes
+
+
+def run_count_lines_case(count_lines, repeat):
+    """
+    Measures ui.get_count_text_lines(), which is called on every keystroke in the text input.
+    Returns None if the GUI modules can not be imported.
+    """
+    try:
+        import ui
+    except ImportError:
+        return None
+    text = create_names_text(count_lines)
+    seconds, peak_bytes = measure(lambda: ui.get_count_text_lines(text), repeat)
+    return count_lines / seconds, peak_bytes
+
+
+def run_preferences_case(repeat):
+    """
+    Measures saving and loading preferences with PREFERENCES_PRESET_COUNT presets.
+    The throughput is given in presets per second.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prefs = VicoPreferences(autoload=False)
+        prefs.prefs_filepath = os.path.join(tmp_dir, 'vico_settings.json')
+        transform_settings_list = list(TRANSFORM_CASES.values())
+        prefs.presets = [TransformSettingsPreset("Preset {0}".format(index),
+                                                 transform_settings_list[index % len(transform_settings_list)])
+                         for index in range(PREFERENCES_PRESET_COUNT)]
+        prefs.selected_preset_index = 0
+
+        def save_and_load():
+            prefs.save()
+            prefs.load()
+
+        seconds, peak_bytes = measure(save_and_load, repeat)
+    return PREFERENCES_PRESET_COUNT / seconds, peak_bytes
+
+
+def run_benchmarks(cases, lines, repeat):
+    """
+    Runs the selected cases and prints their results.
+
+    Returns:
+        A dictionary mapping the name of every measurement to its throughput and peak memory.
+    """
+    results = {}
+    print("{0:<28} {1:>10} {2:>16} {3:>12}".format('case', 'lines', 'throughput', 'peak memory'))
+    for case in cases:
+        for count_lines in ([None] if case == 'preferences' else lines):
+            if case == 'preferences':
+                result = run_preferences_case(repeat)
+            elif case == 'count_text_lines':
+                result = run_count_lines_case(count_lines, repeat)
+            else:
+                result = run_transform_case(case, count_lines, repeat)
+
+            name = case if count_lines is None else "{0}/{1}".format(case, count_lines)
+            if result is None:
+                print("{0:<28} {1:>10} skipped (PySimpleGUI is not installed)".format(case, count_lines))
+                continue
+            throughput, peak_bytes = result
+            results[name] = {'throughput': throughput, 'peak_bytes': peak_bytes}
+            unit = 'presets/s' if case == 'preferences' else 'lines/s'
+            print("{0:<28} {1:>10} {2:>6.2f} M{3:<9} {4:>9.1f} MB".format(
+                case, count_lines or '', throughput / 1000000, unit, peak_bytes / 1024 / 1024))
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compares the results with the baseline.
+
+    Returns:
+        A list of messages describing every regression beyond the threshold.
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline_result = baseline.get(name)
+        if baseline_result is None:
+            continue
+        if result['throughput'] < baseline_result['throughput'] * (1 - threshold):
+            regressions.append("{0}: throughput dropped by {1:.0%}".format(
+                name, 1 - result['throughput'] / baseline_result['throughput']))
+        if result['peak_bytes'] > baseline_result['peak_bytes'] * (1 + threshold):
+            regressions.append("{0}: peak memory grew by {1:.0%}".format(
+                name, result['peak_bytes'] / baseline_result['peak_bytes'] - 1))
+    return regressions
+
+
+def main():
+    all_cases = list(TRANSFORM_CASES) + ['count_text_lines', 'preferences']
+    parser = argparse.ArgumentParser(description='Measures the throughput and peak memory of vico.')
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10000, 100000, 1000000, 10000000],
+                        help='counts of lines (default: 1000 10000 100000 1000000 10000000)')
+    parser.add_argument('--cases', nargs='+', choices=all_cases, default=all_cases,
+                        help='cases to be measured (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='count of runs per measurement (default: 3)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH,
+                        help='baseline file (default: benchmarks/engine_baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change reported as a regression (default: 0.2)')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.cases, args.lines, args.repeat)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=4, sort_keys=True)
+        print("baseline saved to {0}".format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline found at {0}, use --save-baseline to create it".format(args.baseline))
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = find_regressions(results, baseline, args.threshold)
+    for regression in regressions:
+        print("regression: {0}".format(regression))
+    if not regressions:
+        print("no regression beyond {0:.0%} compared with the baseline".format(args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Measures how the parallel transformation of TextTransformer scales with the count of worker processes.
+
+Usage:
+    python benchmarks/parallel.py [--lines N] [--workers 1 2 4 8 16]
+
+A synthetic list of IDs is transformed with transform(text, workers=N) and
+transform_file(path, out_path, workers=N) for every count of workers. The speedup is reported
+relative to the serial transformation. Counts of workers larger than the count of CPU cores are skipped.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from teksto import TransformSettings, TextTransformer  # noqa: E402
+
+
+def create_text(count_lines):
+    """
+    Returns a text containing the given count of padded numeric IDs, one per line.
+    """
+    rng = random.Random(42)
+    return '\n'.join(" {0} ".format(rng.randrange(10 ** 12)) for _ in range(count_lines)) + '\n'
+
+
+def measure(func, *args, **kwargs):
+    """
+    Returns the wall time in seconds of calling func with the given arguments.
+    """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the scaling of the parallel transformation.')
+    parser.add_argument('--lines', type=int, default=10000000, help='count of lines (default: 10000000)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help='counts of worker processes (default: 1 2 4 8 16)')
+    args = parser.parse_args()
+
+    transform_settings = TransformSettings(prefix="'", suffix="'", delimiter=",", quote_text=True,
+                                           quote_char="'", escape_char="'", surrounding_text="IN ({0})")
+    text_transformer = TextTransformer(transform_settings)
+    text = create_text(args.lines)
+    cpu_count = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'input.txt')
+        out_path = os.path.join(tmp_dir, 'output.txt')
+        with open(path, 'w', encoding='utf-8') as input_file:
+            input_file.write(text)
+
+        print("{0} lines, {1:.1f} MB, {2} CPU core(s)".format(args.lines, len(text) / 1024 / 1024, cpu_count))
+        print("{0:>8} {1:>12} {2:>8} {3:>16} {4:>8}".format('workers', 'transform', 'speedup',
+                                                             'transform_file', 'speedup'))
+        serial_text = serial_file = None
+        for workers in args.workers:
+            if workers > cpu_count:
+                print("{0:>8} skipped (only {1} CPU core(s) available)".format(workers, cpu_count))
+                continue
+            text_time = measure(text_transformer.transform, text, workers=workers)
+            file_time = measure(text_transformer.transform_file, path, out_path, workers=workers)
+            serial_text = serial_text or text_time
+            serial_file = serial_file or file_time
+            print("{0:>8} {1:>10.2f} s {2:>7.1f}x {3:>14.2f} s {4:>7.1f}x".format(
+                workers, text_time, serial_text / text_time, file_time, serial_file / file_time))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
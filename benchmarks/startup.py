@@ -0,0 +1,117 @@
+"""
+Measures the startup time of vico.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--gui]
+
+The cold start of the headless mode ("vico.py transform") is measured by running it in a new
+interpreter for every run. The startup time of the interpreter itself is measured the same way
+and reported as well, so the overhead caused by vico can be told apart.
+
+With --gui the time-to-first-frame of the GUI is measured as well, i.e. the time from the start of the
+interpreter until the main window is drawn, and the time until the clipboard content and the presets
+loaded in the background are displayed. This needs a display and a clipboard.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+VICO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VICO_SCRIPT = os.path.join(VICO_DIR, 'vico.py')
+
+# The headless cold start should not add more than this to the startup of the interpreter
+HEADLESS_OVERHEAD_LIMIT_MS = 50
+
+# Script run in a new interpreter to measure the time-to-first-frame of the GUI. It prints the milliseconds
+# from its start until the main window is drawn and until the data loaded in the background is displayed.
+FIRST_FRAME_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+sys.path.insert(0, {vico_dir!r})
+import ui
+from preferences import VicoPreferences
+
+prefs = VicoPreferences(autoload=False)
+input_buffer = ui.create_input_buffer()
+window = ui.prepare_main_window('vico', prefs, input_buffer)
+first_frame = time.perf_counter()
+
+pending_events = {{ui.EVENT_CLIPBOARD_LOADED, ui.EVENT_PREFERENCES_LOADED}}
+while pending_events:
+    event, values = window.read()
+    if event == ui.EVENT_PREFERENCES_LOADED:
+        ui.loaded_preferences(window, prefs)
+    if event == ui.EVENT_CLIPBOARD_LOADED:
+        ui.loaded_clipboard_content(window, values, input_buffer)
+    pending_events.discard(event)
+window.refresh()
+loaded = time.perf_counter()
+window.close()
+
+print((first_frame - start) * 1000, (loaded - start) * 1000)
+"""
+
+
+def measure_process(args, runs, stdin=b''):
+    """
+    Returns the median wall time in milliseconds of running the interpreter with the given arguments.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, input=stdin, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure_first_frame(runs):
+    """
+    Returns the median milliseconds until the first frame of the GUI is drawn and until the data loaded
+    in the background is displayed, or None if the GUI can not be shown.
+    """
+    script = FIRST_FRAME_SCRIPT.format(vico_dir=VICO_DIR)
+    first_frame_timings = []
+    loaded_timings = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, universal_newlines=True)
+        if completed.returncode != 0:
+            print(completed.stderr.strip().splitlines()[-1], file=sys.stderr)
+            return None
+        first_frame_ms, loaded_ms = completed.stdout.split()
+        first_frame_timings.append(float(first_frame_ms))
+        loaded_timings.append(float(loaded_ms))
+    return statistics.median(first_frame_timings), statistics.median(loaded_timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the startup time of vico.')
+    parser.add_argument('--runs', type=int, default=21, help='count of runs per measurement (default: 21)')
+    parser.add_argument('--gui', action='store_true', help='measure the time-to-first-frame of the GUI as well')
+    args = parser.parse_args()
+
+    interpreter_ms = measure_process(['-c', 'pass'], args.runs)
+    headless_ms = measure_process([VICO_SCRIPT, 'transform'], args.runs, stdin=b'1\n2\n3\n')
+    overhead_ms = headless_ms - interpreter_ms
+
+    print("interpreter startup:   {0:8.1f} ms".format(interpreter_ms))
+    print("headless cold start:   {0:8.1f} ms".format(headless_ms))
+    print("overhead of vico:      {0:8.1f} ms (limit: {1} ms)".format(overhead_ms, HEADLESS_OVERHEAD_LIMIT_MS))
+
+    if args.gui:
+        gui_timings = measure_first_frame(args.runs)
+        if gui_timings is None:
+            print("GUI time-to-first-frame: skipped, the GUI could not be shown")
+        else:
+            print("GUI first frame:       {0:8.1f} ms".format(gui_timings[0]))
+            print("GUI startup data shown:{0:8.1f} ms".format(gui_timings[1]))
+
+    return 0 if overhead_ms <= HEADLESS_OVERHEAD_LIMIT_MS else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# Count of characters of a TextBuffer handed out at once to be displayed
+PAGE_SIZE = 64 * 1024
+# Count of characters taken from the start and from the end of a text for an excerpt
+EXCERPT_SIZE = 2 * 1024
+
+
+class TextBuffer(object):
+    """
+    Holds a possibly huge text outside of any widget and hands it out page by page, so a widget
+    only has to display the part of the text the user actually looks at.
+
+    Attributes:
+        text (str): The complete text.
+        shown_length (int): Count of characters already handed out by next_page().
+        page_size (int): Count of characters handed out by next_page() at once.
+    """
+    def __init__(self, page_size=PAGE_SIZE):
+        """
+        Initializes a new instance of an empty TextBuffer object.
+
+        Args:
+            page_size (int): Count of characters handed out by next_page() at once. Default is PAGE_SIZE.
+        """
+        self._text = ''
+        self._shown_length = 0
+        self._page_size = page_size
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text or ''
+        self._shown_length = 0
+
+    @property
+    def shown_length(self):
+        return self._shown_length
+
+    @property
+    def page_size(self):
+        return self._page_size
+
+    def __len__(self):
+        return len(self._text)
+
+    def is_fully_shown(self):
+        """
+        Indicates if the complete text was handed out by next_page().
+        """
+        return self._shown_length >= len(self._text)
+
+    def next_page(self):
+        """
+        Returns the next page of the text that was not handed out yet.
+
+        Returns:
+            The next page_size characters of the text or an empty str if the complete text was handed out.
+        """
+        page = self._text[self._shown_length:self._shown_length + self._page_size]
+        self._shown_length += len(page)
+        return page
+
+    def excerpt(self, size=EXCERPT_SIZE):
+        """
+        Returns an excerpt of the text consisting of its start and its end.
+
+        Args:
+            size (int): Count of characters taken from the start and from the end of the text.
+                Default is EXCERPT_SIZE.
+
+        Returns:
+            The complete text if it is not longer than two times size. Otherwise the first and the last
+            size characters of the text separated by a line containing an ellipsis.
+        """
+        if len(self._text) <= 2 * size:
+            return self._text
+        return "{0}\n[...]\n{1}".format(self._text[:size], self._text[-size:])
@@ -0,0 +1,185 @@
+import sys
+import time
+from teksto import TextTransformer, TextTransformerError, TransformProfile, TransformResultCache, \
+    get_text_transformer
+
+
+def list_presets(prefs, output=None):
+    """
+    Writes the names of all presets to the output, one name per line.
+    The selected preset is marked with an asterisk.
+
+    Args:
+        prefs (:obj:`VicoPreferences`): The user preferences containing the presets.
+        output: A file object opened in text mode. Default is sys.stdout.
+    """
+    output = output or sys.stdout
+    for index, preset in enumerate(prefs.presets):
+        marker = '*' if index == prefs.selected_preset_index else ' '
+        output.write("{0} {1}\n".format(marker, preset.name))
+
+
+def create_text_transformer(transform_settings, sort_memory_budget=None):
+    """
+    Returns the TextTransformer object for the given transform settings.
+
+    Args:
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+        sort_memory_budget (int): Count of bytes of text items sorted in memory. Default is None,
+            which means the compiled transformer of get_text_transformer() with its default budget is used.
+
+    Returns:
+        An instance of a TextTransformer object.
+    """
+    if sort_memory_budget:
+        return TextTransformer(transform_settings, sort_memory_budget=sort_memory_budget)
+    return get_text_transformer(transform_settings)
+
+
+def write_profile_report(profile):
+    """
+    Writes the time spent in every stage of a text transformation to stderr.
+
+    Args:
+        profile (:obj:`TransformProfile`): The profile of the text transformation.
+    """
+    sys.stderr.write("vico: profile of the text transformation ({0:.1f} ms in total)\n".format(
+        profile.total_seconds * 1000))
+    sys.stderr.write(profile.report() + "\n")
+
+
+def run_transform(transform_settings, reader, writer, sort_memory_budget=None, profile=False):
+    """
+    Transforms the text read from reader and writes the transformed text to writer as it goes,
+    so the input never has to be held in memory as a whole.
+
+    In contrast to run_watch() no TransformResultCache is used: the cache only lives as long as the process,
+    which transforms its input once and exits, so it could never be hit. Looking the input up would also
+    require holding the whole input and the transformed text in memory.
+
+    Args:
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+        reader: A file object opened in text mode to read the text from.
+        writer: A file object opened in text mode to write the transformed text to.
+        sort_memory_budget (int): Count of bytes of text items sorted in memory. Default is None.
+        profile (bool): Whether the time spent in every stage of the transformation is written to stderr.
+            Default is False.
+
+    Returns:
+        The exit status: 0 on success, 1 if the text transformation failed.
+    """
+    text_transformer = create_text_transformer(transform_settings, sort_memory_budget)
+    transform_profile = TransformProfile() if profile else None
+    try:
+        text_transformer.transform_stream(reader, writer, transform_profile)
+    except TextTransformerError as e:
+        sys.stderr.write("vico: {0}\n".format(e.message))
+        return 1
+
+    writer.flush()
+    if transform_profile is not None:
+        write_profile_report(transform_profile)
+    return 0
+
+
+def run_transform_file(transform_settings, path, out_path, encoding, workers=None, sort_memory_budget=None,
+                       profile=False):
+    """
+    Transforms the text of the file at path and writes the transformed text to the file at out_path.
+    The input file is memory-mapped and processed as bytes wherever possible.
+
+    Args:
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+        path (str): The path of the file to be transformed.
+        out_path (str): The path of the file the transformed text is written to.
+        encoding (str): The encoding of both files.
+        workers (int): Count of processes to transform large files in parallel. Default is None.
+        sort_memory_budget (int): Count of bytes of text items sorted in memory. Default is None.
+        profile (bool): Whether the time spent in every stage of the transformation is written to stderr.
+            A profiled file is never transformed in parallel. Default is False.
+
+    Returns:
+        The exit status: 0 on success, 1 if the text transformation failed or one of the files can not be
+        read, decoded or written. The output file is only replaced if the transformation succeeded.
+    """
+    text_transformer = create_text_transformer(transform_settings, sort_memory_budget)
+    transform_profile = TransformProfile() if profile else None
+    try:
+        text_transformer.transform_file(path, out_path, encoding, workers=workers, profile=transform_profile)
+    except TextTransformerError as e:
+        sys.stderr.write("vico: {0}\n".format(e.message))
+        return 1
+    except (OSError, UnicodeError) as e:
+        sys.stderr.write("vico: {0}\n".format(e))
+        return 1
+
+    if transform_profile is not None:
+        write_profile_report(transform_profile)
+    return 0
+
+
+def run_watch(transform_settings, output=None, write_back=True, min_interval=None, max_size=None):
+    """
+    Watches the clipboard and transforms every new clipboard content until the user presses Ctrl+C.
+    The transformed text is written back to the clipboard or to the output.
+
+    Args:
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+        output: A file object opened in text mode the transformed texts are written to, if they are not
+            written back to the clipboard. Default is sys.stdout.
+        write_back (bool): Indicates if the transformed text is written back to the clipboard. Default is True.
+        min_interval (float): Minimum interval in seconds between two transformations.
+            Default is WATCH_MIN_INTERVAL.
+        max_size (int): Clipboard contents longer than this count of characters are not transformed.
+            Default is WATCH_MAX_SIZE.
+
+    Returns:
+        The exit status: 0 after the user stopped watching, 1 if the clipboard can not be accessed
+        or the watcher stopped because the clipboard could not be accessed any more.
+        The statistics of the result cache are written to stderr after the user stopped watching,
+        so its size can be checked.
+    """
+    # The clipboard watcher needs pyperclip, which is only imported when it is actually used
+    import pyperclip
+    from workers import ClipboardWatcher, WATCH_POLL_INTERVAL, WATCH_MIN_INTERVAL, WATCH_MAX_SIZE
+
+    output = output or sys.stdout
+    # Copying a list once again, e.g. after copying another list in between, reuses its transformed text
+    result_cache = TransformResultCache()
+
+    def report_result(text, result):
+        if isinstance(result, pyperclip.PyperclipException):
+            sys.stderr.write("vico: the clipboard can not be accessed any more: {0}\n".format(result))
+        elif isinstance(result, TextTransformerError):
+            sys.stderr.write("vico: {0}\n".format(result.message))
+        elif write_back:
+            message = "vico: transformed {0} text item(s)".format(result['count_text_items'])
+            if 'count_removed_duplicates' in result:
+                message += ", removed {0} duplicate(s)".format(result['count_removed_duplicates'])
+            sys.stderr.write(message + "\n")
+        else:
+            output.write(result['transformed_text'])
+            output.write('\n')
+            output.flush()
+
+    try:
+        watcher = ClipboardWatcher(transform_settings, report_result, write_back=write_back,
+                                   min_interval=WATCH_MIN_INTERVAL if min_interval is None else min_interval,
+                                   max_size=max_size or WATCH_MAX_SIZE, result_cache=result_cache)
+    except pyperclip.PyperclipException as e:
+        sys.stderr.write("vico: {0}\n".format(e))
+        return 1
+
+    sys.stderr.write("vico: watching the clipboard, press Ctrl+C to stop\n")
+    try:
+        while not watcher.stopped:
+            time.sleep(WATCH_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+
+    stats = result_cache.stats()
+    sys.stderr.write("vico: result cache: {0} hit(s), {1} miss(es), {2} entries, {3} of {4} bytes\n".format(
+        stats['hits'], stats['misses'], stats['entries'], stats['bytes'], stats['max_bytes']))
+    return 1 if watcher.error is not None else 0
@@ -1,7 +1,6 @@
 import os
+import sys
 import json
-import platform
-from pathlib import Path
 from teksto import TransformSettings, TransformSettingsPreset
 
 
@@ -12,30 +11,38 @@ class VicoPreferences(object):
     Attributes:
         selected_preset_index (int): Index of the selected preset in the listbox.
         presets (:obj:`list` of :obj:`TransformSettingsPreset`): Exception error code.
+        loaded (bool): Indicates if the preferences were loaded already.
     """
-    def __init__(self):
+    def __init__(self, autoload=True):
         """
         Initializes a new instance of the user preferences and tries to load existing preferences
         from a JSON file. If the file does not exist default preferences are used.
+
+        Args:
+            autoload (bool): Indicates if the preferences are loaded right away. If False, load() has to be
+                called before the preferences are used, e.g. from a background thread. Default is True.
         """
         self._selected_preset_index = None
         self._presets = None
+        self._loaded = False
         self._prefs_filepath = VicoPreferences._find_prefs_filepath()
 
-        self.load()
+        if autoload:
+            self.load()
 
     @staticmethod
     def _find_prefs_filepath():
         """
         Returns the path of the file where the user preferences are saved.
         """
-        current_platform = platform.system()
+        # sys.platform is used instead of platform.system() to keep the startup of the headless mode fast
+        current_platform = sys.platform
 
-        if current_platform == 'Windows':
+        if current_platform == 'win32':
             prefs_filepath = os.path.expandvars("%appdata%/vico/vico_settings.json")
-        elif current_platform == 'Darwin':
+        elif current_platform == 'darwin':
             prefs_filepath = os.path.expanduser("~/Library/Preferences/vico_settings.json")
-        elif current_platform == 'Linux':
+        elif current_platform.startswith('linux'):
             prefs_filepath = os.path.expanduser("~/.config/vico_settings.json")
         else:
             prefs_filepath = os.path.join(os.path.realpath(os.path.dirname(__file__)), 'vico_settings.json')
@@ -66,6 +73,10 @@ class VicoPreferences(object):
     def prefs_filepath(self, prefs_filepath):
         self._prefs_filepath = prefs_filepath
 
+    @property
+    def loaded(self):
+        return self._loaded
+
     @property
     def selected_transform_settings(self):
         return self.presets[self.selected_preset_index].transform_settings
@@ -74,6 +85,21 @@ class VicoPreferences(object):
     def selected_preset(self):
         return self.presets[self.selected_preset_index]
 
+    def find_preset(self, name):
+        """
+        Returns the preset with the given name.
+
+        Args:
+            name (str): The name of the preset.
+
+        Returns:
+            The first preset with the given name or None if no such preset exists.
+        """
+        for preset in self.presets:
+            if preset.name == name:
+                return preset
+        return None
+
     def load(self):
         """
         Loads the user preferences from the JSON file. If the file does not exist default preferences are used.
@@ -91,16 +117,25 @@ class VicoPreferences(object):
                 presets.append(tsp)
             selected_preset_idx = json_data['selected_preset_index']
         else:
-            prefix, suffix, delimiter = "'", "'", ","
-            line_up = False
-            quote_text = False
-            ts = TransformSettings(prefix=prefix, suffix=suffix, delimiter=delimiter, line_up=line_up,
-                                   quote_text=quote_text)
-            presets = [TransformSettingsPreset('Default', ts)]
-            selected_preset_idx = 0
+            self.load_defaults()
+            return
 
         self.selected_preset_index = selected_preset_idx
         self.presets = presets
+        self._loaded = True
+
+    def load_defaults(self):
+        """
+        Uses the default preferences, e.g. if the JSON file does not exist or can not be read.
+        """
+        prefix, suffix, delimiter = "'", "'", ","
+        line_up = False
+        quote_text = False
+        ts = TransformSettings(prefix=prefix, suffix=suffix, delimiter=delimiter, line_up=line_up,
+                               quote_text=quote_text)
+        self.presets = [TransformSettingsPreset('Default', ts)]
+        self.selected_preset_index = 0
+        self._loaded = True
 
     def save(self):
         """
@@ -109,8 +144,7 @@ class VicoPreferences(object):
         prefs_dict = {'selected_preset_index': self.selected_preset_index,
                       'presets': [preset.to_dict() for preset in self.presets]}
         
-        output_file = Path(self.prefs_filepath)
-        output_file.parent.mkdir(exist_ok=True, parents=True)
-        
-        with open(output_file, "w") as prefs_file:
+        os.makedirs(os.path.dirname(os.path.abspath(self.prefs_filepath)), exist_ok=True)
+
+        with open(self.prefs_filepath, "w") as prefs_file:
             json.dump(prefs_dict, prefs_file, indent=4)
@@ -0,0 +1,286 @@
+import os
+import sys
+
+# Size in bytes of the buffer of a file written by a FileSink
+FILE_SINK_BUFFER_SIZE = 1024 * 1024
+# Extension of the files a FileSink compresses by gzip unless told otherwise
+GZIP_EXTENSION = '.gz'
+# Compression level of gzip files, which trades a slightly larger file for a much faster compression than level 9
+GZIP_COMPRESS_LEVEL = 6
+# Count of characters collected before they are written to the pipe of the clipboard tool
+CLIPBOARD_CHUNK_SIZE = 256 * 1024
+# Encoding of the text piped into the clipboard tool
+CLIPBOARD_ENCODING = 'utf-8'
+# Command lines of the clipboard tools reading the new clipboard content from stdin, in order of preference
+CLIPBOARD_COMMANDS = (('xclip', '-selection', 'clipboard'), ('xsel', '--clipboard', '--input'))
+
+
+class OutputSinkError(Exception):
+    """Raised when the transformed text can not be written to an output sink.
+
+    Args:
+        message (str): Human readable string describing the exception.
+
+    Attributes:
+        message (str): Human readable string describing the exception.
+    """
+    def __init__(self, message):
+        self.message = message
+
+
+class OutputSink(object):
+    """
+    Receives the pieces of a transformed text one by one, e.g. from TextTransformer.transform_stream()
+    or TextTransformer.transform_into(), so the transformed text never has to be held in memory as a whole.
+
+    A sink is used as a context manager: leaving the with block closes it, which flushes the pieces
+    written so far to their destination. If the with block is left by an exception, the sink is aborted.
+
+    Attributes:
+        written_length (int): Count of characters written to the sink.
+    """
+    def __init__(self):
+        """
+        Initializes a new instance of an OutputSink object.
+        """
+        self._written_length = 0
+
+    @property
+    def written_length(self):
+        return self._written_length
+
+    def write(self, piece):
+        """
+        Writes a piece of the transformed text.
+
+        Args:
+            piece (str): The piece to be written.
+
+        Raises:
+            OutputSinkError: If the piece can not be written.
+        """
+        self._written_length += len(piece)
+        self._write(piece)
+
+    def _write(self, piece):
+        raise NotImplementedError
+
+    def flush(self):
+        """
+        Flushes the pieces written so far to their destination, as far as the destination allows this
+        before the sink is closed.
+        """
+
+    def close(self):
+        """
+        Flushes the pieces written so far and releases the destination.
+
+        Raises:
+            OutputSinkError: If the destination did not accept the written text.
+        """
+
+    def abort(self):
+        """
+        Releases the destination after the transformation failed. By default the sink is closed, so the
+        pieces written so far are kept.
+        """
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class FileSink(OutputSink):
+    """
+    Writes the transformed text to a file through a large buffer, optionally compressed by gzip.
+    The file is written with newline='', as the transformed text already contains the platform specific
+    line separators. Aborting the sink removes the file, so a failed transformation leaves no truncated file.
+    """
+    def __init__(self, path, encoding='utf-8', compress=None, buffer_size=FILE_SINK_BUFFER_SIZE):
+        """
+        Initializes a new instance of a FileSink object and opens the file.
+
+        Args:
+            path (str): The path of the file to be written.
+            encoding (str): The encoding of the file. Default is 'utf-8'.
+            compress (bool): Should the file be compressed by gzip? Default is None, which means files
+                whose path ends with GZIP_EXTENSION are compressed.
+            buffer_size (int): Size in bytes of the buffer of the file. Default is FILE_SINK_BUFFER_SIZE.
+
+        Raises:
+            OSError: If the file can not be opened.
+        """
+        super().__init__()
+        if compress is None:
+            compress = path.lower().endswith(GZIP_EXTENSION)
+        if compress:
+            import gzip
+            self._file = gzip.open(path, 'wt', compresslevel=GZIP_COMPRESS_LEVEL, encoding=encoding, newline='')
+        else:
+            self._file = open(path, 'w', buffering=buffer_size, encoding=encoding, newline='')
+        self._path = path
+        self._write = self._file.write
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+
+
+class GzipFileSink(FileSink):
+    """
+    Writes the transformed text to a file compressed by gzip, no matter the extension of its path.
+    """
+    def __init__(self, path, encoding='utf-8'):
+        """
+        Initializes a new instance of a GzipFileSink object and opens the file.
+
+        Args:
+            path (str): The path of the file to be written.
+            encoding (str): The encoding of the text before it is compressed. Default is 'utf-8'.
+
+        Raises:
+            OSError: If the file can not be opened.
+        """
+        super().__init__(path, encoding=encoding, compress=True)
+
+
+class StdoutSink(OutputSink):
+    """
+    Writes the transformed text to stdout without translating its line separators once again.
+    Closing the sink only flushes stdout.
+    """
+    def __init__(self, stream=None):
+        """
+        Initializes a new instance of a StdoutSink object.
+
+        Args:
+            stream: A file object opened in text mode. Default is sys.stdout.
+        """
+        super().__init__()
+        self._stream = stream or sys.stdout
+        if hasattr(self._stream, 'reconfigure'):
+            self._stream.reconfigure(newline='')
+        self._write = self._stream.write
+
+    def flush(self):
+        self._stream.flush()
+
+    def close(self):
+        self._stream.flush()
+
+
+def find_clipboard_command():
+    """
+    Returns the command line of the first clipboard tool of CLIPBOARD_COMMANDS which is installed.
+
+    Returns:
+        The command line as a list of str or None if none of the clipboard tools is installed.
+    """
+    import shutil
+
+    for command in CLIPBOARD_COMMANDS:
+        executable = shutil.which(command[0])
+        if executable:
+            return [executable] + list(command[1:])
+    return None
+
+
+class ClipboardSink(OutputSink):
+    """
+    Streams the transformed text into the stdin pipe of a clipboard tool like xclip or xsel, which takes over
+    the text as the new clipboard content once the pipe is closed.
+
+    The pieces are collected and written to the pipe in encoded chunks of CLIPBOARD_CHUNK_SIZE characters,
+    so neither the transformed text nor its encoded bytes are ever held in memory as a whole.
+    """
+    def __init__(self, command=None, chunk_size=CLIPBOARD_CHUNK_SIZE):
+        """
+        Initializes a new instance of a ClipboardSink object and starts the clipboard tool.
+
+        Args:
+            command (:obj:`list` of :obj:`str`): The command line of the clipboard tool. Default is None,
+                which means the result of find_clipboard_command().
+            chunk_size (int): Count of characters written to the pipe at once. Default is CLIPBOARD_CHUNK_SIZE.
+
+        Raises:
+            OutputSinkError: If no clipboard tool is installed or it can not be started.
+        """
+        super().__init__()
+        command = command or find_clipboard_command()
+        if not command:
+            raise OutputSinkError("None of the clipboard tools {0} is installed.".format(
+                ', '.join(tool_command[0] for tool_command in CLIPBOARD_COMMANDS)))
+        self._chunk_size = chunk_size
+        self._pending_pieces = []
+        self._pending_length = 0
+        import subprocess
+
+        try:
+            # The clipboard tool keeps running in the background to serve the clipboard content,
+            # so its stdout and stderr must not be pipes that are waited for
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL, close_fds=True)
+        except OSError as e:
+            raise OutputSinkError("The clipboard tool {0} can not be started: {1}".format(command[0], e))
+
+    def _write(self, piece):
+        self._pending_pieces.append(piece)
+        self._pending_length += len(piece)
+        if self._pending_length >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending_pieces:
+            return
+        chunk = ''.join(self._pending_pieces).encode(CLIPBOARD_ENCODING)
+        self._pending_pieces = []
+        self._pending_length = 0
+        try:
+            self._process.stdin.write(chunk)
+        except OSError as e:
+            raise OutputSinkError("The clipboard tool stopped reading the text: {0}".format(e))
+
+    def close(self):
+        if self._process.stdin.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+        returncode = self._process.wait()
+        if returncode:
+            raise OutputSinkError("The clipboard tool failed with exit status {0}.".format(returncode))
+
+    def abort(self):
+        # The clipboard keeps its previous content instead of a truncated text
+        self._pending_pieces = []
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        if not self._process.stdin.closed:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
@@ -1,5 +1,121 @@
 import os
+import re
+import sys
+import array
 import uuid
+import codecs
+import time
+import operator
+import functools
+import contextlib
+import collections
+import itertools
+from string import Formatter
+
+# Count of lines read at once from an iterable or file object while streaming
+STREAM_BATCH_LINES = 4096
+# Size in bytes of the blocks a file is transformed in by TextTransformer.transform_file()
+FILE_BLOCK_SIZE = 1024 * 1024
+# Minimum size of a text (characters) or file (bytes) to be transformed in parallel if workers are requested,
+# smaller inputs are transformed faster by a single process
+PARALLEL_MIN_SIZE = 16 * 1024 * 1024
+# Size of the chunks (characters or bytes) handed to a worker process
+PARALLEL_CHUNK_SIZE = 4 * 1024 * 1024
+# Size of the chunks (characters) transformed between two checks whether the transformation is cancelled
+CANCEL_CHECK_SIZE = 1024 * 1024
+# Size of the chunks (characters) an IncrementalTransform object keeps the transformed text in
+INCREMENTAL_CHUNK_SIZE = 16 * 1024
+# Encodings in which every ASCII byte stands for the ASCII character, so lines can be processed as bytes
+ASCII_COMPATIBLE_ENCODINGS = ('utf-8', 'ascii', 'iso8859-1', 'iso8859-15', 'cp1252')
+# Count of compiled TextTransformer objects kept by get_text_transformer()
+TRANSFORMER_CACHE_SIZE = 32
+# Maximum count of bytes of the transformed texts kept by a TransformResultCache
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Count of characters of a text encoded at once to compute its digest for a TransformResultCache
+RESULT_CACHE_DIGEST_CHUNK_SIZE = 1024 * 1024
+# Estimated count of bytes of the text items a streaming transformation sorts in memory before
+# the sorted text items are written to a temporary file and merged later on
+SORT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Estimated count of bytes a text item takes in memory in addition to its characters
+SORT_ITEM_OVERHEAD = 64
+# Sort modes of the text items
+SORT_MODE_LEXICAL = 'lexical'
+SORT_MODE_NUMERIC = 'numeric'
+SORT_MODES = (None, SORT_MODE_LEXICAL, SORT_MODE_NUMERIC)
+# Encodings whose encoded text items sort in the same order as the text items themselves
+ORDER_PRESERVING_ENCODINGS = ('utf-8', 'ascii', 'iso8859-1')
+# Minimum count of consecutive integers collapsed into a range, shorter runs are kept as text items
+RANGE_MIN_LENGTH = 3
+# Escape dialects: every text item is escaped for a string literal of the language or format
+ESCAPE_DIALECT_SQL = 'sql'
+ESCAPE_DIALECT_PYTHON = 'python'
+ESCAPE_DIALECT_JSON = 'json'
+ESCAPE_DIALECT_CSV = 'csv'
+ESCAPE_DIALECT_SHELL = 'shell'
+ESCAPE_DIALECTS = (None, ESCAPE_DIALECT_SQL, ESCAPE_DIALECT_PYTHON, ESCAPE_DIALECT_JSON, ESCAPE_DIALECT_CSV,
+                   ESCAPE_DIALECT_SHELL)
+# Trim modes: the whitespace removed from the start and the end of every line
+TRIM_MODE_NONE = 'none'
+TRIM_MODE_LEFT = 'left'
+TRIM_MODE_RIGHT = 'right'
+TRIM_MODE_BOTH = 'both'
+TRIM_MODES = (TRIM_MODE_NONE, TRIM_MODE_LEFT, TRIM_MODE_RIGHT, TRIM_MODE_BOTH)
+# Delimiters of the columns of columnar input, e.g. rows pasted from a spreadsheet are separated by tabs
+COLUMN_DELIMITER_TAB = '\t'
+COLUMN_DELIMITER_COMMA = ','
+COLUMN_DELIMITER_SEMICOLON = ';'
+# Separator placed between the selected columns of a row by default
+DEFAULT_COLUMN_SEPARATOR = ', '
+# Count of rows of columnar input parsed at once, so only the fields of a single block of rows are held in memory
+ROW_BLOCK_SIZE = 8192
+
+
+# ASCII characters str.splitlines() and str.strip() treat as line break or whitespace, but bytes does not
+_BYTES_INCOMPATIBLE_WHITESPACE = (b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e', b'\x1f')
+# Line breaks with leading or trailing whitespace, which require the lines of a block to be stripped one by one
+_BYTES_PADDED_LINE_BREAKS = (b' \n', b'\t\n', b'\n ', b'\n\t')
+# Text items which are integers in their canonical form, so they are converted to int and back without changes
+_INTEGER_ITEM_PATTERN = re.compile(r'0|-?[1-9][0-9]*')
+_INTEGER_ITEM_BYTES_PATTERN = re.compile(rb'0|-?[1-9][0-9]*')
+# Texts containing one canonical integer per line that fits into a signed 64-bit integer. The integers may be
+# padded by whitespace, but must be separated by at least one of the line breaks known to str.splitlines().
+_INTEGER_TEXT_PATTERN = re.compile(r'\s*(?:(?:0|-?[1-9][0-9]{0,17})'
+                                   r'(?:[^\S\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]*'
+                                   r'[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]\s*(?:0|-?[1-9][0-9]{0,17}))*)?\s*')
+# The characters of the integers processed by the integer fast path
+_INTEGER_CHARS = '-0123456789'
+# The line breaks known to str.splitlines(), which are never part of a text item
+_LINE_BREAK_CHARS = '\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+# Runs of whitespace within a line, which are collapsed into a single space if requested
+_WHITESPACE_RUN_PATTERN = re.compile('[^\\S' + _LINE_BREAK_CHARS + ']+')
+# The functions trimming a line according to the trim mode
+_TRIM_FUNCTIONS = {TRIM_MODE_NONE: None, TRIM_MODE_LEFT: str.lstrip, TRIM_MODE_RIGHT: str.rstrip,
+                   TRIM_MODE_BOTH: str.strip}
+# The control characters which may be part of a text item
+_ITEM_CONTROL_CHARS = [chr(code) for code in range(0x20) if chr(code) not in _LINE_BREAK_CHARS]
+# The fields of the templates, mapped to whether they take an index in square brackets, e.g. {column[2]}
+_ITEM_TEMPLATE_FIELDS = {'item': False, 'index': False}
+_COLUMNAR_ITEM_TEMPLATE_FIELDS = {'item': False, 'index': False, 'column': True}
+_SURROUNDING_TEMPLATE_FIELDS = {'0': False}
+# The value of the {index} field of the first text item rendered by an item template
+_ITEM_TEMPLATE_FIRST_INDEX = 1
+# Separates the fields of a row referred to by an item template from its text item while they pass the item
+# stages. It is a line break, so the fields split from lines never contain it.
+_TEMPLATE_FIELD_SEPARATOR = '\x1e'
+# A field name of a template: a name or a number, optionally followed by an index in square brackets
+_TEMPLATE_FIELD_PATTERN = re.compile(r'(\w*)(?:\[(\d+)\])?')
+# The conversions of the fields of a template
+_TEMPLATE_CONVERSIONS = {'s': str, 'r': repr, 'a': ascii}
+# The escape rules of every escape dialect, mapping a character to its escape sequence
+_ESCAPE_DIALECT_RULES = {
+    ESCAPE_DIALECT_SQL: {"'": "''"},
+    ESCAPE_DIALECT_PYTHON: dict({char: '\\x{0:02x}'.format(ord(char)) for char in _ITEM_CONTROL_CHARS + ['\x7f']},
+                                **{'\\': '\\\\', "'": "\\'", '"': '\\"', '\t': '\\t'}),
+    ESCAPE_DIALECT_JSON: dict({char: '\\u{0:04x}'.format(ord(char)) for char in _ITEM_CONTROL_CHARS},
+                              **{'\\': '\\\\', '"': '\\"', '\b': '\\b', '\t': '\\t'}),
+    ESCAPE_DIALECT_CSV: {'"': '""'},
+    ESCAPE_DIALECT_SHELL: {"'": "'\\''"},
+}
 
 
 class TextTransformerError(Exception):
@@ -15,6 +131,19 @@ class TextTransformerError(Exception):
         self.message = message
 
 
+class TransformCancelledError(Exception):
+    """Raised when a text transformation is cancelled before it is finished.
+
+    Args:
+        message (str): Human readable string describing the exception.
+
+    Attributes:
+        message (str): Human readable string describing the exception.
+    """
+    def __init__(self, message):
+        self.message = message
+
+
 class TransformSettingsPreset(object):
     """
     Keeps together an instance of a TransformSettings object and a name.
@@ -50,7 +179,22 @@ class TransformSettingsPreset(object):
                                                quote_text=ts_dict.get('quote_text', False),
                                                quote_char=ts_dict.get('quote_char', None),
                                                escape_char=ts_dict.get('escape_char', None),
-                                               surrounding_text=ts_dict.get('surrounding_text', None))
+                                               surrounding_text=ts_dict.get('surrounding_text', None),
+                                               chunk_size=ts_dict.get('chunk_size', None),
+                                               remove_duplicates=ts_dict.get('remove_duplicates', False),
+                                               sort_mode=ts_dict.get('sort_mode', None),
+                                               range_text=ts_dict.get('range_text', None),
+                                               escape_dialect=ts_dict.get('escape_dialect', None),
+                                               trim_mode=ts_dict.get('trim_mode', TRIM_MODE_BOTH),
+                                               collapse_whitespace=ts_dict.get('collapse_whitespace', False),
+                                               drop_blank_lines=ts_dict.get('drop_blank_lines', True),
+                                               column_delimiter=ts_dict.get('column_delimiter', None),
+                                               columns=[ColumnSettings.from_dict(column_dict) for column_dict
+                                                        in ts_dict.get('columns', None) or []],
+                                               column_separator=ts_dict.get('column_separator',
+                                                                            DEFAULT_COLUMN_SEPARATOR),
+                                               item_template=ts_dict.get('item_template', None),
+                                               output_template=ts_dict.get('output_template', None))
         tsp = TransformSettingsPreset(name, transform_settings)
         return tsp
 
@@ -84,7 +228,22 @@ class TransformSettingsPreset(object):
                                                     'quote_text': self._transform_settings.quote_text,
                                                     'quote_char': self._transform_settings.quote_char,
                                                     'escape_char': self._transform_settings.escape_char,
-                                                    'surrounding_text': self._transform_settings.surrounding_text
+                                                    'surrounding_text': self._transform_settings.surrounding_text,
+                                                    'chunk_size': self._transform_settings.chunk_size,
+                                                    'remove_duplicates': self._transform_settings.remove_duplicates,
+                                                    'sort_mode': self._transform_settings.sort_mode,
+                                                    'range_text': self._transform_settings.range_text,
+                                                    'escape_dialect': self._transform_settings.escape_dialect,
+                                                    'trim_mode': self._transform_settings.trim_mode,
+                                                    'collapse_whitespace':
+                                                        self._transform_settings.collapse_whitespace,
+                                                    'drop_blank_lines': self._transform_settings.drop_blank_lines,
+                                                    'column_delimiter': self._transform_settings.column_delimiter,
+                                                    'columns': [column.to_dict() for column
+                                                                in self._transform_settings.columns],
+                                                    'column_separator': self._transform_settings.column_separator,
+                                                    'item_template': self._transform_settings.item_template,
+                                                    'output_template': self._transform_settings.output_template
                                               }
                    }
         return dict_rep
@@ -118,6 +277,12 @@ class TransformSettings(object):
     Holds a set of options that are needed to control the text transformation executed
     by a TextTransformer object.
 
+    Instances are immutable and can be compared and hashed, so they can be used as keys,
+    e.g. for the cache of compiled TextTransformer objects (see get_text_transformer()).
+    Two instances are equal if they result in the same text transformation: the quote and
+    escape char are only taken into account if quote_text is set, and an empty surrounding
+    text equals no surrounding text.
+
     Attributes:
         prefix (str): The prefix to be placed before the text item.
         suffix (str): The suffix to be placed after the text item.
@@ -127,9 +292,37 @@ class TransformSettings(object):
         quote_char (str): The character to be quoted.
         escape_char (str): The escape character to be used to quote quote_char.
         surrounding_text (str): The surrounding text where the transformed text should be placed in.
+        chunk_size (int): The maximum count of text items per group. Every group is placed into the
+            surrounding text on its own, and the groups are separated by a line break (or a space if line_up
+            is set). None means all text items form one group.
+        remove_duplicates (bool): Should repeated text items be removed, keeping the first occurrence?
+        sort_mode (str): SORT_MODE_LEXICAL or SORT_MODE_NUMERIC to sort the text items, None keeps their order.
+        range_text (str): The text a run of consecutive integer text items is collapsed into, with the format
+            codes {0} and {1} for the first and the last integer. None means runs are not collapsed.
+        escape_dialect (str): One of ESCAPE_DIALECTS to escape every text item for a string literal of that
+            language or format. None means the text items are not escaped.
+        trim_mode (str): One of TRIM_MODES, the whitespace removed from the start and the end of every line.
+        collapse_whitespace (bool): Should every run of whitespace within a line be replaced by a single space?
+        drop_blank_lines (bool): Should lines consisting of whitespace only be dropped?
+        column_delimiter (str): The delimiter of the columns of every line, e.g. COLUMN_DELIMITER_TAB.
+            None means every line is a single text item.
+        columns (:obj:`tuple` of :obj:`ColumnSettings`): The columns selected from every row, empty for all.
+        column_separator (str): The separator placed between the selected columns of a row.
+        item_template (str): The template every text item is rendered by, with the fields {item}, {index}
+            and {column[n]}. None means the text items are taken as they are.
+        output_template (str): The template the whole transformed text is placed in, with the field {0}.
+            None means the transformed text is only placed in the surrounding text.
     """
+    __slots__ = ('_prefix', '_suffix', '_delimiter', '_line_up', '_quote_text', '_quote_char',
+                 '_escape_char', '_surrounding_text', '_chunk_size', '_remove_duplicates', '_sort_mode',
+                 '_range_text', '_escape_dialect', '_trim_mode', '_collapse_whitespace', '_drop_blank_lines',
+                 '_column_delimiter', '_columns', '_column_separator', '_item_template', '_output_template', '_key')
+
     def __init__(self, prefix, suffix, delimiter, line_up=False,
-                 quote_text=False, quote_char=None, escape_char=None, surrounding_text=None):
+                 quote_text=False, quote_char=None, escape_char=None, surrounding_text=None, chunk_size=None,
+                 remove_duplicates=False, sort_mode=None, range_text=None, escape_dialect=None,
+                 trim_mode=TRIM_MODE_BOTH, collapse_whitespace=False, drop_blank_lines=True, column_delimiter=None,
+                 columns=None, column_separator=DEFAULT_COLUMN_SEPARATOR, item_template=None, output_template=None):
         """
         Initializes a new instance of a TransformSettings object.
 
@@ -143,7 +336,57 @@ class TransformSettings(object):
             escape_char (str): The escape character to be used to quote quote_char. Default is None.
             surrounding_text (str): The surrounding text where the transformed text should be placed in.
                 Default is None.
+            chunk_size (int): The maximum count of text items per group, e.g. 1000 to stay below the limit
+                of elements of an SQL IN-list. Default is None, which means the text items are not grouped.
+            remove_duplicates (bool): Should repeated text items be removed, keeping the first occurrence?
+                Default is False.
+            sort_mode (str): SORT_MODE_LEXICAL to sort the text items by their characters, SORT_MODE_NUMERIC
+                to sort them by their numeric value (text items which are no numbers follow the numbers).
+                Default is None, which means the text items keep their order.
+            range_text (str): The text a run of at least RANGE_MIN_LENGTH consecutive integer text items is
+                collapsed into, e.g. 'OR id BETWEEN {0} AND {1}'. The collapsed runs follow the transformed text
+                one by one, separated like groups of text items. Default is None, which means runs of integers
+                are not collapsed.
+            escape_dialect (str): ESCAPE_DIALECT_SQL, ESCAPE_DIALECT_PYTHON, ESCAPE_DIALECT_JSON,
+                ESCAPE_DIALECT_CSV or ESCAPE_DIALECT_SHELL to escape every text item for a string literal
+                of that language or format, e.g. "it's" becomes "it''s" for SQL. The text items are escaped
+                after they are split and stripped. Default is None, which means the text items are not escaped.
+            trim_mode (str): TRIM_MODE_BOTH, TRIM_MODE_LEFT or TRIM_MODE_RIGHT to strip whitespace from both
+                sides, the start or the end of every line, TRIM_MODE_NONE to keep it. Default is TRIM_MODE_BOTH.
+            collapse_whitespace (bool): Should every run of whitespace within a line be replaced by a single
+                space? Runs at the start and the end of a line are removed or kept according to trim_mode.
+                Default is False.
+            drop_blank_lines (bool): Should lines consisting of whitespace only be dropped? If False, they
+                result in empty text items. Default is True.
+            column_delimiter (str): The delimiter of the columns of every line, e.g. COLUMN_DELIMITER_TAB for rows
+                pasted from a spreadsheet or COLUMN_DELIMITER_COMMA for CSV. Every line is parsed as a row by
+                a csv reader, fields may be quoted by double quotes, and the selected columns of the row form
+                the text item. The trim settings and the escape dialect apply to every field then.
+                Default is None, which means every line is a single text item.
+            columns (:obj:`list` of :obj:`ColumnSettings`): The columns selected from every row together with
+                their own prefix, suffix and escape dialect, e.g. to build the tuples ('a', 42) of an SQL VALUES
+                clause. Default is None, which means all columns of a row are selected.
+            column_separator (str): The separator placed between the selected columns of a row.
+                Default is DEFAULT_COLUMN_SEPARATOR.
+            item_template (str): The template every text item is rendered by before prefix, suffix and delimiter
+                are placed around it, e.g. '({index}, {item})'. {item} is the text item, {index} its position
+                in the transformed text counted from 1 and {column[n]} the field n of its row counted from 0,
+                which requires a column_delimiter. The fields accept the conversions and format specs of
+                str.format(), e.g. {index:04d}. Text items collapsed into ranges are not rendered.
+                Default is None, which means the text items are taken as they are.
+            output_template (str): The template the whole transformed text including all groups and ranges is
+                placed in, with the field {0}, e.g. 'BEGIN;\n{0}\nCOMMIT;'. In contrast to the surrounding text
+                it is applied once even if the text items are split into groups. Default is None.
+
+        Raises:
+            ValueError: If sort_mode, escape_dialect or trim_mode is not one of the supported values.
         """
+        if sort_mode not in SORT_MODES:
+            raise ValueError("Unknown sort mode: {0!r}".format(sort_mode))
+        if escape_dialect not in ESCAPE_DIALECTS:
+            raise ValueError("Unknown escape dialect: {0!r}".format(escape_dialect))
+        if trim_mode not in TRIM_MODES:
+            raise ValueError("Unknown trim mode: {0!r}".format(trim_mode))
         self._prefix = prefix or ''
         self._suffix = suffix or ''
         self._delimiter = delimiter or ''
@@ -152,237 +395,2764 @@ class TransformSettings(object):
         self._quote_char = quote_char
         self._escape_char = escape_char
         self._surrounding_text = surrounding_text
+        self._chunk_size = chunk_size if chunk_size and chunk_size > 0 else None
+        self._remove_duplicates = remove_duplicates
+        self._sort_mode = sort_mode
+        self._range_text = range_text or None
+        self._escape_dialect = escape_dialect
+        self._trim_mode = trim_mode
+        self._collapse_whitespace = collapse_whitespace
+        self._drop_blank_lines = drop_blank_lines
+        self._column_delimiter = column_delimiter or None
+        self._columns = tuple(columns or ())
+        self._column_separator = column_separator if column_separator is not None else DEFAULT_COLUMN_SEPARATOR
+        self._item_template = item_template or None
+        self._output_template = output_template or None
+        self._key = (self._prefix, self._suffix, self._delimiter, bool(line_up), bool(quote_text),
+                     quote_char if quote_text else None, escape_char if quote_text else None,
+                     surrounding_text or None, self._chunk_size, bool(remove_duplicates), sort_mode,
+                     self._range_text, escape_dialect, trim_mode, bool(collapse_whitespace), bool(drop_blank_lines),
+                     self._column_delimiter, self._columns if self._column_delimiter else (),
+                     self._column_separator if self._column_delimiter else None, self._item_template,
+                     self._output_template)
 
     @property
     def prefix(self):
         return self._prefix
 
-    @prefix.setter
-    def prefix(self, prefix):
-        self._prefix = prefix or ''
-
     @property
     def suffix(self):
         return self._suffix
 
-    @suffix.setter
-    def suffix(self, suffix):
-        self._suffix = suffix or ''
-
     @property
     def delimiter(self):
         return self._delimiter
 
-    @delimiter.setter
-    def delimiter(self, delimiter):
-        self._delimiter = delimiter or ''
-
     @property
     def line_up(self):
         return self._line_up
 
-    @line_up.setter
-    def line_up(self, line_up):
-        self._line_up = line_up
-
     @property
     def quote_text(self):
         return self._quote_text
 
-    @quote_text.setter
-    def quote_text(self, quote_text):
-        self._quote_text = quote_text
-
     @property
     def quote_char(self):
         return self._quote_char
 
-    @quote_char.setter
-    def quote_char(self, quote_char):
-        self._quote_char = quote_char
-
     @property
     def escape_char(self):
         return self._escape_char
 
-    @escape_char.setter
-    def escape_char(self, escape_char):
-        self._escape_char = escape_char
-
     @property
     def surrounding_text(self):
         return self._surrounding_text
 
-    @surrounding_text.setter
-    def surrounding_text(self, surrounding_text):
-        self._surrounding_text = surrounding_text
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    @property
+    def remove_duplicates(self):
+        return self._remove_duplicates
 
+    @property
+    def sort_mode(self):
+        return self._sort_mode
 
-class TextTransformer(object):
+    @property
+    def range_text(self):
+        return self._range_text
+
+    @property
+    def escape_dialect(self):
+        return self._escape_dialect
+
+    @property
+    def trim_mode(self):
+        return self._trim_mode
+
+    @property
+    def collapse_whitespace(self):
+        return self._collapse_whitespace
+
+    @property
+    def drop_blank_lines(self):
+        return self._drop_blank_lines
+
+    @property
+    def column_delimiter(self):
+        return self._column_delimiter
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @property
+    def column_separator(self):
+        return self._column_separator
+
+    @property
+    def item_template(self):
+        return self._item_template
+
+    @property
+    def output_template(self):
+        return self._output_template
+
+    def __eq__(self, other):
+        if not isinstance(other, TransformSettings):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return "TransformSettings(prefix={0!r}, suffix={1!r}, delimiter={2!r}, line_up={3!r}, " \
+               "quote_text={4!r}, quote_char={5!r}, escape_char={6!r}, surrounding_text={7!r}, " \
+               "chunk_size={8!r}, remove_duplicates={9!r}, sort_mode={10!r}, range_text={11!r}, " \
+               "escape_dialect={12!r}, trim_mode={13!r}, collapse_whitespace={14!r}, drop_blank_lines={15!r}, " \
+               "column_delimiter={16!r}, columns={17!r}, column_separator={18!r}, item_template={19!r}, " \
+               "output_template={20!r})".format(
+                    self._prefix, self._suffix, self._delimiter, self._line_up, self._quote_text,
+                    self._quote_char, self._escape_char, self._surrounding_text, self._chunk_size,
+                    self._remove_duplicates, self._sort_mode, self._range_text, self._escape_dialect,
+                    self._trim_mode, self._collapse_whitespace, self._drop_blank_lines, self._column_delimiter,
+                    self._columns, self._column_separator, self._item_template, self._output_template)
+
+
+class ColumnSettings(object):
     """
-    Performs the transformation of a text using the specified transform settings.
+    Describes a column selected from the rows of columnar input and how its fields are decorated.
+
+    Instances are immutable and can be compared and hashed, just like TransformSettings.
+
+    Attributes:
+        index (int): The zero-based index of the column in a row.
+        prefix (str): The prefix to be placed before every field of the column.
+        suffix (str): The suffix to be placed after every field of the column.
+        escape_dialect (str): One of ESCAPE_DIALECTS to escape every field of the column. None means the
+            escape dialect of the transform settings is used.
     """
+    __slots__ = ('_index', '_prefix', '_suffix', '_escape_dialect', '_key')
 
-    def __init__(self, transform_settings):
+    @staticmethod
+    def from_dict(dict_rep):
         """
-         Initializes a new instance of a TransformSettings object.
+        Returns a new instance of a ColumnSettings object created from a dictionary.
 
-         Args:
-             transform_settings (:obj:`TransformSettings`): The transform settings to be used
-                    for the text transformation.
+        Args:
+            dict_rep (dict): A dictionary containing the representation of a ColumnSettings object.
+                See also the instance method to_dict().
+
+        Returns:
+            An instance of a ColumnSettings object.
         """
-        self._transform_settings = transform_settings
+        return ColumnSettings(dict_rep['index'], prefix=dict_rep.get('prefix', ''), suffix=dict_rep.get('suffix', ''),
+                              escape_dialect=dict_rep.get('escape_dialect', None))
 
-    def transform(self, text):
+    def __init__(self, index, prefix='', suffix='', escape_dialect=None):
         """
-        Transforms the given text using the transform settings specified during initialization.
+        Initializes a new instance of a ColumnSettings object.
 
         Args:
-            text (str): The text to be transformed.
+            index (int): The zero-based index of the column in a row.
+            prefix (str): The prefix to be placed before every field of the column. Default is ''.
+            suffix (str): The suffix to be placed after every field of the column. Default is ''.
+            escape_dialect (str): One of ESCAPE_DIALECTS to escape every field of the column, e.g.
+                ESCAPE_DIALECT_SQL together with the prefix and suffix "'" for an SQL string literal.
+                Default is None, which means the escape dialect of the transform settings is used.
+
+        Raises:
+            ValueError: If index is negative or escape_dialect is not one of the supported escape dialects.
+        """
+        if index < 0:
+            raise ValueError("The index of a column must not be negative: {0!r}".format(index))
+        if escape_dialect not in ESCAPE_DIALECTS:
+            raise ValueError("Unknown escape dialect: {0!r}".format(escape_dialect))
+        self._index = index
+        self._prefix = prefix or ''
+        self._suffix = suffix or ''
+        self._escape_dialect = escape_dialect
+        self._key = (index, self._prefix, self._suffix, escape_dialect)
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def prefix(self):
+        return self._prefix
+
+    @property
+    def suffix(self):
+        return self._suffix
+
+    @property
+    def escape_dialect(self):
+        return self._escape_dialect
+
+    def to_dict(self):
+        """
+        Returns a representation of the current instance as a dictionary.
+        See also the static method from_dict().
 
         Returns:
-            A dictionary containing the transformed text (key: 'transformed_text')
-            and the count of text items (key: 'count_text_items').
+            A dictionary representing the current instance.
+        """
+        return {'index': self._index, 'prefix': self._prefix, 'suffix': self._suffix,
+                'escape_dialect': self._escape_dialect}
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnSettings):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return "ColumnSettings(index={0!r}, prefix={1!r}, suffix={2!r}, escape_dialect={3!r})".format(
+            self._index, self._prefix, self._suffix, self._escape_dialect)
+
+
+class TransformProfile(object):
+    """
+    Records the wall time, the count of text items and the size of the data passing every stage of a text
+    transformation, e.g. quoting, splitting, removing duplicates, sorting, joining and surrounding.
+
+    Pass an instance to TextTransformer.transform(), transform_stream(), transform_iter() or transform_file()
+    to profile a transformation. Without a profile the transformation is not instrumented at all.
+
+    The stages of a transformation are chained generators, so a stage pulling the data from the previous stage
+    would include its time. Every stage is therefore timed exclusively: the time spent in stages nested in it
+    is subtracted.
+
+    Attributes:
+        stages (:obj:`list` of :obj:`tuple`): The name, the seconds, the count of text items and the size
+            (characters or bytes) of every stage in the order the stages were first entered.
+    """
+    def __init__(self):
+        """
+        Initializes a new instance of an empty TransformProfile object.
+        """
+        # Maps the name of a stage to a list of its seconds, count of text items and size
+        self._stages = collections.OrderedDict()
+        # The time spent in nested stages for every stage that is currently running
+        self._nested_seconds = []
+
+    @property
+    def stages(self):
+        return [(stage, seconds, count_items, size) for stage, (seconds, count_items, size) in self._stages.items()]
+
+    @property
+    def total_seconds(self):
+        return sum(seconds for seconds, _, _ in self._stages.values())
+
+    def add(self, stage, seconds, count_items=0, size=0):
+        """
+        Adds the seconds, the count of text items and the size of some data processed by a stage.
+
+        Args:
+            stage (str): The name of the stage.
+            seconds (float): The wall time spent in the stage.
+            count_items (int): The count of text items processed. Default is 0.
+            size (int): The count of characters or bytes processed. Default is 0.
+        """
+        totals = self._stages.get(stage)
+        if totals is None:
+            self._stages[stage] = [seconds, count_items, size]
+        else:
+            totals[0] += seconds
+            totals[1] += count_items
+            totals[2] += size
+
+    @contextlib.contextmanager
+    def measure(self, stage, count_items=0, size=0):
+        """
+        Returns a context manager measuring the time spent in its block as time of the given stage.
+
+        Args:
+            stage (str): The name of the stage.
+            count_items (int): The count of text items processed in the block. Default is 0.
+            size (int): The count of characters or bytes processed in the block. Default is 0.
+        """
+        self._nested_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._finish(stage, start, count_items, size)
+
+    def iter_stage(self, stage, iterable):
+        """
+        Wraps an iterable, so the time spent producing every value is measured as time of the given stage.
+        The values are counted: a list counts its text items and their size, a str or bytes counts its size.
+
+        Args:
+            stage (str): The name of the stage.
+            iterable: The iterable to be wrapped.
+
+        Yields:
+            The values of the iterable.
+        """
+        iterator = iter(iterable)
+        while True:
+            self._nested_seconds.append(0.0)
+            start = time.perf_counter()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                self._finish(stage, start)
+                return
+            except BaseException:
+                self._finish(stage, start)
+                raise
+            if isinstance(value, list):
+                self._finish(stage, start, len(value), sum(map(len, value)))
+            else:
+                self._finish(stage, start, 0, len(value))
+            yield value
+
+    def report(self):
+        """
+        Returns a table of the stages with their seconds, share of the total time, count of text items and size.
+        """
+        total_seconds = self.total_seconds or 1
+        lines = ["{0:<20} {1:>10} {2:>7} {3:>12} {4:>14}".format('stage', 'ms', 'share', 'items', 'size')]
+        for stage, seconds, count_items, size in self.stages:
+            lines.append("{0:<20} {1:>10.1f} {2:>6.0%} {3:>12} {4:>14}".format(
+                stage, seconds * 1000, seconds / total_seconds, count_items, size))
+        return '\n'.join(lines)
+
+    def summary(self, count_stages=3):
+        """
+        Returns a single line naming the slowest stages and their milliseconds.
+
+        Args:
+            count_stages (int): The count of stages named. Default is 3.
+        """
+        slowest_stages = sorted(self.stages, key=lambda stage: stage[1], reverse=True)[:count_stages]
+        return ', '.join("{0} {1:.0f} ms".format(stage, seconds * 1000) for stage, seconds, _, _ in slowest_stages)
+
+    def _finish(self, stage, start, count_items=0, size=0):
+        """
+        Records the time since start as time of the stage, excluding the time spent in nested stages.
+        """
+        seconds = time.perf_counter() - start
+        nested_seconds = self._nested_seconds.pop()
+        if self._nested_seconds:
+            self._nested_seconds[-1] += seconds
+        self.add(stage, seconds - nested_seconds, count_items, size)
+
+
+class TextEscaper(object):
+    """
+    Escapes a text by a set of rules in a single pass over the text, e.g. all quote chars, backslashes and
+    control characters of a text at once.
+
+    The rules are compiled once during initialization into the cheapest operation applying all of them:
+    a single rule is applied by str.replace(), rules replacing characters by single characters by a
+    str.translate() table and all other rules by one precompiled regular expression. Rules consisting of
+    ASCII characters only are compiled for bytes as well.
+
+    Attributes:
+        rules (dict): The rules, mapping a str to be escaped to its escape sequence.
+        is_ascii (bool): Indicates if the rules consist of ASCII characters only, so escape_bytes() can be used.
+    """
+    def __init__(self, rules):
+        """
+        Initializes a new instance of a TextEscaper object.
+
+        Args:
+            rules (dict): Maps every str to be escaped to its escape sequence. Where two keys match at the same
+                position the longer key wins.
 
         Raises:
-            TypeError: If text is not of type str.
+            ValueError: If one of several rules has an empty key.
         """
-        if not text:
-            dict = {'transformed_text': text, 'count_text_items': 0}
-            return dict
+        self._rules = dict(rules)
+        self._is_ascii = all(key.isascii() and replacement.isascii() for key, replacement in self._rules.items())
+        self._escape = self._compile(self._rules)
+        self._escape_bytes = None
+        if self._is_ascii:
+            self._escape_bytes = self._compile({key.encode('ascii'): replacement.encode('ascii')
+                                                for key, replacement in self._rules.items()})
 
-        if type(text) is not str:
-            msg = "Given value is not of type str, but of type {0}".format(type(text))
-            raise TypeError(msg)
+    @property
+    def rules(self):
+        return dict(self._rules)
 
-        if self._transform_settings.quote_text:
-            text = self._quote_text(text)
+    @property
+    def is_ascii(self):
+        return self._is_ascii
 
-        lines = text.splitlines()
-        # removing empty lines
-        lines = [line for line in lines if len(line.strip()) > 0]
-        # stripping whitespace from the line
-        lines = [line.strip() for line in lines]
-        lines = self._place_prefix(lines)
-        lines = self._place_suffix(lines)
-        lines = self._place_delimiter(lines)
-        count_text_items = len(lines)
-        transformed_text = self._concatenate(lines)
-        transformed_text = self._surroundwithtext(transformed_text)
+    def escape(self, text):
+        """
+        Returns the given text with all rules applied.
 
-        dict = {'transformed_text': transformed_text, 'count_text_items': count_text_items}
-        return dict
+        Args:
+            text (str): The text to be escaped.
+        """
+        return self._escape(text)
 
-    def _quote_text(self, text):
+    def escape_bytes(self, data):
         """
-        Quotes the given text according to the transform settings specified during initialization.
+        Returns the given ASCII encoded text with all rules applied. Must only be used if is_ascii is set.
 
         Args:
-            text (str): The text to be quoted.
+            data (bytes): The text to be escaped.
+        """
+        return self._escape_bytes(data)
 
-        Returns:
-            The quoted text.
+    @staticmethod
+    def _compile(rules):
         """
-        escape_char = self._transform_settings.escape_char + self._transform_settings.quote_char
-        quoted_text = text.replace(self._transform_settings.quote_char, escape_char)
-        return quoted_text
+        Compiles the given rules into a callable escaping str or bytes, depending on the type of the keys.
+        """
+        if len(rules) == 1:
+            (key, replacement), = rules.items()
+            return operator.methodcaller('replace', key, replacement)
+
+        if not all(rules):
+            raise ValueError("The key of an escape rule must not be empty if there are several rules.")
+
+        if all(len(key) == 1 and len(replacement) == 1 for key, replacement in rules.items()):
+            if isinstance(next(iter(rules)), bytes):
+                table = bytes.maketrans(b''.join(rules), b''.join(rules.values()))
+            else:
+                table = str.maketrans(rules)
+            return operator.methodcaller('translate', table)
+
+        keys = sorted(rules, key=len, reverse=True)
+        escaped_keys = [re.escape(key) for key in keys]
+        if isinstance(keys[0], bytes):
+            empty, alternation, brackets = b'', b'|', (b'[', b']')
+        else:
+            empty, alternation, brackets = '', '|', ('[', ']')
+        if all(len(key) == 1 for key in keys):
+            # A character set is scanned considerably faster than an alternation of single characters
+            pattern = re.compile(brackets[0] + empty.join(escaped_keys) + brackets[1])
+        else:
+            pattern = re.compile(alternation.join(escaped_keys))
+        return functools.partial(pattern.sub, lambda match: rules[match.group()])
+
+
+class TextTemplate(object):
+    """
+    A template parsed once into its literal texts and its fields. It is rendered by concatenating the literal
+    texts and the values of the fields without parsing the template again.
+
+    The fields are the replacement fields of str.format() referring to one of the allowed field names,
+    optionally followed by an index in square brackets, a conversion and a format spec, e.g. {item},
+    {column[2]!r} or {index:04d}. The field {} refers to the field name '0'.
+
+    A template which can not be parsed or refers to an unknown field is created nevertheless, but rendering it
+    raises a TextTransformerError, so a broken template only fails if it is applied.
+    """
+    __slots__ = ('_template', '_literals', '_fields', '_error')
 
-    def _place_prefix(self, lines):
+    def __init__(self, template, field_names):
         """
-        Places the prefix specified in the transform settings before every line.
+        Initializes a new instance of a TextTemplate object.
 
         Args:
-            lines (:obj:`list` of :obj:`str`): The lines to be processed.
+            template (str): The template to be parsed.
+            field_names (dict): The names of the fields the template may refer to, mapped to whether they take
+                an index in square brackets.
+        """
+        self._template = template
+        self._literals = []
+        self._fields = []
+        self._error = None
+        try:
+            parsed = list(Formatter().parse(template))
+        except ValueError as e:
+            self._error = "The template {0!r} can not be parsed: {1}".format(template, e)
+            return
+
+        literal = ''
+        for literal_text, field_name, format_spec, conversion in parsed:
+            literal += literal_text
+            if field_name is None:
+                continue
+            match = _TEMPLATE_FIELD_PATTERN.fullmatch(field_name)
+            name = (match.group(1) or '0') if match else None
+            if name not in field_names or field_names[name] != (match.group(2) is not None):
+                self._error = "The template {0!r} contains the unknown field {{{1}}}".format(template, field_name)
+                return
+            if conversion is not None and conversion not in _TEMPLATE_CONVERSIONS or '{' in format_spec:
+                self._error = "The template {0!r} contains an unsupported conversion or format spec".format(template)
+                return
+            index = int(match.group(2)) if match.group(2) is not None else None
+            self._literals.append(literal)
+            self._fields.append(((name, index), conversion, format_spec))
+            literal = ''
+        self._literals.append(literal)
 
-        Returns:
-            The transformed lines.
+    @property
+    def template(self):
+        return self._template
+
+    @property
+    def keys(self):
         """
-        transformed_lines = []
-        for line in lines:
-            transformed_line = "{0}{1}".format(self._transform_settings.prefix, line)
-            transformed_lines.append(transformed_line)
-        return transformed_lines
+        The fields the template refers to as tuples of their name and their index (None without an index).
+        """
+        return tuple(key for key, _, _ in self._fields)
 
-    def _place_suffix(self, lines):
+    def split_affixes(self, key):
         """
-        Places the suffix specified in the transform settings after every line.
+        Splits the template into the text before and the text after its only field.
 
         Args:
-            lines (:obj:`list` of :obj:`str`): The lines to be processed.
+            key (tuple): The name and the index of the field, e.g. ('item', None).
 
         Returns:
-            The transformed lines.
+            A tuple containing the text before and the text after the field. None if the template does not
+            contain exactly one plain field with the given key, e.g. because the field has a format spec.
         """
-        transformed_lines = []
-        for line in lines:
-            transformed_line = "{0}{1}".format(line, self._transform_settings.suffix)
-            transformed_lines.append(transformed_line)
-        return transformed_lines
+        if self._error is not None or len(self._fields) != 1 or self._fields[0] != (key, None, ''):
+            return None
+        return self._literals[0], self._literals[1]
 
-    def _place_delimiter(self, lines):
+    def render(self, values):
         """
-        Places the delimiter specified in the transform settings between the lines.
+        Renders the template once.
 
-        Examples:
-            delimiter = ","
-            ['foo'] => ['foo']
-            ['foo', 'bar'] => ['foo,', 'bar']
-            ['foo', 'moo', 'bar'] => ['foo,', 'moo,' 'bar']
+        Args:
+            values (dict): The value of every field of the template, keyed like keys.
+
+        Returns:
+            The rendered template.
+
+        Raises:
+            TextTransformerError: If the template is broken or a value does not match its format spec.
+        """
+        return self.render_all({key: (value,) for key, value in values.items()}, 1)[0]
+
+    def render_all(self, values, count):
+        """
+        Renders the template count times. Every literal text and every field is turned into a sequence of
+        count pieces, which are concatenated by a single str.join() per rendered template.
 
         Args:
-            lines (:obj:`list` of :obj:`str`): The lines to be processed.
+            values (dict): The sequence of count values of every field of the template, keyed like keys. The values
+                of a field must be of the same type.
+            count (int): The count of templates to be rendered.
 
         Returns:
-            The transformed lines.
+            The rendered templates as a list of str.
+
+        Raises:
+            TextTransformerError: If the template is broken or a value does not match its format spec.
+        """
+        if self._error is not None:
+            raise TextTransformerError(self._error)
+
+        columns = []
+        for literal, (key, conversion, format_spec) in zip(self._literals, self._fields):
+            if literal:
+                columns.append(itertools.repeat(literal, count))
+            field_values = values[key]
+            if conversion is not None:
+                field_values = map(_TEMPLATE_CONVERSIONS[conversion], field_values)
+            if format_spec:
+                columns.append(map(format, field_values, itertools.repeat(format_spec)))
+            elif conversion is None and count and type(field_values[0]) is not str:
+                columns.append(map(str, field_values))
+            else:
+                # The values of a field are of the same type, so text values are concatenated as they are
+                columns.append(field_values)
+        if self._literals[-1]:
+            columns.append(itertools.repeat(self._literals[-1], count))
+
+        try:
+            if not columns:
+                return [''] * count
+            if len(columns) == 1:
+                return list(columns[0])
+            return list(map(''.join, zip(*columns)))
+        except (ValueError, TypeError) as e:
+            raise TextTransformerError("The template {0!r} can not be rendered: {1}".format(self._template, e))
+
+    def __repr__(self):
+        return "TextTemplate({0!r})".format(self._template)
+
+
+class TextTransformer(object):
+    """
+    Performs the transformation of a text using the specified transform settings.
+
+    The transform settings are compiled once during initialization: the separator placed between
+    two text items (suffix + delimiter + newline + prefix) and the parts of the surrounding text
+    are precomputed, so the transformation itself is a single pass over the lines of the text
+    followed by one str.join(). Use get_text_transformer() to reuse already compiled transformers.
+
+    If the transform settings specify a chunk_size, the text items are split into groups which are
+    placed into the surrounding text one by one and streamed out group by group.
+
+    If the transform settings remove duplicates or sort the text items, the text items pass these stages
+    between splitting and joining. Duplicates are removed by a set of the already seen text items, which keeps
+    the order of the text items. Sorting keeps up to sort_memory_budget bytes of text items in memory,
+    larger inputs are sorted in runs written to temporary files which are merged at the end. If the transform
+    settings specify a range_text, runs of consecutive integers are collapsed into ranges at last.
+
+    Texts consisting of integers only are processed by a fast path if an item stage is requested: the text is
+    validated by a regular expression and parsed into an array of 64-bit integers, which takes a fraction
+    of the memory of a list of str, and the stages work on the integers.
+
+    Every transformation can be profiled by passing a TransformProfile object, which records the time spent
+    in every stage. Profiled transformations are never run in parallel.
+
+    The lines are trimmed by str.strip() and friends mapped over all lines of a block, which beats a regular
+    expression anchored at every line. Collapsing whitespace is a single regular expression pass over the
+    block, unless the lines are trimmed on both sides, where str.split() and str.join() do both at once.
+
+    If the transform settings specify a column_delimiter, every line is parsed as a row by a csv reader block by
+    block and the selected columns are decorated column by column. The fields of a block are only kept until
+    its text items are formatted, so the rows are streamed just like lines.
+
+    The item template, the surrounding text and the output template are parsed into TextTemplate objects during
+    initialization. An item template only placing text around {item} is folded into the prefix and the suffix,
+    any other item template is rendered block by block after the item stages.
+
+    Quoting and escaping are done by TextEscaper objects compiled during initialization. The quote char is
+    escaped in the text before it is split, the escape dialect is applied to the text items of every block
+    joined by line feeds, which the text items never contain, so every block is escaped in a single pass.
+    """
+
+    def __init__(self, transform_settings, sort_memory_budget=None):
+        """
+         Initializes a new instance of a TextTransformer object.
+
+         Args:
+             transform_settings (:obj:`TransformSettings`): The transform settings to be used
+                    for the text transformation.
+             sort_memory_budget (int): Estimated count of bytes of the text items sorted in memory before
+                    they are written to a temporary file. Default is None, which means SORT_MEMORY_BUDGET.
         """
-        if len(lines) in [0, 1]:
-            return lines
-        transformed_lines = []
-        for i in range(0, len(lines) - 1):
-            line = lines[i]
-            transformed_line = "{0}{1}".format(line, self._transform_settings.delimiter)
-            transformed_lines.append(transformed_line)
-        transformed_lines.append(lines[-1])
+        self._transform_settings = transform_settings
+        self._sort_memory_budget = sort_memory_budget
+        self._has_item_stages = bool(transform_settings.remove_duplicates or transform_settings.sort_mode or
+                                     transform_settings.range_text)
+        self._integer_fast_path = self._has_item_stages and _is_quoting_integer_safe(transform_settings) and \
+            transform_settings.trim_mode == TRIM_MODE_BOTH and transform_settings.drop_blank_lines and \
+            not transform_settings.column_delimiter
+        self._item_template = None
+        prefix, suffix = transform_settings.prefix, transform_settings.suffix
+        if transform_settings.item_template:
+            item_template = TextTemplate(transform_settings.item_template,
+                                         _COLUMNAR_ITEM_TEMPLATE_FIELDS if transform_settings.column_delimiter
+                                         else _ITEM_TEMPLATE_FIELDS)
+            affixes = item_template.split_affixes(('item', None))
+            if affixes is None:
+                self._item_template = item_template
+            else:
+                # A template only placing text around the text item is folded into the prefix and the suffix
+                prefix, suffix = prefix + affixes[0], affixes[1] + suffix
+        self._template_columns = _get_template_columns(self._item_template)
+        # The text items are transformed in order if the output of a text item depends on the preceding ones
+        self._ordered_items = bool(transform_settings.chunk_size or self._has_item_stages or
+                                   self._item_template is not None)
+        self._split_items = _create_item_splitter(transform_settings, self._template_columns)
+        # The lines of a file can only be normalized as bytes if they are trimmed like _normalize_bytes_block() does
+        self._default_trimming = transform_settings.trim_mode == TRIM_MODE_BOTH and \
+            transform_settings.drop_blank_lines and not transform_settings.collapse_whitespace and \
+            not transform_settings.column_delimiter
+        self._quote_escaper = None
+        if transform_settings.quote_text:
+            quote_char = transform_settings.quote_char or ''
+            self._quote_escaper = TextEscaper({quote_char: (transform_settings.escape_char or '') + quote_char})
+        self._dialect_escaper = None
+        if transform_settings.escape_dialect and not transform_settings.column_delimiter:
+            # Columnar input is escaped field by field instead
+            self._dialect_escaper = get_text_escaper(transform_settings.escape_dialect)
+        self._prefix = prefix
+        self._suffix = suffix
+        newline_char = ' ' if transform_settings.line_up else os.linesep
+        self._separator = self._suffix + transform_settings.delimiter + newline_char + self._prefix
+        self._group_separator = newline_char
+        # The surrounding text is placed around every group. Without groups and ranges the output template is
+        # placed around the surrounding text, otherwise it is placed around all groups and ranges.
+        surrounding_template, output_template = (
+            TextTemplate(text, _SURROUNDING_TEMPLATE_FIELDS) if text else None
+            for text in (transform_settings.surrounding_text, transform_settings.output_template))
+        self._surrounding_templates = [template for template in (surrounding_template, output_template)
+                                       if template is not None]
+        self._output_templates = []
+        if (transform_settings.chunk_size or transform_settings.range_text) and output_template is not None:
+            self._surrounding_templates.remove(output_template)
+            self._output_templates.append(output_template)
+        self._surrounding_parts = _split_templates(self._surrounding_templates)
+        self._output_parts = _split_templates(self._output_templates)
 
-        return transformed_lines
+    @property
+    def transform_settings(self):
+        return self._transform_settings
 
-    def _concatenate(self, lines):
+    def transform(self, text, workers=None, cancel_event=None, profile=None):
         """
-        Concatenates the lines according to the transform settings specified during initialization.
+        Transforms the given text using the transform settings specified during initialization.
 
         Args:
-            lines (:obj:`list` of :obj:`str`): The lines to be processed.
+            text (str): The text to be transformed.
+            workers (int): Count of processes to transform the text in parallel. The text is split at line
+                boundaries into chunks of PARALLEL_CHUNK_SIZE characters, which are transformed by a pool
+                of processes. Texts smaller than PARALLEL_MIN_SIZE are always transformed by the current
+                process. Default is None, which means no parallel transformation. Texts are never transformed
+                in parallel if the transform settings specify a chunk_size, remove duplicates or sort.
+            cancel_event (:obj:`threading.Event`): If given, the text is transformed in chunks of
+                CANCEL_CHECK_SIZE characters and the transformation is cancelled as soon as the event
+                is set. Default is None.
+            profile (:obj:`TransformProfile`): If given, receives the time spent in every stage of the
+                transformation. Default is None.
 
         Returns:
-            The final version of the transformed text.
+            A dictionary containing the transformed text (key: 'transformed_text')
+            and the count of text items (key: 'count_text_items'). If the transform settings remove
+            duplicates, it also contains the count of removed text items (key: 'count_removed_duplicates').
+            If the transform settings specify a range_text, it also contains the count of ranges
+            (key: 'count_ranges'), the text items collapsed into ranges are part of the count of text items.
+
+        Raises:
+            TypeError: If text is not of type str.
+            TransformCancelledError: If the transformation was cancelled using cancel_event.
         """
-        if not self._transform_settings.line_up:
-            newline_char = os.linesep
+        if not text:
+            dict = self._create_stats()
+            dict['transformed_text'] = text
+            return dict
+
+        if type(text) is not str:
+            msg = "Given value is not of type str, but of type {0}".format(type(text))
+            raise TypeError(msg)
+
+        if self._integer_fast_path:
+            with _measure(profile, 'parse', size=len(text)):
+                integers = self._parse_integers(text, cancel_event)
+            if integers is not None:
+                return self._transform_integers(integers, profile)
+
+        if profile is not None:
+            blocks = self._iter_text_blocks(text, cancel_event) if cancel_event is not None else (text,)
+            return self._transform_item_blocks(self._normalize_blocks(blocks, profile), profile)
+
+        if self._ordered_items:
+            # Every group and every rendered index depends on the count of the preceding text items and
+            # the item stages depend on all preceding text items, so the text is processed in order
+            if cancel_event is not None:
+                item_blocks = self._iter_cancellable_items(text, cancel_event)
+            else:
+                item_blocks = (self._normalize_lines(text),)
+            return self._transform_item_blocks(item_blocks)
+
+        if workers and workers > 1 and len(text) >= PARALLEL_MIN_SIZE:
+            transformed_text, count_text_items = self._transform_parallel(text, workers)
+        elif cancel_event is not None:
+            transformed_text, count_text_items = self._transform_cancellable(text, cancel_event)
         else:
-            newline_char = ' '
+            items = self._normalize_lines(text)
+            count_text_items = len(items)
+            transformed_text = self._join_items(items)
+        transformed_text = self._surroundwithtext(transformed_text)
 
-        transformed_text = newline_char.join(lines)
-        return transformed_text
+        dict = {'transformed_text': transformed_text, 'count_text_items': count_text_items}
+        return dict
 
-    def _surroundwithtext(self, transformed_text):
+    def transform_iter(self, lines, profile=None):
         """
-        Places the transformed into the surrounding text in case it was specified during initialization.
+        Transforms the given lines piece by piece using the transform settings specified during initialization.
+
+        In contrast to transform() the input does not have to be held in memory as a whole. The lines are
+        consumed lazily and the transformed text is yielded in small pieces, so the memory consumption
+        does not grow with the size of the input. Joining all yielded pieces results in the same text
+        transform() returns for the concatenated input.
 
         Args:
-            transformed_text (str): The already transformed text.
+            lines (iterable of str): The lines to be transformed, e.g. a list of str or a file object opened
+                in text mode. A single str is treated like a text containing several lines.
+            profile (:obj:`TransformProfile`): If given, receives the time spent in every stage of the
+                transformation. Default is None.
 
-        Returns:
-            If no surrounding text was specified during initialization the transformed text is returned.
-            Otherwise the combination of the transformed text within the surrounding text is returned.
+        Yields:
+            The pieces of the transformed text.
 
         Raises:
-            TextTransformerError if formatting the text throws an exception.
+            TypeError: If one of the lines is not of type str.
+            TextTransformerError: If the surrounding text can not be applied.
         """
-        if self._transform_settings.surrounding_text:
-            try:
-                transformed_text = self._transform_settings.surrounding_text.format(transformed_text)
-            except IndexError as e:
-                errmsg = "The format of the surrounding text seems to be broken: {0}".format(str(e))
+        return self._generate_pieces(lines, self._create_stats(), profile)
+
+    def transform_stream(self, reader, writer, profile=None):
+        """
+        Transforms the text read from reader and writes the transformed text to writer as it goes.
+
+        Args:
+            reader (iterable of str): The lines to be transformed, e.g. a file object opened in text mode.
+            writer: Any object providing a write(str) method, e.g. a file object opened in text mode
+                or an output sink of the sinks module.
+            profile (:obj:`TransformProfile`): If given, receives the time spent in every stage of the
+                transformation including reading and writing. Default is None.
+
+        Returns:
+            A dictionary containing the count of text items (key: 'count_text_items') and, if the transform
+            settings remove duplicates, the count of removed text items (key: 'count_removed_duplicates').
+
+        Raises:
+            TypeError: If one of the lines is not of type str.
+            TextTransformerError: If the surrounding text can not be applied.
+        """
+        stats = self._create_stats()
+        pieces = self._generate_pieces(reader, stats, profile)
+        self._write_pieces(pieces, writer, profile)
+
+        return stats
+
+    def transform_into(self, text, writer, cancel_event=None, profile=None):
+        """
+        Transforms the given text held in memory and writes the transformed text to writer block by block.
+
+        In contrast to transform() the transformed text is never built as a whole: the text is split at line
+        boundaries into blocks of CANCEL_CHECK_SIZE characters, and the transformed text items of every block
+        are written as soon as they are joined. Only a surrounding text or an output template that can not be
+        split around the transformed text requires the transformed text to be buffered. Writing all pieces
+        results in the same text transform() returns.
+
+        Args:
+            text (str): The text to be transformed.
+            writer: Any object providing a write(str) method, e.g. an output sink of the sinks module.
+            cancel_event (:obj:`threading.Event`): If given, the transformation is cancelled as soon as the
+                event is set. The pieces written so far are kept by the writer. Default is None.
+            profile (:obj:`TransformProfile`): If given, receives the time spent in every stage of the
+                transformation including writing. Default is None.
+
+        Returns:
+            A dictionary containing the count of text items (key: 'count_text_items') and the further
+            statistics transform() returns, but not the transformed text.
+
+        Raises:
+            TypeError: If text is not of type str.
+            TextTransformerError: If the surrounding text can not be applied.
+            TransformCancelledError: If the transformation was cancelled using cancel_event.
+        """
+        stats = self._create_stats()
+        if not text:
+            return stats
+
+        if type(text) is not str:
+            msg = "Given value is not of type str, but of type {0}".format(type(text))
+            raise TypeError(msg)
+
+        if cancel_event is not None:
+            blocks = self._iter_text_blocks(text, cancel_event)
+        else:
+            blocks = (text[start:end] for start, end in self._iter_block_ranges(text, CANCEL_CHECK_SIZE))
+        ranges = []
+        item_blocks = self._apply_item_stages(self._normalize_blocks(blocks, profile), stats, ranges, profile)
+        self._write_pieces(self._generate_output(item_blocks, stats, ranges, profile=profile), writer, profile)
+        return stats
+
+    @staticmethod
+    def _write_pieces(pieces, writer, profile=None):
+        """
+        Writes the pieces of a transformed text to writer, measuring the time spent writing if profiled.
+        """
+        if profile is None:
+            for piece in pieces:
+                writer.write(piece)
+            return
+
+        for piece in pieces:
+            with profile.measure('write', size=len(piece)):
+                writer.write(piece)
+
+    def transform_file(self, path, out_path, encoding='utf-8', workers=None, profile=None):
+        """
+        Transforms the text of the file at path and writes the transformed text to the file at out_path.
+
+        The input file is memory-mapped and processed in blocks of about FILE_BLOCK_SIZE bytes which are cut
+        at line boundaries. For ASCII compatible encodings the lines of blocks containing only ASCII characters
+        are never decoded: they are split, quoted and stripped as bytes and written together with the encoded
+        prefix, suffix and delimiter. Other blocks are decoded, so the output is the same as the output of
+        transform() for the decoded text of the file. Encoded text items are only sorted as bytes for
+        ORDER_PRESERVING_ENCODINGS, otherwise the file is transformed as text. Files are transformed as text
+        as well if blank lines are kept or the input is columnar, as the blocks of bytes can not represent
+        a block of a single empty text item, and if the text items are rendered by an item template.
+
+        Args:
+            path (str): The path of the file to be transformed.
+            out_path (str): The path of the file the transformed text is written to.
+            encoding (str): The encoding of both files. Default is 'utf-8'.
+            workers (int): Count of processes to transform the file in parallel. Every process transforms
+                ranges of about PARALLEL_CHUNK_SIZE bytes of the file, which are written in order. Files
+                smaller than PARALLEL_MIN_SIZE are always transformed by the current process.
+                Default is None, which means no parallel transformation. Files are never transformed
+                in parallel if the transform settings specify a chunk_size, remove duplicates or sort.
+            profile (:obj:`TransformProfile`): If given, receives the time spent in every stage of the
+                transformation. Reading, quoting and splitting a block are one stage then. Default is None.
+
+        The transformed text is written to a temporary file next to out_path, which replaces out_path only
+        if the transformation succeeded. Otherwise the temporary file is removed and out_path is left untouched.
+
+        Returns:
+            A dictionary containing the count of text items (key: 'count_text_items') and, if the transform
+            settings remove duplicates, the count of removed text items (key: 'count_removed_duplicates').
+
+        Raises:
+            TextTransformerError: If the surrounding text can not be applied.
+            OSError: If one of the files can not be read or written.
+            UnicodeError: If the file is not encoded in the given encoding.
+        """
+        directory, name = os.path.split(os.path.abspath(out_path))
+        temp_path = os.path.join(directory, '.{0}.{1}.tmp'.format(name, uuid.uuid4().hex))
+        try:
+            stats = self._transform_file_to(path, temp_path, encoding, workers, profile)
+            os.replace(temp_path, out_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return stats
+
+    def _transform_file_to(self, path, out_path, encoding, workers, profile):
+        """
+        Transforms the text of the file at path and writes the transformed text directly to the file at out_path.
+        See transform_file() for the arguments and the result.
+        """
+        import mmap
+        codec_name = codecs.lookup(encoding).name
+        if self._surrounding_parts is None or self._output_parts is None or self._item_template is not None or \
+                codec_name not in ASCII_COMPATIBLE_ENCODINGS or \
+                (self._transform_settings.sort_mode and codec_name not in ORDER_PRESERVING_ENCODINGS) or \
+                not self._transform_settings.drop_blank_lines or self._transform_settings.column_delimiter:
+            with open(path, 'r', encoding=encoding) as reader, \
+                    open(out_path, 'w', encoding=encoding, newline='') as writer:
+                return self.transform_stream(reader, writer, profile)
+
+        stats = self._create_stats()
+        with open(path, 'rb') as input_file, open(out_path, 'wb') as output_file:
+            size = os.fstat(input_file.fileno()).st_size
+            if size == 0:
+                return stats
+
+            head, tail = self._surrounding_parts
+            with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if self._ordered_items or profile is not None:
+                    ranges = []
+                    item_blocks = (normalized_block.split(b'\n') for normalized_block in
+                                   self._normalize_file_range(mapped, 0, len(mapped), encoding))
+                    item_blocks = self._apply_item_stages(_profile_stage(profile, 'split', item_blocks), stats,
+                                                          ranges, profile)
+                    pieces = self._generate_output(item_blocks, stats, ranges, encoding, profile)
+                    self._write_pieces(pieces, output_file, profile)
+                    return stats
+
+                if workers and workers > 1 and size >= PARALLEL_MIN_SIZE:
+                    pieces = self._generate_parallel_file_items(mapped, path, encoding, workers, stats)
+                else:
+                    pieces = self._generate_file_items(mapped, encoding, stats)
+                output_file.write(head.encode(encoding))
+                for piece in pieces:
+                    output_file.write(piece)
+                output_file.write(tail.encode(encoding))
+
+        return stats
+
+    def _generate_file_items(self, mapped, encoding, stats):
+        """
+        Yields the encoded transformed text items of a memory-mapped file including their prefix,
+        suffix and delimiter.
+
+        Args:
+            mapped (:obj:`mmap.mmap`): The memory-mapped file to be transformed.
+            encoding (str): The encoding of the file, which must be one of ASCII_COMPATIBLE_ENCODINGS.
+            stats (dict): Receives the count of text items (key: 'count_text_items').
+
+        Yields:
+            The encoded pieces of the transformed text without the surrounding text.
+        """
+        prefix = self._prefix.encode(encoding)
+        separator = self._separator.encode(encoding)
+
+        count_text_items = 0
+        for transformed_range, count_range_items in self._transform_file_range(mapped, 0, len(mapped), encoding):
+            if not count_range_items:
+                continue
+            yield separator if count_text_items else prefix
+            yield transformed_range
+            count_text_items += count_range_items
+            stats['count_text_items'] = count_text_items
+
+        if count_text_items:
+            yield self._suffix.encode(encoding)
+
+    def _generate_parallel_file_items(self, mapped, path, encoding, workers, stats):
+        """
+        Yields the encoded transformed text items of a memory-mapped file including their prefix,
+        suffix and delimiter. The ranges of the file are transformed by a pool of processes.
+
+        Only a limited count of ranges is submitted in advance, so the transformed ranges waiting to be
+        written do not pile up in memory.
+
+        Args:
+            mapped (:obj:`mmap.mmap`): The memory-mapped file to be transformed.
+            path (str): The path of the file, which is memory-mapped by every process on its own.
+            encoding (str): The encoding of the file, which must be one of ASCII_COMPATIBLE_ENCODINGS.
+            workers (int): Count of processes.
+            stats (dict): Receives the count of text items (key: 'count_text_items').
+
+        Yields:
+            The encoded pieces of the transformed text without the surrounding text.
+        """
+        import concurrent.futures
+        prefix = self._prefix.encode(encoding)
+        separator = self._separator.encode(encoding)
+        ranges = self._iter_block_ranges(mapped, PARALLEL_CHUNK_SIZE)
+
+        count_text_items = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for start, end in itertools.islice(ranges, 2 * workers):
+                pending.append(executor.submit(_transform_file_range_in_worker, self._transform_settings,
+                                               path, start, end, encoding))
+            while pending:
+                transformed_range, count_range_items = pending.popleft().result()
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    pending.append(executor.submit(_transform_file_range_in_worker, self._transform_settings,
+                                                   path, next_range[0], next_range[1], encoding))
+                if not count_range_items:
+                    continue
+                yield separator if count_text_items else prefix
+                yield transformed_range
+                count_text_items += count_range_items
+                stats['count_text_items'] = count_text_items
+
+        if count_text_items:
+            yield self._suffix.encode(encoding)
+
+    def _transform_file_range(self, mapped, start, end, encoding):
+        """
+        Transforms the given range of a memory-mapped file block by block.
+
+        Args:
+            mapped (:obj:`mmap.mmap`): The memory-mapped file to be transformed.
+            start (int): The offset of the first byte of the range, which must be the start of a line.
+            end (int): The offset after the last byte of the range, which must be the end of a line.
+            encoding (str): The encoding of the file, which must be one of ASCII_COMPATIBLE_ENCODINGS.
+
+        Yields:
+            A tuple for every block containing the encoded text items of the block joined by the separator
+            (without prefix and suffix) and the count of text items of the block.
+        """
+        separator = self._separator.encode(encoding)
+        for normalized_block in self._normalize_file_range(mapped, start, end, encoding):
+            yield normalized_block.replace(b'\n', separator), normalized_block.count(b'\n') + 1
+
+    def _normalize_file_range(self, mapped, start, end, encoding):
+        """
+        Splits the given range of a memory-mapped file block by block into its encoded text items.
+
+        Args:
+            mapped (:obj:`mmap.mmap`): The memory-mapped file to be transformed.
+            start (int): The offset of the first byte of the range, which must be the start of a line.
+            end (int): The offset after the last byte of the range, which must be the end of a line.
+            encoding (str): The encoding of the file, which must be one of ASCII_COMPATIBLE_ENCODINGS.
+
+        Yields:
+            The encoded text items of every block containing text items, separated by a line feed.
+        """
+        quote_escaper, dialect_escaper = self._quote_escaper, self._dialect_escaper
+        bytes_processing = self._default_trimming
+        if quote_escaper is not None:
+            # Quoting must not introduce characters bytes.strip() treats differently than str.strip()
+            bytes_processing = bytes_processing and quote_escaper.is_ascii and not any(
+                self._contains_bytes_incompatible_whitespace(replacement.encode('ascii'))
+                for replacement in quote_escaper.rules.values())
+        if dialect_escaper is not None:
+            bytes_processing = bytes_processing and dialect_escaper.is_ascii
+
+        for block_start, block_end in self._iter_block_ranges(mapped, FILE_BLOCK_SIZE, start, end):
+            block = mapped[block_start:block_end]
+            if bytes_processing and block.isascii() and not self._contains_bytes_incompatible_whitespace(block):
+                if quote_escaper is not None:
+                    block = quote_escaper.escape_bytes(block)
+                normalized_block = self._normalize_bytes_block(block)
+                if dialect_escaper is not None:
+                    normalized_block = dialect_escaper.escape_bytes(normalized_block)
+            else:
+                # The text items are separated by a line break after the transformation, which
+                # can not be part of an encoded multibyte character in an ASCII compatible encoding
+                normalized_block = '\n'.join(self._normalize_lines(block.decode(encoding))).encode(encoding)
+            if normalized_block:
+                yield normalized_block
+
+    def _transform_cancellable(self, text, cancel_event):
+        """
+        Transforms the given text chunk by chunk and checks between two chunks whether the transformation
+        has been cancelled.
+
+        Args:
+            text (str): The text to be transformed.
+            cancel_event (:obj:`threading.Event`): The event signalling the transformation is to be cancelled.
+
+        Returns:
+            A tuple containing the transformed text without the surrounding text and the count of text items.
+
+        Raises:
+            TransformCancelledError: If cancel_event is set.
+        """
+        transformed_chunks = []
+        count_text_items = 0
+        for items in self._iter_cancellable_items(text, cancel_event):
+            if items:
+                transformed_chunks.append(self._separator.join(items))
+                count_text_items += len(items)
+
+        if not count_text_items:
+            return '', 0
+        transformed_text = self._prefix + self._separator.join(transformed_chunks) + self._suffix
+        return transformed_text, count_text_items
+
+    def _iter_cancellable_items(self, text, cancel_event):
+        """
+        Splits the given text chunk by chunk into its text items and checks between two chunks whether
+        the transformation has been cancelled.
+
+        Args:
+            text (str): The text to be processed.
+            cancel_event (:obj:`threading.Event`): The event signalling the transformation is to be cancelled.
+
+        Returns:
+            An iterator of the text items of every chunk as a list of str.
+
+        Raises:
+            TransformCancelledError: If cancel_event is set.
+        """
+        return map(self._normalize_lines, self._iter_text_blocks(text, cancel_event))
+
+    def _iter_text_blocks(self, text, cancel_event):
+        """
+        Splits the given text into blocks of CANCEL_CHECK_SIZE characters and checks between two blocks whether
+        the transformation has been cancelled.
+
+        Args:
+            text (str): The text to be processed.
+            cancel_event (:obj:`threading.Event`): The event signalling the transformation is to be cancelled.
+
+        Yields:
+            The blocks of the text.
+
+        Raises:
+            TransformCancelledError: If cancel_event is set.
+        """
+        for start, end in self._iter_block_ranges(text, CANCEL_CHECK_SIZE):
+            if cancel_event.is_set():
+                raise TransformCancelledError("The text transformation was cancelled.")
+            yield text[start:end]
+
+    def _transform_parallel(self, text, workers):
+        """
+        Transforms the given text by a pool of processes.
+
+        Args:
+            text (str): The text to be transformed.
+            workers (int): Count of processes.
+
+        Returns:
+            A tuple containing the transformed text without the surrounding text and the count of text items.
+        """
+        import concurrent.futures
+        chunks = (text[start:end] for start, end in self._iter_block_ranges(text, PARALLEL_CHUNK_SIZE))
+        transformed_chunks = []
+        count_text_items = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            transformed_results = executor.map(_transform_chunk_in_worker,
+                                               itertools.repeat(self._transform_settings), chunks)
+            for transformed_chunk, count_chunk_items in transformed_results:
+                if count_chunk_items:
+                    transformed_chunks.append(transformed_chunk)
+                    count_text_items += count_chunk_items
+
+        if not count_text_items:
+            return '', 0
+        transformed_text = self._prefix + self._separator.join(transformed_chunks) + self._suffix
+        return transformed_text, count_text_items
+
+    @staticmethod
+    def _contains_bytes_incompatible_whitespace(block):
+        """
+        Indicates if the given bytes contain a character that is treated as line break or whitespace
+        by str, but not by bytes. Every character is looked up with a single memchr() like scan.
+        """
+        return any(character in block for character in _BYTES_INCOMPATIBLE_WHITESPACE)
+
+    @staticmethod
+    def _normalize_bytes_block(block):
+        """
+        Normalizes a block of ASCII text, so it contains the stripped and non-empty lines separated by
+        exactly one line feed.
+
+        If no line of the block is padded with whitespace, the block is normalized with a few bytes.replace()
+        calls over the whole block, so no object is created per line. Otherwise the lines are stripped one by one.
+
+        Args:
+            block (bytes): The block to be normalized. It must not contain other whitespace than
+                spaces, tabs, carriage returns and line feeds.
+
+        Returns:
+            The normalized block.
+        """
+        if b'\r' in block:
+            block = block.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+        if (b' ' in block or b'\t' in block) and \
+                any(padded_line_break in block for padded_line_break in _BYTES_PADDED_LINE_BREAKS):
+            return b'\n'.join(filter(None, map(bytes.strip, block.split(b'\n'))))
+
+        while b'\n\n' in block:
+            block = block.replace(b'\n\n', b'\n')
+
+        return block.strip()
+
+    @staticmethod
+    def _iter_block_ranges(data, block_size, start=0, stop=None):
+        """
+        Splits a text, bytes or memory-mapped file into blocks of about block_size ending at a line break.
+
+        A carriage return followed by a line feed is never split, so the blocks can be split into lines
+        one by one even if blank lines are kept.
+
+        Args:
+            data (str, bytes or :obj:`mmap.mmap`): The data to be split.
+            block_size (int): The size of a block. A block is larger if a line does not fit into it.
+            start (int): The offset where the first block starts. Default is 0.
+            stop (int): The offset where the last block ends. Default is None, which means the end of data.
+
+        Yields:
+            The start and end offset of every block.
+        """
+        line_feed, carriage_return = ('\n', '\r') if isinstance(data, str) else (b'\n', b'\r')
+        if stop is None:
+            stop = len(data)
+        while start < stop:
+            end = start + block_size
+            if end >= stop:
+                end = stop
+            else:
+                boundary = max(data.rfind(line_feed, start, end), data.rfind(carriage_return, start, end))
+                if boundary == -1:
+                    # The line is longer than a block, so the block is extended to the end of the line
+                    boundary = data.find(line_feed, end, stop)
+                    if boundary == -1:
+                        boundary = stop - 1
+                elif data[boundary:boundary + 2] == carriage_return + line_feed:
+                    # A carriage return and a line feed are one line break, which is kept in one block
+                    boundary += 1
+                end = boundary + 1
+            yield start, end
+            start = end
+
+    def _generate_pieces(self, lines, stats, profile=None):
+        """
+        Yields the pieces of the transformed text including the surrounding text.
+
+        Just like transform() an empty input results in an empty output without the surrounding text.
+
+        Args:
+            lines (iterable of str): The lines to be transformed.
+            stats (dict): Receives the count of text items (key: 'count_text_items').
+            profile (:obj:`TransformProfile`): Receives the time spent in every stage. Default is None.
+
+        Yields:
+            The pieces of the transformed text.
+        """
+        keep_blank_lines = not self._transform_settings.drop_blank_lines
+        if isinstance(lines, str):
+            # Kept blank lines depend on every line ending, so a text is split just like transform() splits it
+            lines = lines.splitlines(keepends=True) if keep_blank_lines else (lines,)
+
+        chunks = iter(lines)
+        first_chunk = next((chunk for chunk in chunks if chunk or keep_blank_lines), None)
+        if first_chunk is None:
+            return
+        chunks = itertools.chain((first_chunk,), chunks)
+
+        # The chunks are read in batches of STREAM_BATCH_LINES which are split into text items as a block
+        ranges = []
+        blocks = _profile_stage(profile, 'read', self._iter_blocks(chunks, keep_blank_lines))
+        item_blocks = self._apply_item_stages(self._normalize_blocks(blocks, profile), stats, ranges, profile)
+        yield from self._generate_output(item_blocks, stats, ranges, profile=profile)
+
+    def _normalize_blocks(self, blocks, profile=None):
+        """
+        Splits the given blocks of text into their text items. If profiled, quoting and splitting are
+        measured as separate stages.
+
+        Args:
+            blocks (iterable of str): The blocks of text to be processed.
+            profile (:obj:`TransformProfile`): Receives the time spent in every stage. Default is None.
+
+        Returns:
+            An iterator of the text items of every block as a list of str.
+        """
+        if profile is None:
+            return map(self._normalize_lines, blocks)
+        if self._quote_escaper is not None:
+            blocks = profile.iter_stage('quote', map(self._quote_escaper.escape, blocks))
+        item_blocks = profile.iter_stage('split', map(self._split_items, blocks))
+        if self._dialect_escaper is not None:
+            item_blocks = profile.iter_stage('escape', map(self._escape_items, item_blocks))
+        return item_blocks
+
+    def _generate_output(self, item_blocks, stats, ranges=None, encoding=None, profile=None):
+        """
+        Yields the pieces of the transformed text of the given blocks of text items including the surrounding
+        text, followed by the ranges the item stages collapsed the runs of integers into, all of them placed
+        into the output template if requested. The text items are rendered by the item template first.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items to be joined.
+            stats (dict): Receives the count of text items (key: 'count_text_items').
+            ranges (:obj:`list` of :obj:`tuple`): The ranges of integers, which are complete as soon as
+                item_blocks is exhausted. Default is None.
+            encoding (str): If given, the text items are encoded as bytes and the pieces are encoded
+                using this encoding. The surrounding text and the output template must be splittable then
+                and there must not be an item template. Default is None.
+            profile (:obj:`TransformProfile`): Receives the time spent in every stage. Default is None.
+
+        Yields:
+            The pieces of the transformed text.
+        """
+        if self._item_template is not None:
+            item_blocks = _profile_stage(profile, 'render', self._render_item_blocks(item_blocks))
+        pieces = self._generate_content(item_blocks, stats, ranges, encoding, profile)
+        if not self._output_templates:
+            yield from pieces
+        elif self._output_parts is None:
+            content = ''.join(pieces)
+            with _measure(profile, 'surround', size=len(content)):
+                yield _apply_templates(self._output_templates, content)
+        else:
+            head, tail = self._output_parts
+            if encoding is not None:
+                head, tail = head.encode(encoding), tail.encode(encoding)
+            if head:
+                yield head
+            yield from pieces
+            if tail:
+                yield tail
+
+    def _render_item_blocks(self, item_blocks):
+        """
+        Renders the text items of the given blocks by the item template. The values of every field are
+        collected for a whole block, so the template is rendered block by block.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items to be rendered. If the item template refers
+                to columns, every text item is followed by the fields of these columns, each of them separated
+                by _TEMPLATE_FIELD_SEPARATOR.
+
+        Yields:
+            The rendered text items of every block as a list of str.
+
+        Raises:
+            TextTransformerError: If the item template is broken.
+        """
+        item_template = self._item_template
+        index = _ITEM_TEMPLATE_FIRST_INDEX
+        for items in item_blocks:
+            if not items:
+                continue
+            values = {('index', None): range(index, index + len(items))}
+            if self._template_columns:
+                fields = list(zip(*[item.split(_TEMPLATE_FIELD_SEPARATOR) for item in items]))
+                values[('item', None)] = fields[0]
+                for position, column_index in enumerate(self._template_columns, 1):
+                    values[('column', column_index)] = fields[position]
+            else:
+                values[('item', None)] = items
+            yield item_template.render_all(values, len(items))
+            index += len(items)
+
+    def _generate_content(self, item_blocks, stats, ranges=None, encoding=None, profile=None):
+        """
+        Yields the pieces of the transformed text of the given blocks of text items including the surrounding
+        text, followed by the ranges the item stages collapsed the runs of integers into.
+
+        If all text items were collapsed into ranges, only the ranges are yielded. Otherwise a text without
+        text items results in the bare surrounding text, just like transform().
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items to be joined.
+            stats (dict): Receives the count of text items (key: 'count_text_items').
+            ranges (:obj:`list` of :obj:`tuple`): The ranges of integers, which are complete as soon as
+                item_blocks is exhausted. Default is None.
+            encoding (str): If given, the text items are encoded as bytes and the pieces are encoded
+                using this encoding. The surrounding text must be splittable then. Default is None.
+            profile (:obj:`TransformProfile`): Receives the time spent in every stage. Default is None.
+
+        Yields:
+            The pieces of the transformed text.
+        """
+        if self._transform_settings.chunk_size:
+            yield from _profile_stage(profile, 'group', self._generate_groups(item_blocks, stats, encoding, ranges))
+        elif self._surrounding_parts is None:
+            # The surrounding text can not be split around the transformed text,
+            # so the transformed text needs to be buffered to be formatted as a whole.
+            transformed_text = ''.join(_profile_stage(profile, 'join', self._generate_items(item_blocks, stats)))
+            if transformed_text or not ranges:
+                with _measure(profile, 'surround', size=len(transformed_text)):
+                    transformed_text = self._surroundwithtext(transformed_text)
+                yield transformed_text
+        else:
+            head, tail = self._surrounding_parts
+            if encoding is not None:
+                head, tail = head.encode(encoding), tail.encode(encoding)
+            pieces = _profile_stage(profile, 'join', self._generate_items(item_blocks, stats, encoding))
+            # The surrounding text is left out if all text items end up in ranges,
+            # which is only known after the last block of text items
+            first_piece = next(pieces, None)
+            if first_piece is not None or not ranges:
+                if head:
+                    yield head
+                if first_piece is not None:
+                    yield first_piece
+                    yield from pieces
+                if tail:
+                    yield tail
+
+        if ranges:
+            yield from _profile_stage(profile, 'ranges', self._generate_ranges(ranges, stats, encoding))
+
+    def _generate_ranges(self, ranges, stats, encoding=None):
+        """
+        Yields the ranges of integers placed into the range text. The ranges are separated from each other
+        and from the preceding transformed text like groups of text items.
+
+        Args:
+            ranges (:obj:`list` of :obj:`tuple`): The first and the last integer of every range.
+            stats (dict): Holds the count of text items that are no part of a range (key: 'count_text_items'),
+                to which the count of integers in the ranges is added, and receives the count of ranges
+                (key: 'count_ranges').
+            encoding (str): If given, the pieces are encoded using this encoding. Default is None.
+
+        Yields:
+            The pieces of the ranges.
+
+        Raises:
+            TextTransformerError if formatting the range text throws an exception.
+        """
+        range_text = self._transform_settings.range_text
+        group_separator = self._group_separator if encoding is None else self._group_separator.encode(encoding)
+        separate = bool(stats['count_text_items'])
+        for first, last in ranges:
+            try:
+                range_piece = range_text.format(first, last)
+            except (IndexError, KeyError, ValueError) as e:
+                errmsg = "The format of the range text seems to be broken: {0}".format(str(e))
                 raise TextTransformerError(errmsg)
+            if separate:
+                yield group_separator
+            yield range_piece if encoding is None else range_piece.encode(encoding)
+            separate = True
+        stats['count_text_items'] += sum(last - first + 1 for first, last in ranges)
+        stats['count_ranges'] = len(ranges)
+
+    def _generate_items(self, item_blocks, stats, encoding=None):
+        """
+        Yields the transformed text items including their prefix, suffix and delimiter.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items to be joined.
+            stats (dict): Receives the count of text items (key: 'count_text_items').
+            encoding (str): If given, the text items are encoded as bytes and the pieces are encoded
+                using this encoding. Default is None.
+
+        Yields:
+            The pieces of the transformed text without the surrounding text.
+        """
+        prefix, separator, suffix = self._prefix, self._separator, self._suffix
+        if encoding is not None:
+            prefix, separator, suffix = prefix.encode(encoding), separator.encode(encoding), suffix.encode(encoding)
+
+        count_text_items = 0
+        for items in item_blocks:
+            if not items:
+                continue
+            yield separator if count_text_items else prefix
+            yield separator.join(items)
+            count_text_items += len(items)
+            stats['count_text_items'] = count_text_items
+
+        if count_text_items:
+            yield suffix
+
+    def _create_stats(self):
+        """
+        Returns a new dictionary receiving the statistics of a text transformation: the count of text items
+        (key: 'count_text_items') and, if the transform settings remove duplicates, the count of removed
+        text items (key: 'count_removed_duplicates').
+        """
+        stats = {'count_text_items': 0}
+        if self._transform_settings.remove_duplicates:
+            stats['count_removed_duplicates'] = 0
+        if self._transform_settings.range_text:
+            stats['count_ranges'] = 0
+        return stats
+
+    def _apply_item_stages(self, item_blocks, stats, ranges=None, profile=None):
+        """
+        Lets the blocks of text items pass the stages requested by the transform settings: removing duplicates,
+        sorting and collapsing runs of integers into ranges. Without any stage the blocks are returned as they are.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items, either str or encoded bytes.
+            stats (dict): Receives the count of removed text items (key: 'count_removed_duplicates').
+            ranges (list): Receives the first and the last integer of every range. Must be given if the
+                transform settings specify a range_text. Default is None.
+            profile (:obj:`TransformProfile`): Receives the time spent in every stage. Default is None.
+
+        Returns:
+            An iterable of the blocks of the processed text items.
+        """
+        if self._transform_settings.remove_duplicates:
+            item_blocks = _profile_stage(profile, 'remove_duplicates', self._remove_duplicates(item_blocks, stats))
+        if self._transform_settings.sort_mode:
+            item_blocks = _profile_stage(profile, 'sort', self._sort_items(item_blocks))
+        if self._transform_settings.range_text:
+            item_blocks = _profile_stage(profile, 'ranges', self._collapse_ranges(item_blocks, ranges))
+        return item_blocks
+
+    @staticmethod
+    def _remove_duplicates(item_blocks, stats):
+        """
+        Removes repeated text items and keeps the first occurrence of every text item.
+        The already seen text items are kept in a set, so every text item is looked up only once.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items.
+            stats (dict): Receives the count of removed text items (key: 'count_removed_duplicates').
+
+        Yields:
+            The blocks of unique text items.
+        """
+        seen_items = set()
+        count_removed_duplicates = 0
+        for items in item_blocks:
+            # dict.fromkeys() removes the duplicates within the block in C, keeping the order of the text items
+            unique_items = [item for item in dict.fromkeys(items) if item not in seen_items]
+            seen_items.update(unique_items)
+            count_removed_duplicates += len(items) - len(unique_items)
+            stats['count_removed_duplicates'] = count_removed_duplicates
+            yield unique_items
+
+    @staticmethod
+    def _collapse_ranges(item_blocks, ranges):
+        """
+        Collapses runs of at least RANGE_MIN_LENGTH consecutive ascending integers into ranges.
+        Only text items which are integers in their canonical form are taken into account, e.g. not '007'.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items, either str or encoded bytes.
+            ranges (list): Receives the first and the last integer of every range.
+
+        Yields:
+            The blocks of the text items which are no part of a range.
+        """
+        run_items = []
+        run_first = run_last = None
+        for items in item_blocks:
+            pattern = _INTEGER_ITEM_PATTERN if items and isinstance(items[0], str) else _INTEGER_ITEM_BYTES_PATTERN
+            remaining_items = []
+            for item in items:
+                value = int(item) if pattern.fullmatch(item) else None
+                if value is not None and run_items and value == run_last + 1:
+                    run_items.append(item)
+                    run_last = value
+                    continue
+                if len(run_items) >= RANGE_MIN_LENGTH:
+                    ranges.append((run_first, run_last))
+                else:
+                    remaining_items.extend(run_items)
+                if value is None:
+                    run_items = []
+                    remaining_items.append(item)
+                else:
+                    run_items = [item]
+                    run_first = run_last = value
+            yield remaining_items
+
+        if len(run_items) >= RANGE_MIN_LENGTH:
+            ranges.append((run_first, run_last))
+        else:
+            yield run_items
+
+    def _parse_integers(self, text, cancel_event=None):
+        """
+        Parses a text consisting of one integer per line into an array of 64-bit integers.
+
+        The text is processed in blocks of CANCEL_CHECK_SIZE characters. Every block is validated by a single
+        match of a regular expression before its integers are converted at once, so no str is kept per line.
+
+        Args:
+            text (str): The text to be parsed.
+            cancel_event (:obj:`threading.Event`): If given, the parsing is cancelled as soon as the event is set.
+                Default is None.
+
+        Returns:
+            The integers as an :obj:`array.array` of type 'q' or None if the text contains anything else than
+            canonical integers fitting into 64 bits, one per line.
+
+        Raises:
+            TransformCancelledError: If cancel_event is set.
+        """
+        integers = array.array('q')
+        for start, end in self._iter_block_ranges(text, CANCEL_CHECK_SIZE):
+            if cancel_event is not None and cancel_event.is_set():
+                raise TransformCancelledError("The text transformation was cancelled.")
+            block = text[start:end]
+            if not _INTEGER_TEXT_PATTERN.fullmatch(block):
+                return None
+            integers.extend(map(int, block.split()))
+        return integers
+
+    def _transform_integers(self, integers, profile=None):
+        """
+        Transforms the integers parsed from a text, letting them pass the item stages as integers.
+        The result is the same as the result of transforming the text items of the text.
+
+        Args:
+            integers (:obj:`array.array`): The integers to be processed.
+            profile (:obj:`TransformProfile`): Receives the time spent in every stage. Default is None.
+
+        Returns:
+            A dictionary like the one returned by transform().
+        """
+        settings = self._transform_settings
+        result = self._create_stats()
+        if settings.remove_duplicates:
+            count_integers = len(integers)
+            with _measure(profile, 'remove_duplicates', count_integers):
+                if settings.sort_mode == SORT_MODE_NUMERIC:
+                    # Sorting removes the order, so the duplicates can be removed by a set
+                    integers = array.array('q', sorted(set(integers)))
+                else:
+                    integers = array.array('q', dict.fromkeys(integers))
+            result['count_removed_duplicates'] = count_integers - len(integers)
+        with _measure(profile, 'sort', len(integers) if settings.sort_mode else 0):
+            if settings.sort_mode == SORT_MODE_NUMERIC and not settings.remove_duplicates:
+                integers = array.array('q', sorted(integers))
+            elif settings.sort_mode == SORT_MODE_LEXICAL:
+                integers = array.array('q', sorted(integers, key=str))
+
+        ranges = []
+        if settings.range_text:
+            with _measure(profile, 'ranges', len(integers)):
+                integers = _collapse_integer_ranges(integers, ranges)
+
+        item_blocks = (list(map(str, integers[start:start + STREAM_BATCH_LINES]))
+                       for start in range(0, len(integers), STREAM_BATCH_LINES))
+        item_blocks = _profile_stage(profile, 'format', item_blocks)
+        result['transformed_text'] = ''.join(self._generate_output(item_blocks, result, ranges, profile=profile))
+        return result
+
+    def _sort_items(self, item_blocks):
+        """
+        Sorts the text items according to the sort mode of the transform settings.
+
+        The text items are collected until their estimated size exceeds the memory budget. Then they are sorted
+        and written to a temporary file as a sorted run. At the end all runs are merged by a k-way merge, so only
+        one text item per run is held in memory. Inputs within the memory budget are sorted in memory.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items, either str or encoded bytes.
+
+        Yields:
+            The blocks of sorted text items.
+        """
+        import heapq
+        sort_key = _numeric_sort_key if self._transform_settings.sort_mode == SORT_MODE_NUMERIC else None
+        memory_budget = self._sort_memory_budget or SORT_MEMORY_BUDGET
+
+        run_files = []
+        try:
+            run_items = []
+            run_size = 0
+            for items in item_blocks:
+                run_items.extend(items)
+                run_size += sum(map(len, items)) + SORT_ITEM_OVERHEAD * len(items)
+                if run_size > memory_budget:
+                    binary = isinstance(run_items[0], bytes)
+                    run_items.sort(key=sort_key)
+                    run_files.append(_write_sort_run(run_items, binary))
+                    run_items = []
+                    run_size = 0
+
+            run_items.sort(key=sort_key)
+            if not run_files:
+                yield run_items
+                return
+
+            # The last run is merged from memory, it is smaller than the memory budget
+            runs = [_read_sort_run(run_file, binary) for run_file in run_files]
+            sorted_items = heapq.merge(*runs, run_items, key=sort_key)
+            while True:
+                items = list(itertools.islice(sorted_items, STREAM_BATCH_LINES))
+                if not items:
+                    return
+                yield items
+        finally:
+            for run_file in run_files:
+                run_file.close()
+
+    def _generate_groups(self, item_blocks, stats, encoding=None, ranges=None):
+        """
+        Yields the text items in groups of chunk_size text items. Every group gets its prefix, suffix and
+        delimiter and is placed into the surrounding text on its own. The groups are separated by a line break,
+        or by a space if the text items are lined up. Only the text items of the current group are held
+        in memory, apart from the block being processed.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items to be grouped.
+            stats (dict): Receives the count of text items (key: 'count_text_items').
+            encoding (str): If given, the text items are encoded as bytes and the pieces are encoded
+                using this encoding. The surrounding text must be splittable then. Default is None.
+            ranges (:obj:`list` of :obj:`tuple`): The ranges of integers collapsed by the item stages.
+                If all text items were collapsed, no group is yielded. Default is None.
+
+        Yields:
+            The pieces of the transformed text including the surrounding text of every group.
+        """
+        chunk_size = self._transform_settings.chunk_size
+        if encoding is None:
+            prefix, separator, suffix = self._prefix, self._separator, self._suffix
+            group_separator = self._group_separator
+            surround = self._surroundwithtext
+        else:
+            prefix, separator, suffix = (part.encode(encoding) for part in (self._prefix, self._separator,
+                                                                            self._suffix))
+            group_separator = self._group_separator.encode(encoding)
+            head, tail = (part.encode(encoding) for part in self._surrounding_parts)
+
+            def surround(joined_items):
+                return head + joined_items + tail
+
+        pending_items = []
+        count_text_items = 0
+        count_groups = 0
+        for items in item_blocks:
+            if not items:
+                continue
+            count_text_items += len(items)
+            stats['count_text_items'] = count_text_items
+            pending_items = pending_items + items if pending_items else items
+            count_full_items = len(pending_items) - len(pending_items) % chunk_size
+            for start in range(0, count_full_items, chunk_size):
+                if count_groups:
+                    yield group_separator
+                yield surround(prefix + separator.join(pending_items[start:start + chunk_size]) + suffix)
+                count_groups += 1
+            pending_items = pending_items[count_full_items:]
+
+        if pending_items:
+            if count_groups:
+                yield group_separator
+            yield surround(prefix + separator.join(pending_items) + suffix)
+        elif not count_text_items and not ranges:
+            # Just like without groups, a text without text items results in the bare surrounding text
+            yield surround(b'' if encoding else '')
+
+    @staticmethod
+    def _iter_blocks(chunks, keep_blank_lines=False):
+        """
+        Combines the given chunks to blocks of text containing up to STREAM_BATCH_LINES chunks.
+
+        The chunks are joined by a line break. As empty lines are dropped during the transformation
+        anyway, this gives the same text items no matter if the chunks keep their line endings or not.
+        If blank lines are kept, a line ending at the end of every chunk is removed and every chunk is
+        followed by a line break instead, so an empty chunk stands for a blank line.
+
+        Args:
+            chunks (iterable of str): The chunks of text to be combined.
+            keep_blank_lines (bool): Are blank lines kept by the transformation? Default is False.
+
+        Yields:
+            The blocks of text.
+
+        Raises:
+            TypeError: If one of the chunks is not of type str.
+        """
+        chunks = iter(chunks)
+        while True:
+            batch = list(itertools.islice(chunks, STREAM_BATCH_LINES))
+            if not batch:
+                return
+            try:
+                if keep_blank_lines:
+                    yield '\n'.join(map(_remove_line_ending, batch)) + '\n'
+                else:
+                    yield '\n'.join(batch)
+            except TypeError:
+                invalid_chunk = next(chunk for chunk in batch if type(chunk) is not str)
+                msg = "Given value is not of type str, but of type {0}".format(type(invalid_chunk))
+                raise TypeError(msg)
+
+    def _normalize_lines(self, text):
+        """
+        Splits the given text into its text items: the text is quoted if requested, split into lines,
+        the lines are trimmed and blank lines are removed according to the transform settings and the text
+        items are escaped if requested.
+
+        Args:
+            text (str): The text to be processed.
+
+        Returns:
+            The text items as a list of str.
+        """
+        if self._quote_escaper is not None:
+            text = self._quote_escaper.escape(text)
+        items = self._split_items(text)
+        if self._dialect_escaper is not None:
+            items = self._escape_items(items)
+        return items
+
+    def _escape_items(self, items):
+        """
+        Escapes the given text items according to the escape dialect of the transform settings.
+        The text items are joined by line feeds, which neither the text items nor the escape sequences
+        contain, so all text items are escaped in a single pass and split again.
+
+        Args:
+            items (:obj:`list` of :obj:`str`): The text items to be escaped.
+
+        Returns:
+            The escaped text items as a list of str.
+        """
+        if not items or self._dialect_escaper is None:
+            return items
+        return self._dialect_escaper.escape('\n'.join(items)).split('\n')
+
+    def _transform_items(self, items):
+        """
+        Transforms the given text items including the surrounding text.
+
+        Args:
+            items (:obj:`list` of :obj:`str`): The text items to be processed.
+
+        Returns:
+            A dictionary like the one returned by transform().
+        """
+        if self._ordered_items:
+            return self._transform_item_blocks((items,))
+        dict = {'transformed_text': self._surroundwithtext(self._join_items(items)), 'count_text_items': len(items)}
+        return dict
+
+    def _transform_item_blocks(self, item_blocks, profile=None):
+        """
+        Transforms the given blocks of text items in order, letting them pass the item stages and
+        splitting them into groups if requested by the transform settings.
+
+        Args:
+            item_blocks (iterable of list): The blocks of text items to be processed.
+            profile (:obj:`TransformProfile`): Receives the time spent in every stage. Default is None.
+
+        Returns:
+            A dictionary like the one returned by transform().
+        """
+        dict = self._create_stats()
+        ranges = []
+        item_blocks = self._apply_item_stages(item_blocks, dict, ranges, profile)
+        dict['transformed_text'] = ''.join(self._generate_output(item_blocks, dict, ranges, profile=profile))
+        return dict
+
+    def _join_items(self, items):
+        """
+        Places prefix, suffix and delimiter around the text items and concatenates them according to
+        the transform settings specified during initialization.
+
+        Examples:
+            prefix = "'", suffix = "'", delimiter = ",", line_up = True
+            ['foo'] => "'foo'"
+            ['foo', 'bar'] => "'foo', 'bar'"
+
+        Args:
+            items (:obj:`list` of :obj:`str`): The text items to be processed.
+
+        Returns:
+            The transformed text without the surrounding text.
+        """
+        if not items:
+            return ''
+        return self._prefix + self._separator.join(items) + self._suffix
+
+    def _quote_text(self, text):
+        """
+        Quotes the given text according to the transform settings specified during initialization.
+
+        Args:
+            text (str): The text to be quoted.
+
+        Returns:
+            The quoted text.
+        """
+        if self._quote_escaper is None:
+            return text
+        return self._quote_escaper.escape(text)
+
+    def _surroundwithtext(self, transformed_text):
+        """
+        Places the transformed into the surrounding text in case it was specified during initialization.
+        Without groups and ranges the result is placed into the output template as well.
+
+        Args:
+            transformed_text (str): The already transformed text.
+
+        Returns:
+            If no surrounding text was specified during initialization the transformed text is returned.
+            Otherwise the combination of the transformed text within the surrounding text is returned.
+
+        Raises:
+            TextTransformerError if formatting the text throws an exception.
+        """
+        if not self._surrounding_templates:
+            return transformed_text
+
+        if self._surrounding_parts is not None:
+            head, tail = self._surrounding_parts
+            transformed_text = head + transformed_text + tail
+        else:
+            transformed_text = _apply_templates(self._surrounding_templates, transformed_text)
 
         return transformed_text
+
+
+@functools.lru_cache(maxsize=TRANSFORMER_CACHE_SIZE)
+def get_text_transformer(transform_settings):
+    """
+    Returns a compiled TextTransformer object for the given transform settings.
+
+    The transformers are kept in a least recently used cache keyed by the transform settings,
+    so switching back and forth between presets reuses the already compiled transformers.
+
+    Args:
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used
+            for the text transformation.
+
+    Returns:
+        An instance of a TextTransformer object.
+    """
+    return TextTransformer(transform_settings)
+
+
+@functools.lru_cache(maxsize=None)
+def get_text_escaper(escape_dialect):
+    """
+    Returns the compiled TextEscaper object of an escape dialect.
+
+    Args:
+        escape_dialect (str): One of ESCAPE_DIALECTS except None.
+
+    Returns:
+        An instance of a TextEscaper object.
+
+    Raises:
+        ValueError: If escape_dialect is not one of the supported escape dialects.
+    """
+    rules = _ESCAPE_DIALECT_RULES.get(escape_dialect)
+    if rules is None:
+        raise ValueError("Unknown escape dialect: {0!r}".format(escape_dialect))
+    return TextEscaper(rules)
+
+
+def transform_many(text, transform_settings_list, workers=None, return_errors=False):
+    """
+    Transforms the given text using several transform settings at once.
+
+    The text is split into lines, trimmed and filtered only once per combination of the trim settings.
+    The text items are quoted once per combination of quote char and escape char and escaped once per
+    escape dialect, and every transform settings only joins the shared text items and applies its
+    surrounding text. If the quote char or the escape char of a transform settings contain whitespace,
+    quoting may change how the text is split and stripped, so the text is transformed from scratch for
+    that transform settings.
+
+    Args:
+        text (str): The text to be transformed.
+        transform_settings_list (:obj:`list` of :obj:`TransformSettings`): The transform settings to be used.
+        workers (int): Count of threads building the transformed texts concurrently. Default is None,
+            which means the transformed texts are built one after another.
+        return_errors (bool): If True, a TextTransformerError raised for a transform settings is returned in
+            place of its result instead of being raised. Default is False.
+
+    Returns:
+        A list with the result of every transform settings in the same order, each a dictionary
+        like the one returned by TextTransformer.transform().
+
+    Raises:
+        TypeError: If text is not of type str.
+        TextTransformerError: If a text transformation failed and return_errors is False.
+    """
+    text_transformers = [get_text_transformer(transform_settings) for transform_settings in transform_settings_list]
+
+    if text and type(text) is not str:
+        msg = "Given value is not of type str, but of type {0}".format(type(text))
+        raise TypeError(msg)
+
+    # Maps the trim settings, the quote key and the escape dialect to the shared text items
+    shared_items = {}
+    for text_transformer in text_transformers:
+        transform_settings = text_transformer.transform_settings
+        quote_key = _get_shareable_quote_key(transform_settings)
+        if not text or quote_key is False:
+            continue
+        trim_key = _get_trim_key(transform_settings)
+        if (trim_key, None, None) not in shared_items:
+            # Splitting, trimming and filtering the lines once for all transform settings with these trim settings
+            shared_items[(trim_key, None, None)] = text_transformer._split_items(text)
+        items = shared_items[(trim_key, None, None)]
+        if (trim_key, quote_key, None) not in shared_items:
+            # The text items neither contain line breaks nor does quoting add any,
+            # so the items can be quoted at once and split again.
+            quoted_text = text_transformer._quote_text('\n'.join(items))
+            shared_items[(trim_key, quote_key, None)] = quoted_text.split('\n') if items else []
+        items_key = (trim_key, quote_key, transform_settings.escape_dialect)
+        if items_key not in shared_items:
+            shared_items[items_key] = text_transformer._escape_items(shared_items[(trim_key, quote_key, None)])
+
+    def build_result(text_transformer):
+        transform_settings = text_transformer.transform_settings
+        try:
+            if not text:
+                return text_transformer.transform(text)
+            quote_key = _get_shareable_quote_key(transform_settings)
+            if quote_key is False:
+                return text_transformer.transform(text)
+
+            transformer_items = shared_items[(_get_trim_key(transform_settings), quote_key,
+                                              transform_settings.escape_dialect)]
+            return text_transformer._transform_items(transformer_items)
+        except TextTransformerError as e:
+            if return_errors:
+                return e
+            raise
+
+    if workers and workers > 1 and len(text_transformers) > 1:
+        import concurrent.futures
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(build_result, text_transformers))
+    return [build_result(text_transformer) for text_transformer in text_transformers]
+
+
+def _get_trim_key(transform_settings):
+    """
+    Returns the trim and column settings of a transform settings, which decide how a text is split into
+    its text items.
+    """
+    trim_key = (transform_settings.trim_mode, bool(transform_settings.collapse_whitespace),
+                bool(transform_settings.drop_blank_lines))
+    if not transform_settings.column_delimiter:
+        return trim_key
+    # The text items of columnar input are escaped field by field while they are split
+    # The fields an item template refers to follow the text items of columnar input
+    return trim_key + (transform_settings.column_delimiter, transform_settings.columns,
+                       transform_settings.column_separator, transform_settings.escape_dialect,
+                       transform_settings.item_template)
+
+
+def _get_shareable_quote_key(transform_settings):
+    """
+    Returns the key of the text items of a transform settings shared by transform_many(): None if the
+    transform settings do not quote, the quote char and the escape char if quoting is shareable and
+    False if the text has to be transformed from scratch.
+    """
+    if not transform_settings.quote_text:
+        return None
+    if not _is_quoting_shareable(transform_settings) or transform_settings.column_delimiter:
+        # Quoting the text of columnar input before parsing its rows may change the fields
+        return False
+    return transform_settings.quote_char, transform_settings.escape_char
+
+
+def _is_quoting_shareable(transform_settings):
+    """
+    Indicates if the text items of a transform settings can be quoted after splitting and stripping the text,
+    which gives the same text items as quoting the text before. This is the case if neither the quote char
+    nor the escape char contain whitespace, which includes all line breaks, and the quote char is not empty.
+    """
+    quote_char = transform_settings.quote_char or ''
+    escape_char = transform_settings.escape_char or ''
+    return bool(quote_char) and not any(char.isspace() for char in quote_char + escape_char)
+
+
+class IncrementalTransform(object):
+    """
+    Keeps the transformed text of a text in chunks of about INCREMENTAL_CHUNK_SIZE characters, so after
+    an edit of the text only the chunks containing the changed characters are transformed again.
+
+    The previous and the new text are compared to find the common characters at the start and at the end.
+    Only the chunks in between are quoted, split and stripped again, the kept chunks are joined by the
+    separator and the surrounding text is applied at the edges. Chunks always end after a line break,
+    which keeps them independent of each other.
+
+    Attributes:
+        transform_settings (:obj:`TransformSettings`): The transform settings used for the text transformation.
+    """
+    def __init__(self, transform_settings):
+        """
+        Initializes a new instance of an IncrementalTransform object.
+
+        Args:
+            transform_settings (:obj:`TransformSettings`): The transform settings to be used
+                for the text transformation.
+        """
+        self._transform_settings = transform_settings
+        self._text_transformer = get_text_transformer(transform_settings)
+        self._text = ''
+        # Every chunk is a tuple of its length, its text items joined by the separator
+        # (without prefix and suffix) and its count of text items.
+        self._chunks = []
+
+    @property
+    def transform_settings(self):
+        return self._transform_settings
+
+    def update(self, text, cancel_event=None):
+        """
+        Transforms the given text, which is usually an edited version of the previously transformed text.
+
+        Args:
+            text (str): The text to be transformed.
+            cancel_event (:obj:`threading.Event`): If given, the transformation is cancelled as soon as the
+                event is set. The state of the previous text is kept in that case. Default is None.
+
+        Returns:
+            A dictionary containing the transformed text (key: 'transformed_text')
+            and the count of text items (key: 'count_text_items'), just like TextTransformer.transform().
+
+        Raises:
+            TypeError: If text is not of type str.
+            TransformCancelledError: If the transformation was cancelled using cancel_event.
+        """
+        if not text or type(text) is not str:
+            return self._text_transformer.transform(text)
+        if self._text_transformer._ordered_items:
+            # Every group and every rendered index depends on the count of the preceding text items and
+            # the item stages depend on all preceding text items, so the text is transformed as a whole
+            return self._text_transformer.transform(text, cancel_event=cancel_event)
+
+        old_text = self._text
+        count_prefix_chars = _common_prefix_length(old_text, text)
+        max_suffix_chars = min(len(old_text), len(text)) - count_prefix_chars
+        count_suffix_chars = min(_common_suffix_length(old_text, text), max_suffix_chars)
+
+        # Finding the first chunk containing a changed character and the last chunk
+        # containing a changed character or the first unchanged character at the end.
+        # A chunk starting right at the first changed character is preceded by the chunk before, as
+        # a changed line feed may now follow the carriage return that ends the chunk before.
+        first_index, last_index = 0, len(self._chunks) - 1
+        region_start, chunk_end = 0, 0
+        suffix_start = len(old_text) - count_suffix_chars
+        for index, chunk in enumerate(self._chunks):
+            chunk_start, chunk_end = chunk_end, chunk_end + chunk[0]
+            if chunk_start < count_prefix_chars:
+                first_index, region_start = index, chunk_start
+            if chunk_end > suffix_start:
+                last_index = index
+                break
+        region_end = chunk_end if self._chunks else 0
+        new_region_end = len(text) - (len(old_text) - region_end)
+
+        changed_chunks = self._transform_region(text, region_start, new_region_end, cancel_event)
+        self._chunks[first_index:last_index + 1] = changed_chunks
+        self._text = text
+
+        transformed_chunks = [chunk[1] for chunk in self._chunks if chunk[2]]
+        count_text_items = sum(chunk[2] for chunk in self._chunks)
+        text_transformer = self._text_transformer
+        if count_text_items:
+            transformed_text = text_transformer._prefix + text_transformer._separator.join(transformed_chunks) + \
+                text_transformer._suffix
+        else:
+            transformed_text = ''
+        transformed_text = text_transformer._surroundwithtext(transformed_text)
+
+        return {'transformed_text': transformed_text, 'count_text_items': count_text_items}
+
+    def _transform_region(self, text, start, end, cancel_event):
+        """
+        Transforms the given region of the text in chunks.
+
+        Returns:
+            The list of transformed chunks.
+
+        Raises:
+            TransformCancelledError: If cancel_event is set.
+        """
+        text_transformer = self._text_transformer
+        chunks = []
+        for chunk_start, chunk_end in text_transformer._iter_block_ranges(text, INCREMENTAL_CHUNK_SIZE,
+                                                                           start, end):
+            if cancel_event is not None and cancel_event.is_set():
+                raise TransformCancelledError("The text transformation was cancelled.")
+            items = text_transformer._normalize_lines(text[chunk_start:chunk_end])
+            chunks.append((chunk_end - chunk_start, text_transformer._separator.join(items), len(items)))
+        return chunks
+
+
+def _common_prefix_length(text, other_text):
+    """
+    Returns the count of equal characters at the start of two texts.
+
+    The count is found by a binary search comparing slices of both texts,
+    so the characters are compared by C code instead of a loop over every character.
+    """
+    low, high = 0, min(len(text), len(other_text))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if other_text.startswith(text[low:middle], low):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix_length(text, other_text):
+    """
+    Returns the count of equal characters at the end of two texts.
+    See also _common_prefix_length().
+    """
+    length, other_length = len(text), len(other_text)
+    low, high = 0, min(length, other_length)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if other_text.endswith(text[length - middle:length - low], 0, other_length - low):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class TransformResultCache(object):
+    """
+    Keeps the results of text transformations, so transforming the same text with the same transform settings
+    once again, e.g. after switching between presets, does not redo the transformation.
+
+    The results are looked up by the digest of the text and the transform settings, so the cache does not
+    keep the texts themselves. The least recently used results are evicted as soon as the transformed texts
+    take more than max_bytes. The cache can be shared between threads.
+
+    Attributes:
+        max_bytes (int): Maximum count of bytes of the kept transformed texts.
+        hits (int): Count of transformations answered from the cache.
+        misses (int): Count of transformations that were not found in the cache.
+        size_bytes (int): Count of bytes of the kept transformed texts.
+    """
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        """
+        Initializes a new instance of an empty TransformResultCache object.
+
+        Args:
+            max_bytes (int): Maximum count of bytes of the kept transformed texts.
+                Default is RESULT_CACHE_MAX_BYTES.
+        """
+        import threading
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        # Maps the key of a result to a tuple of the result and its size in bytes, least recently used first
+        self._results = collections.OrderedDict()
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def size_bytes(self):
+        return self._size_bytes
+
+    def __len__(self):
+        return len(self._results)
+
+    def stats(self):
+        """
+        Returns the statistics of the cache.
+
+        Returns:
+            A dictionary containing the count of hits (key: 'hits'), of misses (key: 'misses'),
+            of kept results (key: 'entries'), of their bytes (key: 'bytes') and the maximum count
+            of bytes (key: 'max_bytes').
+        """
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'entries': len(self._results),
+                    'bytes': self._size_bytes, 'max_bytes': self._max_bytes}
+
+    def get(self, text, transform_settings):
+        """
+        Returns the cached result of a text transformation.
+
+        Args:
+            text (str): The text that was transformed.
+            transform_settings (:obj:`TransformSettings`): The transform settings that were used.
+
+        Returns:
+            A shallow copy of the result of TextTransformer.transform(), so the caller may modify it,
+            or None if it is not cached.
+        """
+        key = TransformResultCache._make_key(text, transform_settings)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._results.move_to_end(key)
+            return dict(entry[0])
+
+    def put(self, text, transform_settings, result):
+        """
+        Caches the result of a text transformation and evicts the least recently used results if necessary.
+        Results larger than max_bytes are not cached. A shallow copy of the result is cached, so the caller
+        may modify the result afterwards.
+
+        Args:
+            text (str): The text that was transformed.
+            transform_settings (:obj:`TransformSettings`): The transform settings that were used.
+            result (dict): The result of TextTransformer.transform().
+        """
+        key = TransformResultCache._make_key(text, transform_settings)
+        size_bytes = sys.getsizeof(result['transformed_text'])
+        if size_bytes > self._max_bytes:
+            return
+
+        with self._lock:
+            old_entry = self._results.pop(key, None)
+            if old_entry is not None:
+                self._size_bytes -= old_entry[1]
+            self._results[key] = (dict(result), size_bytes)
+            self._size_bytes += size_bytes
+            while self._size_bytes > self._max_bytes:
+                _, (_, evicted_size_bytes) = self._results.popitem(last=False)
+                self._size_bytes -= evicted_size_bytes
+
+    def transform(self, text, transform_settings, cancel_event=None):
+        """
+        Returns the cached result of a text transformation or transforms the text and caches the result.
+
+        Args:
+            text (str): The text to be transformed.
+            transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+            cancel_event (:obj:`threading.Event`): If given, the transformation is cancelled as soon as the
+                event is set. Default is None.
+
+        Returns:
+            The result of TextTransformer.transform().
+
+        Raises:
+            TextTransformerError: If the text transformation failed.
+            TransformCancelledError: If the transformation was cancelled using cancel_event.
+        """
+        result = self.get(text, transform_settings)
+        if result is None:
+            result = get_text_transformer(transform_settings).transform(text, cancel_event=cancel_event)
+            self.put(text, transform_settings, result)
+        return result
+
+    def clear(self):
+        """
+        Removes all results from the cache. The statistics of hits and misses are kept.
+        """
+        with self._lock:
+            self._results.clear()
+            self._size_bytes = 0
+
+    @staticmethod
+    def _make_key(text, transform_settings):
+        """
+        Returns the key of the result of a text transformation. Equal transform settings produce the same
+        key, as TransformSettings compares its normalized settings. The text is encoded in chunks of
+        RESULT_CACHE_DIGEST_CHUNK_SIZE characters, so a large text is never copied as a whole.
+        """
+        import hashlib
+        text = text or ''
+        hasher = hashlib.blake2b(digest_size=16)
+        for start in range(0, len(text), RESULT_CACHE_DIGEST_CHUNK_SIZE):
+            hasher.update(text[start:start + RESULT_CACHE_DIGEST_CHUNK_SIZE].encode('utf-8', 'surrogatepass'))
+        return len(text), hasher.digest(), transform_settings
+
+
+def _split_text_items(text):
+    """
+    Splits a text into its lines, strips them and removes empty lines.
+
+    Returns:
+        The text items as a list of str.
+    """
+    return list(filter(None, map(str.strip, text.splitlines())))
+
+
+def _split_templates(templates):
+    """
+    Splits nested surrounding templates into the text before and the text after the transformed text.
+
+    Args:
+        templates (:obj:`list` of :obj:`TextTemplate`): The templates, the innermost one first.
+
+    Returns:
+        A tuple containing the text before and the text after the transformed text, both empty without
+        templates. None if one of the templates does not contain exactly one plain field {} or {0}.
+    """
+    head, tail = '', ''
+    for template in templates:
+        affixes = template.split_affixes(('0', None))
+        if affixes is None:
+            return None
+        head, tail = affixes[0] + head, tail + affixes[1]
+    return head, tail
+
+
+def _apply_templates(templates, text):
+    """
+    Places a text into nested surrounding templates, the innermost one first.
+
+    Raises:
+        TextTransformerError: If one of the templates is broken.
+    """
+    for template in templates:
+        text = template.render({('0', None): text})
+    return text
+
+
+def _get_template_columns(item_template):
+    """
+    Returns the indexes of the columns an item template refers to in the order of their first occurrence,
+    an empty tuple without an item template.
+    """
+    if item_template is None:
+        return ()
+    return tuple(dict.fromkeys(index for name, index in item_template.keys if name == 'column'))
+
+
+def _create_item_splitter(transform_settings, template_columns=()):
+    """
+    Returns a function splitting a text into its text items according to the trim mode, collapse_whitespace and
+    drop_blank_lines of the transform settings. Every step is a single pass over all lines of the text.
+    """
+    if transform_settings.column_delimiter:
+        return _create_row_splitter(transform_settings, template_columns)
+
+    trim_mode = transform_settings.trim_mode
+    collapse_whitespace = transform_settings.collapse_whitespace
+    drop_blank_lines = transform_settings.drop_blank_lines
+    if trim_mode == TRIM_MODE_BOTH and drop_blank_lines and not collapse_whitespace:
+        return _split_text_items
+
+    trim = _TRIM_FUNCTIONS[trim_mode]
+
+    def split_text_items(text):
+        if collapse_whitespace and trim_mode != TRIM_MODE_BOTH:
+            text = _WHITESPACE_RUN_PATTERN.sub(' ', text)
+        lines = text.splitlines()
+        if collapse_whitespace and trim_mode == TRIM_MODE_BOTH:
+            # Splitting at whitespace and joining by a space collapses and strips at once
+            lines = map(' '.join, map(str.split, lines))
+        elif trim is not None:
+            lines = map(trim, lines)
+        if drop_blank_lines:
+            # A trimmed blank line is empty, an untrimmed one is empty once it is stripped
+            lines = filter(str.strip if trim is None else None, lines)
+        return list(lines)
+
+    return split_text_items
+
+
+def _create_row_splitter(transform_settings, template_columns=()):
+    """
+    Returns a function splitting a text into its rows and formatting the selected columns of every row as
+    a text item. The rows are parsed in blocks of ROW_BLOCK_SIZE rows. The fields of a block are trimmed,
+    collapsed and escaped column by column, each step mapping a single function over all fields of a column,
+    and every text item is formatted by one %-format of its fields. The fields of the template_columns
+    referred to by an item template follow the text item, separated by _TEMPLATE_FIELD_SEPARATOR.
+    """
+    column_delimiter = transform_settings.column_delimiter
+    column_separator = transform_settings.column_separator
+    drop_blank_lines = transform_settings.drop_blank_lines
+
+    def create_field_functions(escape_dialect):
+        functions = []
+        if transform_settings.collapse_whitespace:
+            functions.append(functools.partial(_WHITESPACE_RUN_PATTERN.sub, ' '))
+        if _TRIM_FUNCTIONS[transform_settings.trim_mode] is not None:
+            functions.append(_TRIM_FUNCTIONS[transform_settings.trim_mode])
+        if escape_dialect:
+            functions.append(get_text_escaper(escape_dialect).escape)
+        return functions
+
+    def apply_field_functions(fields, functions):
+        for function in functions:
+            fields = map(function, fields)
+        return fields
+
+    def create_splitter(format_rows):
+        if template_columns:
+            template_field_functions = create_field_functions(transform_settings.escape_dialect)
+            format_items = format_rows
+
+            def format_rows(rows):
+                items = format_items(rows)
+                if not items:
+                    return items
+                template_fields = [apply_field_functions(fields, template_field_functions)
+                                   for fields in _select_columns(rows, template_columns)]
+                return list(map(_TEMPLATE_FIELD_SEPARATOR.join, zip(items, *template_fields)))
+
+        def split_rows(text):
+            lines = text.splitlines()
+            if drop_blank_lines:
+                lines = list(filter(str.strip, lines))
+            if len(lines) <= ROW_BLOCK_SIZE:
+                return format_rows(_parse_rows(lines, column_delimiter))
+            items = []
+            for start in range(0, len(lines), ROW_BLOCK_SIZE):
+                items.extend(format_rows(_parse_rows(lines[start:start + ROW_BLOCK_SIZE], column_delimiter)))
+            return items
+
+        return split_rows
+
+    columns = transform_settings.columns
+    if not columns:
+        field_functions = create_field_functions(transform_settings.escape_dialect)
+
+        def format_all_columns(rows):
+            return [column_separator.join(apply_field_functions(row, field_functions)) for row in rows]
+
+        return create_splitter(format_all_columns)
+
+    indexes = [column.index for column in columns]
+    columns_field_functions = [create_field_functions(column.escape_dialect or transform_settings.escape_dialect)
+                               for column in columns]
+    row_format = column_separator.replace('%', '%%').join(
+        column.prefix.replace('%', '%%') + '%s' + column.suffix.replace('%', '%%') for column in columns)
+
+    def format_selected_columns(rows):
+        if not rows:
+            return []
+        formatted_columns = [apply_field_functions(fields, functions)
+                             for fields, functions in zip(_select_columns(rows, indexes), columns_field_functions)]
+        return list(map(row_format.__mod__, zip(*formatted_columns)))
+
+    return create_splitter(format_selected_columns)
+
+
+def _select_columns(rows, indexes):
+    """
+    Selects the fields of the given columns from the rows. Missing fields of short rows are empty.
+
+    Args:
+        rows (:obj:`list` of :obj:`list`): The fields of every row, at least one row.
+        indexes (sequence of int): The indexes of the columns to be selected.
+
+    Returns:
+        The fields of every selected column as a list of sequences of str.
+    """
+    select_fields = operator.itemgetter(*indexes)
+    try:
+        selected_fields = list(map(select_fields, rows))
+    except IndexError:
+        row_width = max(indexes) + 1
+        selected_fields = [select_fields(row if len(row) >= row_width else row + [''] * (row_width - len(row)))
+                           for row in rows]
+    return list(zip(*selected_fields)) if len(indexes) > 1 else [selected_fields]
+
+
+def _parse_rows(lines, column_delimiter):
+    """
+    Parses every line as a row by a csv reader.
+
+    A quoted field is never continued on the next line: if the csv reader merged lines, every line is
+    parsed on its own again, so the rows of a text are the same no matter how the text is split into blocks.
+
+    Returns:
+        The fields of every row as a list of lists of str.
+
+    Raises:
+        TextTransformerError: If a row can not be parsed, e.g. because a field exceeds the field size limit.
+    """
+    import csv
+    try:
+        rows = list(csv.reader(lines, delimiter=column_delimiter))
+        if len(rows) != len(lines):
+            rows = [next(csv.reader((line,), delimiter=column_delimiter), []) for line in lines]
+    except csv.Error as e:
+        raise TextTransformerError("A row of the columnar input can not be parsed: {0}".format(e))
+    return rows
+
+
+def _remove_line_ending(line):
+    """
+    Returns the line without a line break at its end.
+    """
+    if line.endswith('\r\n'):
+        return line[:-2]
+    if line and line[-1] in _LINE_BREAK_CHARS:
+        return line[:-1]
+    return line
+
+
+def _profile_stage(profile, stage, iterable):
+    """
+    Returns the iterable wrapped by TransformProfile.iter_stage() if a profile is given, otherwise the iterable.
+    """
+    if profile is None:
+        return iterable
+    return profile.iter_stage(stage, iterable)
+
+
+def _measure(profile, stage, count_items=0, size=0):
+    """
+    Returns the context manager of TransformProfile.measure() if a profile is given, otherwise a context manager
+    doing nothing.
+    """
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.measure(stage, count_items, size)
+
+
+def _is_quoting_integer_safe(transform_settings):
+    """
+    Indicates if quoting and escaping leave a text consisting of integers and whitespace unchanged, so the text
+    can be processed by the integer fast path of a TextTransformer.
+    """
+    escape_dialect = transform_settings.escape_dialect
+    if escape_dialect and get_text_escaper(escape_dialect).escape(_INTEGER_CHARS) != _INTEGER_CHARS:
+        return False
+    if not transform_settings.quote_text:
+        return True
+    quote_char = transform_settings.quote_char or ''
+    return any(not char.isspace() and char not in '-0123456789' for char in quote_char)
+
+
+def _collapse_integer_ranges(integers, ranges):
+    """
+    Collapses runs of at least RANGE_MIN_LENGTH consecutive ascending integers into ranges,
+    see also TextTransformer._collapse_ranges().
+
+    Args:
+        integers (:obj:`array.array`): The integers to be processed.
+        ranges (list): Receives the first and the last integer of every range.
+
+    Returns:
+        The integers which are no part of a range as an :obj:`array.array`.
+    """
+    remaining_integers = array.array('q')
+    count_integers = len(integers)
+    # The indexes where a run ends are found by iterators implemented in C, so only the ends of the runs
+    # are visited by the loop, and the integers between two ranges are copied at once
+    differences = map(operator.sub, itertools.islice(integers, 1, None), integers)
+    run_ends = itertools.compress(itertools.count(1), map((1).__ne__, differences))
+    run_start = remaining_start = 0
+    for run_end in itertools.chain(run_ends, (count_integers,)):
+        if run_end - run_start >= RANGE_MIN_LENGTH:
+            remaining_integers.extend(integers[remaining_start:run_start])
+            ranges.append((integers[run_start], integers[run_end - 1]))
+            remaining_start = run_end
+        run_start = run_end
+    remaining_integers.extend(integers[remaining_start:])
+    return remaining_integers
+
+
+def _numeric_sort_key(item):
+    """
+    Returns the key sorting a text item by its numeric value. Text items which are no numbers
+    follow the numbers and are sorted by their characters. Works for str and for encoded bytes.
+    """
+    try:
+        return 0, int(item), item
+    except ValueError:
+        pass
+    try:
+        number = float(item)
+    except ValueError:
+        return 1, 0, item
+    if number != number:
+        # NaN can not be compared to other numbers
+        return 1, 0, item
+    return 0, number, item
+
+
+def _write_sort_run(items, binary):
+    """
+    Writes a run of sorted text items to a new temporary file, one text item per line.
+    The text items never contain a line feed, as the text was split into lines before.
+
+    Returns:
+        The temporary file positioned at its start. It is deleted when it is closed.
+    """
+    import tempfile
+    run_file = tempfile.TemporaryFile()
+    for start in range(0, len(items), STREAM_BATCH_LINES):
+        batch = items[start:start + STREAM_BATCH_LINES]
+        if binary:
+            run_file.write(b'\n'.join(batch))
+        else:
+            run_file.write('\n'.join(batch).encode('utf-8', 'surrogatepass'))
+        run_file.write(b'\n')
+    run_file.seek(0)
+    return run_file
+
+
+def _read_sort_run(run_file, binary):
+    """
+    Yields the text items of a run written by _write_sort_run() one by one.
+    """
+    for line in run_file:
+        line = line[:-1]
+        yield line if binary else line.decode('utf-8', 'surrogatepass')
+
+
+def _transform_chunk_in_worker(transform_settings, chunk):
+    """
+    Transforms a chunk of a text in a worker process.
+
+    Returns:
+        A tuple containing the text items of the chunk joined by the separator (without prefix and suffix)
+        and the count of text items.
+    """
+    text_transformer = get_text_transformer(transform_settings)
+    items = text_transformer._normalize_lines(chunk)
+    return text_transformer._separator.join(items), len(items)
+
+
+def _transform_file_range_in_worker(transform_settings, path, start, end, encoding):
+    """
+    Transforms a range of a file in a worker process.
+
+    Returns:
+        A tuple containing the encoded text items of the range joined by the separator (without prefix
+        and suffix) and the count of text items.
+    """
+    import mmap
+    text_transformer = get_text_transformer(transform_settings)
+    separator = text_transformer._separator.encode(encoding)
+    with open(path, 'rb') as input_file, \
+            mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        transformed_blocks = []
+        count_range_items = 0
+        for transformed_block, count_block_items in text_transformer._transform_file_range(mapped, start,
+                                                                                           end, encoding):
+            transformed_blocks.append(transformed_block)
+            count_range_items += count_block_items
+    return separator.join(transformed_blocks), count_range_items
@@ -0,0 +1,112 @@
+import io
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+
+import sinks
+import teksto
+
+
+class FileSinkTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'output.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write(self):
+        with sinks.FileSink(self.path) as sink:
+            sink.write("'a',\r\n")
+            sink.write("'ä'")
+        self.assertEqual(9, sink.written_length)
+        with open(self.path, 'r', encoding='utf-8', newline='') as file:
+            self.assertEqual("'a',\r\n'ä'", file.read())
+
+    def test_abort_removes_file(self):
+        sink = sinks.FileSink(self.path)
+        sink.write('a' * 10)
+        sink.abort()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_exception_aborts(self):
+        with self.assertRaises(ValueError):
+            with sinks.FileSink(self.path) as sink:
+                sink.write('a')
+                raise ValueError()
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_gzip_file(self):
+        gzip_path = os.path.join(self.directory, 'output.sql')
+        with sinks.GzipFileSink(gzip_path) as sink:
+            for index in range(1000):
+                sink.write("'{0}',\n".format(index))
+        with gzip.open(gzip_path, 'rt', encoding='utf-8', newline='') as file:
+            self.assertEqual(''.join("'{0}',\n".format(index) for index in range(1000)), file.read())
+
+    def test_gzip_extension(self):
+        gzip_path = self.path + sinks.GZIP_EXTENSION
+        with sinks.FileSink(gzip_path) as sink:
+            sink.write('a,\nb')
+        with open(gzip_path, 'rb') as file:
+            self.assertEqual(b'a,\nb', gzip.decompress(file.read()))
+
+    def test_transform_into(self):
+        transformer = teksto.TextTransformer(teksto.TransformSettings("'", "'", ',', surrounding_text='IN ({0})'))
+        text = ''.join('{0}\n'.format(index) for index in range(10000))
+        with sinks.FileSink(self.path) as sink:
+            stats = transformer.transform_into(text, sink)
+        result = transformer.transform(text)
+        self.assertEqual(result['count_text_items'], stats['count_text_items'])
+        with open(self.path, 'r', encoding='utf-8', newline='') as file:
+            self.assertEqual(result['transformed_text'], file.read())
+
+
+class StdoutSinkTest(unittest.TestCase):
+    def test_write(self):
+        stream = io.StringIO()
+        with sinks.StdoutSink(stream) as sink:
+            sink.write('a,\r\n')
+            sink.write('b')
+        self.assertEqual('a,\r\nb', stream.getvalue())
+        self.assertEqual(5, sink.written_length)
+
+
+@unittest.skipIf(os.name == 'nt', "the clipboard tool is replaced by a POSIX shell")
+class ClipboardSinkTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'clipboard.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_chunks(self):
+        # A shell writing its stdin to a file stands in for the clipboard tool
+        with sinks.ClipboardSink(['sh', '-c', 'cat > "$0"', self.path], chunk_size=16) as sink:
+            for index in range(100):
+                sink.write("'ä{0}',\n".format(index))
+        with open(self.path, 'r', encoding=sinks.CLIPBOARD_ENCODING) as file:
+            self.assertEqual(''.join("'ä{0}',\n".format(index) for index in range(100)), file.read())
+
+    def test_failing_tool(self):
+        sink = sinks.ClipboardSink(['sh', '-c', 'cat > /dev/null; exit 3'])
+        sink.write('a')
+        with self.assertRaisesRegex(sinks.OutputSinkError, 'exit status 3'):
+            sink.close()
+
+    def test_missing_tool(self):
+        with self.assertRaises(sinks.OutputSinkError):
+            sinks.ClipboardSink([os.path.join(self.directory, 'missing-tool')])
+
+    def test_abort(self):
+        sink = sinks.ClipboardSink(['sh', '-c', 'cat > /dev/null'])
+        sink.write('a')
+        sink.abort()
+        self.assertIsNotNone(sink._process.returncode)
+
+
+if __name__ == '__main__':
+    unittest.main()
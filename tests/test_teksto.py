@@ -0,0 +1,386 @@
+import io
+import os
+import ast
+import json
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import teksto
+
+# The trim modes combined with collapsing whitespace in the file transformation tests
+TRIM_MODES = (teksto.TRIM_MODE_NONE, teksto.TRIM_MODE_LEFT, teksto.TRIM_MODE_RIGHT, teksto.TRIM_MODE_BOTH)
+# Texts whose kept blank lines depend on how the line endings are split
+LINE_ENDING_TEXTS = ('', 'a', 'a\n', 'a\n\n', 'a\r\r', 'a\r\x1e', 'a\r\x0c', '\r\r', 'a\r\n\r\n', ' \n\nb\r')
+
+
+class TransformFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def transform_file(self, transformer, text):
+        path = os.path.join(self.directory, 'input.txt')
+        out_path = os.path.join(self.directory, 'output.txt')
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            file.write(text)
+        transformer.transform_file(path, out_path)
+        with open(out_path, 'r', encoding='utf-8', newline='') as file:
+            return file.read()
+
+    def test_trim_modes_with_quoting(self):
+        text = '  a  b\n c\tc \n'
+        for trim_mode in TRIM_MODES:
+            for collapse_whitespace in (False, True):
+                with self.subTest(trim_mode=trim_mode, collapse_whitespace=collapse_whitespace):
+                    transformer = teksto.TextTransformer(teksto.TransformSettings(
+                        '', '', ',\n', quote_text=True, trim_mode=trim_mode,
+                        collapse_whitespace=collapse_whitespace))
+                    self.assertEqual(transformer.transform(text)['transformed_text'],
+                                     self.transform_file(transformer, text))
+
+    def test_invalid_encoding_keeps_output(self):
+        path = os.path.join(self.directory, 'input.txt')
+        out_path = os.path.join(self.directory, 'output.txt')
+        with open(path, 'wb') as file:
+            file.write(b'a\n\xff\xfe\nb\n')
+        transformer = teksto.TextTransformer(teksto.TransformSettings('', '', ','))
+        with self.assertRaises(UnicodeDecodeError):
+            transformer.transform_file(path, out_path)
+        self.assertEqual(['input.txt'], os.listdir(self.directory))
+
+
+class TransformIterTest(unittest.TestCase):
+    def test_kept_blank_lines(self):
+        for text in LINE_ENDING_TEXTS:
+            for quote_text in (False, True):
+                with self.subTest(text=text, quote_text=quote_text):
+                    transformer = teksto.TextTransformer(teksto.TransformSettings(
+                        '<', '>', ',', quote_text=quote_text, surrounding_text='[{0}]', drop_blank_lines=False))
+                    self.assertEqual(transformer.transform(text)['transformed_text'],
+                                     ''.join(transformer.transform_iter(text)))
+
+    def test_empty_text(self):
+        transformer = teksto.TextTransformer(teksto.TransformSettings('<', '>', ',', surrounding_text='[{0}]',
+                                                                      drop_blank_lines=False))
+        self.assertEqual('', ''.join(transformer.transform_iter('')))
+
+
+
+class TransformResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.transform_settings = teksto.TransformSettings("'", "'", ',')
+
+    @staticmethod
+    def create_result(length):
+        return {'transformed_text': 'x' * length, 'count_text_items': 1}
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        size_bytes = sys.getsizeof('x' * 100)
+        cache = teksto.TransformResultCache(max_bytes=2 * size_bytes)
+        cache.put('a', self.transform_settings, self.create_result(100))
+        cache.put('b', self.transform_settings, self.create_result(100))
+        self.assertIsNotNone(cache.get('a', self.transform_settings))
+        cache.put('c', self.transform_settings, self.create_result(100))
+
+        self.assertIsNone(cache.get('b', self.transform_settings))
+        self.assertIsNotNone(cache.get('a', self.transform_settings))
+        self.assertIsNotNone(cache.get('c', self.transform_settings))
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2 * size_bytes, cache.size_bytes)
+
+    def test_skips_results_larger_than_budget(self):
+        cache = teksto.TransformResultCache(max_bytes=100)
+        cache.put('a', self.transform_settings, self.create_result(200))
+        self.assertEqual(0, len(cache))
+
+    def test_stats(self):
+        cache = teksto.TransformResultCache()
+        cache.transform('1\n2', self.transform_settings)
+        cache.transform('1\n2', self.transform_settings)
+        cache.transform('1\n3', self.transform_settings)
+        stats = cache.stats()
+        self.assertEqual((1, 2, 2), (stats['hits'], stats['misses'], stats['entries']))
+        self.assertEqual(cache.size_bytes, stats['bytes'])
+        self.assertEqual(teksto.RESULT_CACHE_MAX_BYTES, stats['max_bytes'])
+
+    def test_changed_settings_miss(self):
+        cache = teksto.TransformResultCache()
+        other_settings = teksto.TransformSettings('"', '"', ',')
+        self.assertEqual("'1',\n'2'", cache.transform('1\n2', self.transform_settings)['transformed_text'])
+        self.assertEqual('"1",\n"2"', cache.transform('1\n2', other_settings)['transformed_text'])
+        self.assertEqual(0, cache.hits)
+        # Equal settings created anew hit the cached result
+        cache.transform('1\n2', teksto.TransformSettings('"', '"', ','))
+        self.assertEqual(1, cache.hits)
+
+    def test_chunked_digest(self):
+        cache = teksto.TransformResultCache()
+        text = 'a\n' * (teksto.RESULT_CACHE_DIGEST_CHUNK_SIZE // 2) + 'b'
+        cache.transform(text, self.transform_settings)
+        self.assertIsNone(cache.get(text[:-1] + 'c', self.transform_settings))
+        self.assertIsNotNone(cache.get(text, self.transform_settings))
+
+    def test_results_are_copies(self):
+        cache = teksto.TransformResultCache()
+        result = cache.transform('1\n2', self.transform_settings)
+        result['transformed_text'] = 'changed'
+        cached_result = cache.get('1\n2', self.transform_settings)
+        cached_result['count_text_items'] = 0
+        self.assertEqual({'transformed_text': "'1',\n'2'", 'count_text_items': 2},
+                         cache.get('1\n2', self.transform_settings))
+
+
+class SortTest(unittest.TestCase):
+    def setUp(self):
+        generator = random.Random(42)
+        self.words = [''.join(generator.choice('abcdef') for _ in range(generator.randint(1, 6)))
+                      for _ in range(2000)]
+
+    def transform_spilled(self, transform_settings, text):
+        # The lines are streamed in small blocks, so the tiny memory budget spills several sorted runs
+        transformer = teksto.TextTransformer(transform_settings, sort_memory_budget=1024)
+        writer = io.StringIO()
+        with mock.patch.object(teksto, 'STREAM_BATCH_LINES', 100), \
+                mock.patch.object(teksto, '_write_sort_run', wraps=teksto._write_sort_run) as write_sort_run:
+            stats = transformer.transform_stream(text.splitlines(), writer)
+        stats['transformed_text'] = writer.getvalue()
+        self.assertGreater(write_sort_run.call_count, 1)
+        self.assertEqual(transformer.transform(text), stats)
+        return stats
+
+    def test_remove_duplicates(self):
+        result = teksto.TextTransformer(teksto.TransformSettings('', '', ',', remove_duplicates=True)).transform(
+            'b\na\nb\nc\na')
+        self.assertEqual('b,a,c', result['transformed_text'].replace('\n', ''))
+        self.assertEqual(3, result['count_text_items'])
+        self.assertEqual(2, result['count_removed_duplicates'])
+
+    def test_external_sort(self):
+        transform_settings = teksto.TransformSettings('', '', '|', sort_mode=teksto.SORT_MODE_LEXICAL)
+        result = self.transform_spilled(transform_settings, '\n'.join(self.words))
+        self.assertEqual(sorted(self.words), result['transformed_text'].split('|\n'))
+
+    def test_external_sort_removing_duplicates(self):
+        transform_settings = teksto.TransformSettings('', '', '|', sort_mode=teksto.SORT_MODE_LEXICAL,
+                                                      remove_duplicates=True)
+        result = self.transform_spilled(transform_settings, '\n'.join(self.words))
+        self.assertEqual(sorted(set(self.words)), result['transformed_text'].split('|\n'))
+        self.assertEqual(len(self.words) - len(set(self.words)), result['count_removed_duplicates'])
+
+    def test_external_numeric_sort(self):
+        # The word keeps the text items off the integer fast path and is sorted after the numbers
+        numbers = [random.Random(number).randint(-10 ** 6, 10 ** 6) for number in range(2000)]
+        transform_settings = teksto.TransformSettings('', '', '|', sort_mode=teksto.SORT_MODE_NUMERIC)
+        result = self.transform_spilled(transform_settings, '\n'.join(map(str, numbers)) + '\nword')
+        self.assertEqual([str(number) for number in sorted(numbers)] + ['word'],
+                         result['transformed_text'].split('|\n'))
+
+
+class IntegerFastPathTest(unittest.TestCase):
+    # Settings taking the integer fast path
+    SETTINGS = ({'remove_duplicates': True}, {'sort_mode': teksto.SORT_MODE_NUMERIC},
+                {'range_text': '{0}..{1}'},
+                {'range_text': 'BETWEEN {0} AND {1}', 'sort_mode': teksto.SORT_MODE_NUMERIC, 'remove_duplicates': True},
+                {'range_text': '{0}-{1}', 'sort_mode': teksto.SORT_MODE_LEXICAL, 'quote_text': True,
+                 'quote_char': "'"})
+    # Runs of negative numbers and the largest integers of the fast path, padded by whitespace and separated
+    # by several line breaks
+    TEXTS = ('3\n-2\n-1\n0\n1\n2\n2\n 5 \r\n4\n\n6',
+             '999999999999999999\n-999999999999999999\n999999999999999998\n999999999999999997\n'
+             '-999999999999999998\n-999999999999999997',
+             '-5\n-4\n-3\n-3\n-7\n-6')
+    # Texts the fast path rejects: integers of 19 digits like the int64 boundaries, which are left to the text path
+    # so no integer can overflow, and integers not in their canonical form
+    REJECTED_TEXTS = ('9223372036854775807\n-9223372036854775808\n9223372036854775806\n9223372036854775805\n'
+                      '-9223372036854775807\n-9223372036854775806',
+                      '9223372036854775808\n9223372036854775809\n9223372036854775810',
+                      '007\n8\n9', '1\n2\nthree', '+1\n2\n3')
+
+    def assert_text_path(self, settings, text, fast_path):
+        transform_settings = teksto.TransformSettings('', '', ',', **settings)
+        transformer = teksto.TextTransformer(transform_settings)
+        self.assertTrue(transformer._integer_fast_path)
+        with mock.patch.object(teksto.TextTransformer, '_transform_integers', autospec=True,
+                               side_effect=teksto.TextTransformer._transform_integers) as transform_integers:
+            result = transformer.transform(text)
+        self.assertEqual(fast_path, transform_integers.called)
+
+        text_transformer = teksto.TextTransformer(transform_settings)
+        text_transformer._integer_fast_path = False
+        self.assertEqual(text_transformer.transform(text), result)
+
+    def test_fast_path_matches_text_path(self):
+        for settings in self.SETTINGS:
+            for text in self.TEXTS:
+                with self.subTest(settings=settings, text=text):
+                    self.assert_text_path(settings, text, True)
+
+    def test_rejected_texts_match_text_path(self):
+        for settings in self.SETTINGS:
+            for text in self.REJECTED_TEXTS:
+                with self.subTest(settings=settings, text=text):
+                    self.assert_text_path(settings, text, False)
+
+    def test_range_collapse(self):
+        transform_settings = teksto.TransformSettings('', '', ',', sort_mode=teksto.SORT_MODE_NUMERIC,
+                                                      range_text='{0}..{1}')
+        result = teksto.TextTransformer(transform_settings).transform('-2\n-1\n0\n7\n1\n9\n10')
+        self.assertEqual('7,\n9,\n10\n-2..1', result['transformed_text'])
+        self.assertEqual(1, result['count_ranges'])
+        self.assertEqual(7, result['count_text_items'])
+
+
+class EscapeDialectTest(unittest.TestCase):
+    # A text item containing quotes, a backslash, a tab and control characters
+    TEXT_ITEM = 'it\'s "q" a\\b\tc\x01d\x7f'
+    EXPECTED = {
+        teksto.ESCAPE_DIALECT_SQL: 'it\'\'s "q" a\\b\tc\x01d\x7f',
+        teksto.ESCAPE_DIALECT_PYTHON: 'it\\\'s \\"q\\" a\\\\b\\tc\\x01d\\x7f',
+        teksto.ESCAPE_DIALECT_JSON: 'it\'s \\"q\\" a\\\\b\\tc\\u0001d\x7f',
+        teksto.ESCAPE_DIALECT_CSV: 'it\'s ""q"" a\\b\tc\x01d\x7f',
+        teksto.ESCAPE_DIALECT_SHELL: 'it\'\\\'\'s "q" a\\b\tc\x01d\x7f',
+    }
+
+    def test_text_items(self):
+        for escape_dialect, expected in self.EXPECTED.items():
+            with self.subTest(escape_dialect=escape_dialect):
+                transform_settings = teksto.TransformSettings('', '', '|', escape_dialect=escape_dialect)
+                result = teksto.TextTransformer(transform_settings).transform(self.TEXT_ITEM + '\n' + self.TEXT_ITEM)
+                self.assertEqual(expected + '|\n' + expected, result['transformed_text'])
+
+    def test_escaped_python_and_json_literals(self):
+        python_item = teksto.get_text_escaper(teksto.ESCAPE_DIALECT_PYTHON).escape(self.TEXT_ITEM)
+        self.assertEqual(self.TEXT_ITEM, ast.literal_eval("'" + python_item + "'"))
+        json_item = teksto.get_text_escaper(teksto.ESCAPE_DIALECT_JSON).escape(self.TEXT_ITEM)
+        self.assertEqual(self.TEXT_ITEM, json.loads('"' + json_item + '"'))
+
+    def test_file_matches_text(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.txt')
+            out_path = os.path.join(directory, 'output.txt')
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                file.write('a\\b\n"c"\nd\'e\n')
+            for escape_dialect in self.EXPECTED:
+                with self.subTest(escape_dialect=escape_dialect):
+                    transformer = teksto.TextTransformer(teksto.TransformSettings('', '', ',',
+                                                                                  escape_dialect=escape_dialect))
+                    transformer.transform_file(path, out_path)
+                    with open(out_path, 'r', encoding='utf-8', newline='') as file:
+                        self.assertEqual(transformer.transform('a\\b\n"c"\nd\'e\n')['transformed_text'],
+                                         file.read())
+
+
+class ColumnarInputTest(unittest.TestCase):
+    # Rows with quoted fields containing the delimiter and doubled quotes, and a short row
+    CSV_ROWS = '1,"Smith, John","O\'Brien"\n2,"say ""hi""",x\n3'
+
+    def transform(self, column_delimiter, columns, text):
+        transform_settings = teksto.TransformSettings('', '', '|', column_delimiter=column_delimiter,
+                                                      columns=columns)
+        return teksto.TextTransformer(transform_settings).transform(text)['transformed_text'].split('|\n')
+
+    def test_tab_columns(self):
+        columns = (teksto.ColumnSettings(2), teksto.ColumnSettings(0))
+        self.assertEqual(['c, a', 'f, d'], self.transform(teksto.COLUMN_DELIMITER_TAB, columns, 'a\tb\tc\nd\te\tf'))
+
+    def test_quoted_fields(self):
+        columns = (teksto.ColumnSettings(1),)
+        self.assertEqual(['Smith, John', 'say "hi"', ''],
+                         self.transform(teksto.COLUMN_DELIMITER_COMMA, columns, self.CSV_ROWS))
+
+    def test_quoted_columns(self):
+        columns = (teksto.ColumnSettings(2, prefix="'", suffix="'", escape_dialect=teksto.ESCAPE_DIALECT_SQL),
+                   teksto.ColumnSettings(1, prefix='"', suffix='"', escape_dialect=teksto.ESCAPE_DIALECT_CSV))
+        self.assertEqual(["'O\'\'Brien', \"Smith, John\"", "'x', \"say \"\"hi\"\"\"", "'', \"\""],
+                         self.transform(teksto.COLUMN_DELIMITER_COMMA, columns, self.CSV_ROWS))
+
+    def test_semicolon_rows_with_column_separator(self):
+        transform_settings = teksto.TransformSettings('(', ')', ',', column_delimiter=teksto.COLUMN_DELIMITER_SEMICOLON,
+                                                      columns=(teksto.ColumnSettings(0), teksto.ColumnSettings(1)),
+                                                      column_separator=' - ')
+        result = teksto.TextTransformer(transform_settings).transform('a;b\n"c;d";e\n')
+        self.assertEqual('(a - b),\n(c;d - e)', result['transformed_text'])
+        self.assertEqual(2, result['count_text_items'])
+
+
+class TemplateTest(unittest.TestCase):
+    def transform(self, text, **settings):
+        transform_settings = teksto.TransformSettings('', '', ',', **settings)
+        return teksto.TextTransformer(transform_settings).transform(text)['transformed_text']
+
+    def test_index_format_spec(self):
+        self.assertEqual("(001, 'Steve'),\n(002, 'Mary')",
+                         self.transform('Steve\nMary', item_template="({index:03d}, '{item}')"))
+
+    def test_column_fields(self):
+        self.assertEqual('1=Steve:Smith,\n2=Mary:Jones',
+                         self.transform('1\tSteve\tSmith\n2\tMary\tJones',
+                                        item_template='{item}={column[1]}:{column[2]}',
+                                        column_delimiter=teksto.COLUMN_DELIMITER_TAB,
+                                        columns=(teksto.ColumnSettings(0),)))
+
+    def test_item_affixes(self):
+        self.assertEqual('<a>,\n<b>', self.transform('a\nb', item_template='<{item}>'))
+
+    def test_output_template_around_groups_and_ranges(self):
+        self.assertEqual('BEGIN x,\ny\n1..3 END',
+                         self.transform('x\n1\n2\n3\ny', output_template='BEGIN {0} END', range_text='{0}..{1}'))
+        self.assertEqual('BEGIN [a,\nb] END',
+                         self.transform('a\nb', output_template='BEGIN {0} END', surrounding_text='[{0}]'))
+
+    def test_invalid_templates(self):
+        invalid_settings = ({'item_template': '{nope}'}, {'item_template': '{item'},
+                            {'item_template': '{index:xyz}'}, {'item_template': '{column[1]}'},
+                            {'output_template': '{1}'})
+        for settings in invalid_settings:
+            with self.subTest(settings=settings):
+                with self.assertRaisesRegex(teksto.TextTransformerError, 'template'):
+                    self.transform('a\nb', **settings)
+
+    def test_text_template(self):
+        template = teksto.TextTemplate('{index:>3}. {item!r}', {'item': False, 'index': False})
+        self.assertEqual((('index', None), ('item', None)), template.keys)
+        self.assertEqual(["  1. 'a'", "  2. 'b'"],
+                         template.render_all({('index', None): (1, 2), ('item', None): ('a', 'b')}, 2))
+
+
+class IncrementalTransformTest(unittest.TestCase):
+    # Settings transformed chunk by chunk and settings whose text items are processed in order
+    SETTINGS = ({}, {'quote_text': True, 'surrounding_text': 'IN ({0})'},
+                {'trim_mode': teksto.TRIM_MODE_NONE, 'drop_blank_lines': False},
+                {'chunk_size': 7}, {'remove_duplicates': True, 'sort_mode': teksto.SORT_MODE_LEXICAL})
+
+    @staticmethod
+    def edit(text, generator):
+        position = generator.randint(0, len(text))
+        if generator.random() < 0.5:
+            return text[:position] + generator.choice(('x', '\n', 'new\nline\n', ' ', '')) + text[position:]
+        return text[:position] + text[position + generator.randint(1, 200):]
+
+    def test_update_after_edits(self):
+        for settings in self.SETTINGS:
+            with self.subTest(settings=settings):
+                generator = random.Random(7)
+                transform_settings = teksto.TransformSettings("'", "'", ',', **settings)
+                incremental_transform = teksto.IncrementalTransform(transform_settings)
+                transformer = teksto.TextTransformer(transform_settings)
+                text = ''.join('line {0}\n'.format(index) for index in range(5000))
+                for _ in range(30):
+                    text = self.edit(text, generator)
+                    self.assertEqual(transformer.transform(text), incremental_transform.update(text))
+
+    def test_update_to_empty_text(self):
+        transform_settings = teksto.TransformSettings("'", "'", ',')
+        incremental_transform = teksto.IncrementalTransform(transform_settings)
+        incremental_transform.update('a\nb')
+        self.assertEqual(teksto.TextTransformer(transform_settings).transform(''), incremental_transform.update(''))
+        self.assertEqual("'c'", incremental_transform.update('c')['transformed_text'])
+
+if __name__ == '__main__':
+    unittest.main()
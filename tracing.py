@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import logging
+
+# Name of the environment variable switching the tracing on, e.g. VICO_TRACE=debug or VICO_TRACE=info
+TRACE_ENV_VAR = 'VICO_TRACE'
+# Levels accepted in the environment variable, "1" is a shorthand for the most detailed level
+TRACE_LEVELS = {'1': logging.DEBUG, 'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING}
+# Count of characters of a str or bytes payload shown in a trace entry
+TRACE_EXCERPT_LENGTH = 40
+# Count of entries of a dict, list or tuple payload shown in a trace entry
+TRACE_MAX_ENTRIES = 20
+# Event handlers taking longer than this count of seconds are traced on the info level
+SLOW_HANDLER_SECONDS = 0.1
+
+# The logger of vico. It inherits the warning level of the root logger, so the tracing is off by default.
+logger = logging.getLogger('vico')
+
+
+def configure_tracing(environ=None):
+    """
+    Switches the tracing on if the environment variable TRACE_ENV_VAR names a level. Trace entries are written
+    to stderr. On the debug level every event of the GUI is traced together with a size-capped description of its
+    values and the latency of its handler, on the info level only slow handlers and summaries are traced.
+
+    Args:
+        environ (dict): The environment to be read. Default is os.environ.
+
+    Returns:
+        The configured level or None if the tracing stays off.
+    """
+    environ = os.environ if environ is None else environ
+    level = TRACE_LEVELS.get(environ.get(TRACE_ENV_VAR, '').strip().lower())
+    if level is None:
+        return None
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(relativeCreated)9.0f ms %(levelname)-7s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return level
+
+
+def describe_payload(payload):
+    """
+    Describes a payload by its type and size and a truncated excerpt, so even a huge text only results
+    in a short trace entry.
+
+    Args:
+        payload: The value to be described, e.g. the values dictionary of an event or a transform result.
+
+    Returns:
+        The description as str.
+    """
+    if isinstance(payload, (str, bytes)):
+        if len(payload) <= TRACE_EXCERPT_LENGTH:
+            return repr(payload)
+        return "{0}[{1}] {2!r}...".format(type(payload).__name__, len(payload), payload[:TRACE_EXCERPT_LENGTH])
+
+    if isinstance(payload, dict):
+        entries = ["{0!r}: {1}".format(key, describe_payload(value))
+                   for key, value in list(payload.items())[:TRACE_MAX_ENTRIES]]
+        if len(payload) > TRACE_MAX_ENTRIES:
+            entries.append("... {0} more".format(len(payload) - TRACE_MAX_ENTRIES))
+        return '{' + ', '.join(entries) + '}'
+
+    if isinstance(payload, (list, tuple)):
+        entries = [describe_payload(value) for value in payload[:TRACE_MAX_ENTRIES]]
+        if len(payload) > TRACE_MAX_ENTRIES:
+            entries.append("... {0} more".format(len(payload) - TRACE_MAX_ENTRIES))
+        brackets = '[]' if isinstance(payload, list) else '()'
+        return brackets[0] + ', '.join(entries) + brackets[1]
+
+    description = repr(payload)
+    if len(description) > TRACE_EXCERPT_LENGTH:
+        description = description[:TRACE_EXCERPT_LENGTH] + '...'
+    return description
+
+
+def trace_payload(message, payload):
+    """
+    Traces a message together with the description of a payload on the debug level.
+    The payload is only described if the debug level is enabled.
+
+    Args:
+        message (str): The message to be traced.
+        payload: The value to be described by describe_payload().
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %s", message, describe_payload(payload))
+
+
+def trace_event(event, values):
+    """
+    Traces an event read from a window on the debug level and starts measuring the latency of its handler.
+
+    Args:
+        event: The event returned by the window.read() method.
+        values (dict): The values dictionary returned by the window.read() method.
+
+    Returns:
+        The start time to be passed to trace_handled() or None if the tracing is off.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return None
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("event %s values %s", event, describe_payload(values))
+    return time.perf_counter()
+
+
+def trace_handled(event, start):
+    """
+    Traces the latency of the handler of an event. Slow handlers are traced on the info level,
+    all other handlers on the debug level.
+
+    Args:
+        event: The handled event.
+        start (float): The start time returned by trace_event().
+    """
+    if start is None:
+        return
+
+    seconds = time.perf_counter() - start
+    level = logging.INFO if seconds >= SLOW_HANDLER_SECONDS else logging.DEBUG
+    logger.log(level, "handled %s in %.1f ms", event, seconds * 1000)
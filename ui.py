@@ -1,27 +1,85 @@
+import os
+import time
 import PySimpleGUI as sg
 import pyperclip
-from teksto import TransformSettings, TransformSettingsPreset, TextTransformer, TextTransformerError
+import tracing
+import sinks
+from teksto import TransformSettings, TransformSettingsPreset, TextTransformerError, TransformResultCache, \
+    get_text_transformer, transform_many, SORT_MODE_LEXICAL, SORT_MODE_NUMERIC, ESCAPE_DIALECT_SQL, \
+    ESCAPE_DIALECT_PYTHON, ESCAPE_DIALECT_JSON, ESCAPE_DIALECT_CSV, ESCAPE_DIALECT_SHELL, TRIM_MODE_NONE, \
+    TRIM_MODE_LEFT, TRIM_MODE_RIGHT, TRIM_MODE_BOTH, COLUMN_DELIMITER_TAB, COLUMN_DELIMITER_COMMA, \
+    COLUMN_DELIMITER_SEMICOLON, ColumnSettings
+from workers import PreviewWorker, ClipboardWatcher
+from buffers import TextBuffer, PAGE_SIZE
 
 MOVE_DIRECTION_UP = 'UP'
 MOVE_DIRECTION_DOWN = 'DOWN'
 
-
-def prepare_main_window(window_title, prefs):
+# Texts longer than this count of characters are kept in an input buffer instead of the text input field
+LARGE_INPUT_THRESHOLD = 1024 * 1024
+# Custom event sent by the preview worker when a text transformation is finished
+EVENT_PREVIEW_DONE = 'evt_preview_done'
+# Custom event sent when the content of the clipboard was read in the background after startup
+EVENT_CLIPBOARD_LOADED = 'evt_clipboard_loaded'
+# Custom event sent when the user preferences were loaded in the background after startup
+EVENT_PREFERENCES_LOADED = 'evt_prefs_loaded'
+# Suffix of the name a preferences file that can not be read is renamed to, so it is not overwritten on exit
+INVALID_PREFERENCES_SUFFIX = '.invalid'
+# Custom event sent by the clipboard watcher when a new clipboard content was transformed
+EVENT_WATCH_DONE = 'evt_watch_done'
+# Count of transformed clipboard contents kept in the history of the clipboard watcher
+WATCH_HISTORY_SIZE = 20
+# Count of characters of a transformed clipboard content shown in the history of the clipboard watcher
+WATCH_HISTORY_EXCERPT_SIZE = 60
+# Custom event sent when the text was transformed using several presets for the "Compare presets" dialog
+EVENT_PRESETS_PREVIEW_DONE = 'evt_presets_preview_done'
+# Custom event sent when the transformed text was saved to a file in the background
+EVENT_SAVE_DONE = 'evt_save_done'
+# File types offered by the "Save to file" dialog, files ending with .gz are compressed by gzip
+SAVE_FILE_TYPES = (('Text files', '*.txt'), ('SQL files', '*.sql'), ('Gzip compressed files', '*.gz'),
+                   ('All files', '*.*'))
+# Keys of the buttons managing the presets, which are disabled until the preferences are loaded
+PRESET_BUTTON_KEYS = ('btn_move_preset_up', 'btn_move_preset_down', 'btn_add_preset', 'btn_save_preset',
+                      'btn_del_preset', 'btn_preview_presets')
+# Keys of the elements displaying the transform settings which refresh the preview when changed
+TRANSFORM_SETTINGS_KEYS = ('prefix', 'suffix', 'delimiter', 'chk_line_up', 'fld_quote_char',
+                           'fld_escape_char', 'fld_surrounding_text', 'fld_chunk_size', 'chk_remove_duplicates',
+                           'cmb_sort_mode', 'fld_range_text', 'cmb_escape_dialect', 'cmb_trim_mode',
+                           'chk_collapse_whitespace', 'chk_drop_blank_lines', 'cmb_column_delimiter', 'fld_columns',
+                           'fld_item_template', 'fld_output_template')
+# Names of the sort modes displayed in the sort combo box
+SORT_MODE_NAMES = {None: 'Keep order', SORT_MODE_LEXICAL: 'Lexical', SORT_MODE_NUMERIC: 'Numeric'}
+# Names of the escape dialects displayed in the escape combo box
+ESCAPE_DIALECT_NAMES = {None: 'None', ESCAPE_DIALECT_SQL: 'SQL', ESCAPE_DIALECT_PYTHON: 'Python',
+                        ESCAPE_DIALECT_JSON: 'JSON', ESCAPE_DIALECT_CSV: 'CSV', ESCAPE_DIALECT_SHELL: 'Shell'}
+# Names of the trim modes displayed in the trim combo box
+TRIM_MODE_NAMES = {TRIM_MODE_BOTH: 'Both sides', TRIM_MODE_LEFT: 'Left', TRIM_MODE_RIGHT: 'Right',
+                   TRIM_MODE_NONE: 'None'}
+# Names of the column delimiters displayed in the columns combo box
+COLUMN_DELIMITER_NAMES = {None: 'None', COLUMN_DELIMITER_TAB: 'Tab', COLUMN_DELIMITER_COMMA: 'Comma',
+                          COLUMN_DELIMITER_SEMICOLON: 'Semicolon'}
+# Quote chars of the columns field and the escape dialects of the columns quoted by them, e.g. '1', "2"
+COLUMN_QUOTE_DIALECTS = {"'": ESCAPE_DIALECT_SQL, '"': ESCAPE_DIALECT_CSV}
+
+
+def prepare_main_window(window_title, prefs, input_buffer):
     """
     Prepares the main window before it is shown for the first time after startup.
+    The window is shown right away. If the preferences are not loaded yet, they are loaded in the background
+    the same way as the content of the clipboard, and the UI elements are filled when the custom events
+    EVENT_PREFERENCES_LOADED and EVENT_CLIPBOARD_LOADED arrive.
 
     Args:
         window_title (str): The title to be shown in the main window.
         prefs (:obj:`VicoPreferences`): The user preferences necessary to initialize UI elements.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
 
     Returns:
         The prepared main window.
     """
-    clipboard_content = pyperclip.paste()
-
     # Frame layout for the "Text input" frame
     fl_text_input = [
-        [sg.Multiline(clipboard_content, size=(60, 8), key='fld_clipboard_content', enable_events=True)],
+        [sg.Multiline('', size=(60, 8), key='fld_clipboard_content', enable_events=True)],
         [sg.Button('Copy from clipboard', key='btn_copy_from_clipboard'),
          sg.Button('Clear', key='btn_clear_text_input'),
          sg.Text('', key='txt_input_count_lines')]
@@ -30,47 +88,103 @@ def prepare_main_window(window_title, prefs):
     # Frame layout for the "Transform options" frame
     fl_transform_options = [
         [sg.Text('Prefix', size=(9, 1)),
-         sg.InputText(default_text=prefs.selected_transform_settings.prefix,
+         sg.InputText(default_text='',
                       key='prefix',
-                      size=(5, 1)),
-         sg.Checkbox('Line up', default=prefs.selected_transform_settings.line_up, key='chk_line_up')],
+                      size=(5, 1),
+                      enable_events=True),
+         sg.Checkbox('Line up', default=False, key='chk_line_up',
+                     enable_events=True)],
         [sg.Text('Suffix', size=(9, 1)),
-         sg.InputText(default_text=prefs.selected_transform_settings.suffix,
-                      key='suffix', size=(5, 1)),
+         sg.InputText(default_text='',
+                      key='suffix', size=(5, 1), enable_events=True),
          sg.Checkbox('Quote text',
-                     default=prefs.selected_transform_settings.quote_text,
+                     default=False,
                      key='chk_quote_text',
                      enable_events=True)],
         [sg.Text('Delimiter', size=(9, 1)),
-         sg.InputText(default_text=prefs.selected_transform_settings.delimiter,
-                      key='delimiter', size=(5, 1)),
-         sg.Text('Quote char'), sg.InputText(default_text=prefs.selected_transform_settings.quote_char,
+         sg.InputText(default_text='',
+                      key='delimiter', size=(5, 1), enable_events=True),
+         sg.Text('Quote char'), sg.InputText(default_text='',
                                              size=(5, 1),
-                                             key='fld_quote_char'),
-         sg.Text('Escape char'), sg.InputText(default_text=prefs.selected_transform_settings.escape_char,
+                                             key='fld_quote_char',
+                                             enable_events=True),
+         sg.Text('Escape char'), sg.InputText(default_text='',
                                               size=(5, 1),
-                                              key='fld_escape_char')
+                                              key='fld_escape_char',
+                                              enable_events=True)
          ],
+        [sg.Text('Chunk size', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_chunk_size', size=(7, 1), enable_events=True),
+         sg.Text('Text items per surrounding text, empty for all')],
+        [sg.Text('Sort', size=(9, 1)),
+         sg.Combo(list(SORT_MODE_NAMES.values()), default_value=SORT_MODE_NAMES[None], key='cmb_sort_mode',
+                  readonly=True, enable_events=True),
+         sg.Checkbox('Remove duplicates', default=False, key='chk_remove_duplicates', enable_events=True)],
+        [sg.Text('Range text', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_range_text', size=(30, 1), enable_events=True),
+         sg.Text('e.g. OR id BETWEEN {0} AND {1}')],
+        [sg.Text('Escape', size=(9, 1)),
+         sg.Combo(list(ESCAPE_DIALECT_NAMES.values()), default_value=ESCAPE_DIALECT_NAMES[None],
+                  key='cmb_escape_dialect', readonly=True, enable_events=True),
+         sg.Text('Escapes every text item for a string literal')],
+        [sg.Text('Trim', size=(9, 1)),
+         sg.Combo(list(TRIM_MODE_NAMES.values()), default_value=TRIM_MODE_NAMES[TRIM_MODE_BOTH],
+                  key='cmb_trim_mode', readonly=True, enable_events=True),
+         sg.Checkbox('Collapse whitespace', default=False, key='chk_collapse_whitespace', enable_events=True),
+         sg.Checkbox('Drop blank lines', default=True, key='chk_drop_blank_lines', enable_events=True)],
+        [sg.Text('Columns', size=(9, 1)),
+         sg.Combo(list(COLUMN_DELIMITER_NAMES.values()), default_value=COLUMN_DELIMITER_NAMES[None],
+                  key='cmb_column_delimiter', readonly=True, enable_events=True),
+         sg.InputText(default_text='', key='fld_columns', size=(12, 1), enable_events=True),
+         sg.Text("e.g. '1', 3 - empty for all")],
+        [sg.Text('Item template', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_item_template', size=(30, 1), enable_events=True),
+         sg.Text('e.g. ({index}, {item})')],
+        [sg.Text('Output text', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_output_template', size=(30, 1), enable_events=True),
+         sg.Text('Placed around all chunks, e.g. BEGIN; {0}')],
         [sg.Text('Surrounding text')],
-        [sg.Multiline('', size=(55, 3), key='fld_surrounding_text')]
+        [sg.Multiline('', size=(55, 3), key='fld_surrounding_text', enable_events=True)]
     ]
 
     # Frame layout for the "Presets" frame
     fl_presets = [
-        [sg.Listbox(values=prefs.presets, size=(30, 6), key='lbx_presets',
+        [sg.Listbox(values=[], size=(30, 6), key='lbx_presets',
                     enable_events=True, select_mode=sg.LISTBOX_SELECT_MODE_BROWSE),
-         sg.Button('⬆', key='btn_move_preset_up'),
-         sg.Button('⬇', key='btn_move_preset_down')],
-        [sg.Button('Add', key='btn_add_preset'), sg.Button('Save', key='btn_save_preset'),
-         sg.Button('Delete', key='btn_del_preset')]
+         sg.Button('⬆', key='btn_move_preset_up', disabled=True),
+         sg.Button('⬇', key='btn_move_preset_down', disabled=True)],
+        [sg.Button('Add', key='btn_add_preset', disabled=True),
+         sg.Button('Save', key='btn_save_preset', disabled=True),
+         sg.Button('Delete', key='btn_del_preset', disabled=True),
+         sg.Button('Compare...', key='btn_preview_presets', disabled=True)]
     ]
 
     # Frame layout for the "Preview output" frame
     fl_preview_output = [
-        [sg.Multiline('', size=(60, 8), key='fld_preview')],
+        # The preview only displays pages of the transformed text held by a TextBuffer, so it is read-only
+        # and its content is never read back into the values dictionary.
+        [sg.Multiline('', size=(60, 8), key='fld_preview', disabled=True, write_only=True)],
         [sg.Button('Preview', key='btn_preview'),
          sg.Button('Copy to clipboard', key='btn_copy_to_clipboard', disabled=True),
-         sg.Text('', key='txt_prv_count_lines')]
+         # Saving transforms the input once again and streams the result into the file, so the saved text
+         # is never held in memory as a whole, no matter if a preview was requested before
+         sg.Button('Save to file…', key='btn_save_to_file'),
+         sg.Button('Load more', key='btn_preview_load_more', disabled=True),
+         sg.Text('', key='txt_prv_count_lines')],
+        # The profile shows the slowest stages of the text transformation next to the count of text items
+        [sg.Checkbox('Profile', key='chk_profile_preview', enable_events=True),
+         sg.Text('', key='txt_prv_profile'),
+         sg.Text('', key='txt_save_status')]
+    ]
+
+    # Frame layout for the "Clipboard watcher" frame
+    fl_clipboard_watcher = [
+        # The clipboard watcher uses the selected preset, so it can not be started before the presets are loaded
+        [sg.Checkbox('Watch clipboard', key='chk_watch_clipboard', enable_events=True, disabled=True),
+         sg.Checkbox('Write result to clipboard', key='chk_watch_write_back', enable_events=True)],
+        # The history keeps the transformed texts in its metadata, clicking an entry copies its text
+        [sg.Listbox(values=[], size=(60, 4), key='lbx_watch_history', enable_events=True,
+                    select_mode=sg.LISTBOX_SELECT_MODE_BROWSE, metadata=[])]
     ]
 
     # Final layout for the main window
@@ -78,54 +192,175 @@ def prepare_main_window(window_title, prefs):
         [sg.Frame('Text input', fl_text_input)],
         [sg.Frame('Transform options', fl_transform_options)],
         [sg.Frame('Presets', fl_presets)],
-        [sg.Frame('Preview output', fl_preview_output)]
+        [sg.Frame('Preview output', fl_preview_output)],
+        [sg.Frame('Clipboard watcher', fl_clipboard_watcher)]
     ]
 
     window = sg.Window(window_title, layout, enable_close_attempted_event=True, finalize=True)
+    update_count_lines(window, 0)
+    # Reading the clipboard may take a while (e.g. by running xclip or xsel), so the window is
+    # shown first and the text input field is filled as soon as the content of the clipboard arrives.
+    window.perform_long_operation(pyperclip.paste, EVENT_CLIPBOARD_LOADED)
+    if prefs.loaded:
+        loaded_preferences(window, prefs)
+    else:
+        window.perform_long_operation(lambda: load_preferences(prefs), EVENT_PREFERENCES_LOADED)
+
+    return window
+
+
+def load_preferences(prefs):
+    """
+    Loads the user preferences. Runs in the background, so errors are returned instead of being raised.
+    If the preferences file can not be read, it is renamed by appending INVALID_PREFERENCES_SUFFIX
+    and the default preferences are used, so the presets still work and are saved on exit.
+
+    Args:
+        prefs (:obj:`VicoPreferences`): The user preferences to be loaded.
+
+    Returns:
+        None or the exception raised while reading the preferences file.
+    """
+    try:
+        prefs.load()
+        return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        load_error = e
+
+    try:
+        os.replace(prefs.prefs_filepath, prefs.prefs_filepath + INVALID_PREFERENCES_SUFFIX)
+    except OSError:
+        pass
+    prefs.load_defaults()
+    return load_error
+
+
+def loaded_preferences(window, prefs, load_error=None):
+    """
+    Fills the UI elements depending on the user preferences after they were loaded.
+    If the preferences file could not be read, the user is told that the default preferences are used.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        prefs (:obj:`VicoPreferences`): The loaded user preferences.
+        load_error (Exception): The error returned by load_preferences() or None.
+    """
     # Updating the listbox with the presets to highlight the preset
     # that was chosen when vico was closed the last time.
-    window['lbx_presets'].update(set_to_index=prefs.selected_preset_index,
-                                 scroll_to_index=prefs.selected_preset_index)
+    update_preset_listbox(window, prefs.presets, prefs.selected_preset_index)
     # Updating the UI to display the values of the chosen preset
     update_displayed_preset(window, prefs.selected_preset)
-    # Updating the label showing the count of lines in the text input field
-    update_count_lines(window, clipboard_content)
+    for key in PRESET_BUTTON_KEYS:
+        window[key].update(disabled=False)
+    window['chk_watch_clipboard'].update(disabled=False)
+    # Marking the listbox as filled, so the presets are saved when the window is closed
+    window['lbx_presets'].metadata = True
 
-    return window
+    if load_error is not None:
+        sg.popup_error("The preferences can not be read from {0}. The file has been renamed to {0}{1} "
+                       "and the default presets are used.\n\nError message: {2}".format(
+                           prefs.prefs_filepath, INVALID_PREFERENCES_SUFFIX, load_error),
+                       title="Loading preferences")
+
+
+def loaded_clipboard_content(window, values, input_buffer):
+    """
+    Fills the text input field with the content of the clipboard read in the background after startup.
+    The content is dropped if the user already entered a text in the meantime.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
+    """
+    if get_input_text(values, input_buffer):
+        return
+    # Filling the text input field and updating the label showing the count of lines
+    set_input_text(window, input_buffer, values[EVENT_CLIPBOARD_LOADED])
+
+
+def create_input_buffer():
+    """
+    Creates the buffer holding an input text that is too large for the text input field.
+
+    Returns:
+        A new instance of a TextBuffer object.
+    """
+    return TextBuffer()
+
+
+def set_input_text(window, input_buffer, text):
+    """
+    Sets the input text. Texts longer than LARGE_INPUT_THRESHOLD are kept in the input buffer and
+    the text input field only displays a summary and an excerpt of the text. The field is read-only then,
+    so Tk never has to handle the complete text.
 
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
+        text (str): The new input text.
+    """
+    text = text or ''
+    count_text_lines = get_count_text_lines(text)
+    if len(text) > LARGE_INPUT_THRESHOLD:
+        input_buffer.text = text
+        summary = "[Large input of {0} characters in {1} line(s). Only an excerpt is shown, " \
+                  "click 'Clear' to edit the text.]".format(len(text), count_text_lines)
+        window['fld_clipboard_content'].update("{0}\n{1}".format(summary, input_buffer.excerpt()),
+                                                disabled=True)
+    else:
+        input_buffer.text = ''
+        window['fld_clipboard_content'].update(text, disabled=False)
+    update_count_lines(window, count_text_lines)
 
-def clicked_copy_from_clipboard(window):
+
+def get_input_text(values, input_buffer):
+    """
+    Returns the input text, which is either held by the input buffer or by the text input field.
+
+    Args:
+        values (dict): The values dictionary returned by the windows.read() method.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
+
+    Returns:
+        The input text.
+    """
+    if len(input_buffer):
+        return input_buffer.text
+    return values['fld_clipboard_content']
+
+
+def clicked_copy_from_clipboard(window, input_buffer):
     """
     Fills the text input field of the "Text input" frame with the content of the clipboard.
 
     Args:
         window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
     """
     clipboard_content = pyperclip.paste()
-    window['fld_clipboard_content'].update(clipboard_content)
-    update_count_lines(window, clipboard_content)
+    set_input_text(window, input_buffer, clipboard_content)
 
 
-def clicked_clear_text_input(window):
+def clicked_clear_text_input(window, input_buffer):
     """
     Clears the text input field of the "Text input" frame.
 
     Args:
         window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
     """
-    window['fld_clipboard_content'].update('')
-    update_count_lines(window, '')
+    set_input_text(window, input_buffer, '')
 
 
-def update_count_lines(window, text):
+def update_count_lines(window, count_text_lines):
     """
     Updates the label showing the count of lines of the input text.
 
     Args:
         window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
-        text (str): The input text.
+        count_text_lines (int): The count of lines of the input text.
     """
-    count_text_lines = get_count_text_lines(text)
     txt_count_lines = "Input contains {0} line(s)".format(count_text_lines)
     window['txt_input_count_lines'].update(txt_count_lines)
 
@@ -147,16 +382,38 @@ def clicked_quote_text_checkbox(values, window):
         window['fld_escape_char'].update(disabled=True)
 
 
-def clicked_preset_item(window, values):
+def clicked_preset_item(window, values, preview_worker, input_buffer):
     """
     Updates the displayed transform settings according to the selected preset.
 
     Args:
         window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
         values (dict): The values dictionary returned by the windows.read() method.
+        preview_worker (:obj:`PreviewWorker`): The worker transforming the text in the background.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
     """
+    # The listbox is empty until the preferences are loaded after startup
+    if not values['lbx_presets']:
+        return
     chosen_tsp = values['lbx_presets'][0]
     update_displayed_preset(window, chosen_tsp)
+    # Compiling the transformer of the preset in advance, so the preview can reuse it
+    get_text_transformer(chosen_tsp.transform_settings)
+    refresh_preview(window, values, preview_worker, input_buffer, chosen_tsp.transform_settings)
+
+
+def clicked_preview_presets(window, values, input_buffer):
+    """
+    Lets the user preview the text transformed using several presets side by side.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
+    """
+    presets = window['lbx_presets'].get_list_values()
+    selected_presets = values['lbx_presets']
+    show_dialog_preview_presets(presets, selected_presets, get_input_text(values, input_buffer))
 
 
 def clicked_add_preset(window):
@@ -264,65 +521,410 @@ def move_selected_preset(window, direction):
         update_preset_listbox(window, lbx_items, new_index)
 
 
-def clicked_show_preview(window, values):
+def create_result_cache():
+    """
+    Creates the cache keeping the results of text transformations, which is shared by the preview worker
+    and the clipboard watcher.
+
+    Returns:
+        A new instance of a TransformResultCache object.
+    """
+    return TransformResultCache()
+
+
+def create_preview_worker(window, result_cache):
+    """
+    Creates the worker transforming the text for the preview in the background.
+    Finished transformations are reported to the window by the custom event EVENT_PREVIEW_DONE.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window receiving the results.
+        result_cache (:obj:`TransformResultCache`): The cache keeping the results of text transformations.
+
+    Returns:
+        A new instance of a PreviewWorker object.
+    """
+    def report_result(generation, result, explicit):
+        window.write_event_value(EVENT_PREVIEW_DONE, (generation, result, explicit))
+
+    return PreviewWorker(report_result, result_cache=result_cache)
+
+
+def clicked_show_preview(window, values, preview_worker, input_buffer):
     """
     Lets the user preview the result of the text transformation.
+    The text is transformed in the background, the result is displayed by finished_preview().
 
     Args:
         window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
         values (dict): The values dictionary returned by the windows.read() method.
+        preview_worker (:obj:`PreviewWorker`): The worker transforming the text in the background.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
     """
-    text = values['fld_clipboard_content']
+    text = get_input_text(values, input_buffer)
+    transform_settings = get_transform_settings(values)
+    preview_worker.request(text, transform_settings, explicit=True)
+    window['txt_prv_count_lines'].update("Transforming...")
+
+
+def refresh_preview(window, values, preview_worker, input_buffer, transform_settings=None):
+    """
+    Refreshes the preview after the user changed the text input or the transform settings, but only
+    if the user already requested a preview before. Rapid changes are debounced by the preview worker.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+        preview_worker (:obj:`PreviewWorker`): The worker transforming the text in the background.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
+        transform_settings (:obj:`TransformSettings`): The changed transform settings.
+            Default is None, which means the currently displayed transform settings.
+    """
+    if not preview_worker.latest_generation:
+        return
+
+    text = get_input_text(values, input_buffer)
+    transform_settings = transform_settings or get_transform_settings(values)
+    preview_worker.request(text, transform_settings)
+    window['txt_prv_count_lines'].update("Transforming...")
+
+
+def clicked_profile_checkbox(window, values, preview_worker, input_buffer):
+    """
+    Enables or disables profiling the text transformations of the preview and refreshes the preview.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+        preview_worker (:obj:`PreviewWorker`): The worker transforming the text in the background.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
+    """
+    preview_worker.profile_enabled = values['chk_profile_preview']
+    if not preview_worker.profile_enabled:
+        window['txt_prv_profile'].update('')
+    refresh_preview(window, values, preview_worker, input_buffer)
+
+
+def create_preview_buffer():
+    """
+    Creates the buffer holding the complete transformed text displayed page by page in the preview.
+
+    Returns:
+        A new instance of a TextBuffer object.
+    """
+    return TextBuffer()
+
+
+def finished_preview(window, values, preview_worker, preview_buffer):
+    """
+    Displays the result of a text transformation finished by the preview worker.
+    Results of outdated requests are ignored. The complete transformed text is kept in the preview buffer,
+    only its first page is displayed.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+        preview_worker (:obj:`PreviewWorker`): The worker transforming the text in the background.
+        preview_buffer (:obj:`TextBuffer`): The buffer holding the transformed text.
+    """
+    generation, transform_result, explicit = values[EVENT_PREVIEW_DONE]
+    if generation != preview_worker.latest_generation:
+        return
+
+    if isinstance(transform_result, TextTransformerError):
+        # While the user is still typing a template or the range text it is likely to be invalid,
+        # so the error is only shown in a popup if the preview was explicitly requested.
+        # The message names the broken template or range text or the row that can not be parsed.
+        if explicit:
+            sg.popup_error(transform_result.message, title="Text transformation error")
+        window['txt_prv_count_lines'].update(transform_result.message)
+        return
+
+    tracing.trace_payload("preview result", transform_result)
+    preview_buffer.text = transform_result['transformed_text']
+    window['fld_preview'].update(preview_buffer.next_page())
+    update_preview_count_lines(window, transform_result['count_text_items'], preview_buffer,
+                               transform_result.get('count_removed_duplicates'), transform_result.get('count_ranges'))
+    profile = transform_result.get('profile')
+    window['txt_prv_profile'].update("Slowest stages: " + profile.summary() if profile is not None else '')
+
+    if len(preview_buffer) == 0:
+        window['btn_copy_to_clipboard'].update(disabled=True)
+    else:
+        window['btn_copy_to_clipboard'].update(disabled=False)
+
+
+def clicked_load_more_preview(window, preview_buffer):
+    """
+    Appends the next page of the transformed text to the preview.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        preview_buffer (:obj:`TextBuffer`): The buffer holding the transformed text.
+    """
+    window['fld_preview'].update(preview_buffer.next_page(), append=True)
+    update_preview_count_lines(window, None, preview_buffer)
+
+
+def update_preview_count_lines(window, count_text_items, preview_buffer, count_removed_duplicates=None,
+                               count_ranges=None):
+    """
+    Updates the label showing the count of text items of the preview and, if the preview does not display
+    the complete transformed text, how much of it is displayed.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        count_text_items (int): The count of text items. None keeps the previously displayed counts.
+        preview_buffer (:obj:`TextBuffer`): The buffer holding the transformed text.
+        count_removed_duplicates (int): The count of removed duplicates or None if duplicates are not removed.
+            Default is None.
+        count_ranges (int): The count of ranges of integers or None if runs of integers are not collapsed.
+            Default is None.
+    """
+    if count_text_items is not None:
+        window['txt_prv_count_lines'].metadata = (count_text_items, count_removed_duplicates, count_ranges)
+    count_text_items, count_removed_duplicates, count_ranges = window['txt_prv_count_lines'].metadata
+    txt_count_lines = "Preview contains {0} text items(s)".format(count_text_items)
+    if count_removed_duplicates is not None:
+        txt_count_lines += ", {0} duplicate(s) removed".format(count_removed_duplicates)
+    if count_ranges is not None:
+        txt_count_lines += ", {0} range(s)".format(count_ranges)
+    if not preview_buffer.is_fully_shown():
+        txt_count_lines += " (showing {0} of {1} characters)".format(preview_buffer.shown_length,
+                                                                      len(preview_buffer))
+    window['txt_prv_count_lines'].update(txt_count_lines)
+    window['btn_preview_load_more'].update(disabled=preview_buffer.is_fully_shown())
+
+
+def clicked_copy_to_clipboard(preview_buffer, clipboard_watcher):
+    """
+    Lets the user copy the complete transformed text to the clipboard, even the part
+    that is not displayed in the preview.
+
+    Args:
+        preview_buffer (:obj:`TextBuffer`): The buffer holding the transformed text.
+        clipboard_watcher (:obj:`ClipboardWatcher`): The running clipboard watcher or None.
+    """
+    copy_to_clipboard(preview_buffer.text, clipboard_watcher)
+
+
+def copy_to_clipboard(text, clipboard_watcher):
+    """
+    Copies a text to the clipboard. A running clipboard watcher is told to ignore the text,
+    so it is not transformed once again.
 
+    If xclip or xsel is installed, the text is streamed into its stdin pipe in chunks by a ClipboardSink,
+    so a large text is never encoded as a whole. Otherwise the text is copied by pyperclip.
+
+    Args:
+        text (str): The text to be copied.
+        clipboard_watcher (:obj:`ClipboardWatcher`): The running clipboard watcher or None.
+    """
+    if clipboard_watcher:
+        clipboard_watcher.ignore(text)
+    command = sinks.find_clipboard_command()
+    if command is None:
+        pyperclip.copy(text)
+        return
+
+    try:
+        with sinks.ClipboardSink(command) as sink:
+            for start in range(0, len(text), sinks.CLIPBOARD_CHUNK_SIZE):
+                sink.write(text[start:start + sinks.CLIPBOARD_CHUNK_SIZE])
+    except sinks.OutputSinkError as e:
+        sg.popup_error("The text can not be copied to the clipboard.\n\nError message: {0}".format(e.message))
+
+
+def clicked_save_to_file(window, values, input_buffer):
+    """
+    Lets the user save the transformed text to a file. The input text is transformed once again in the
+    background and streamed into the file, the result is displayed by finished_save().
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
+    """
+    path = sg.popup_get_file("Save the transformed text to", title="Save to file", save_as=True,
+                             no_window=True, file_types=SAVE_FILE_TYPES)
+    if not path:
+        return
+
+    text = get_input_text(values, input_buffer)
     transform_settings = get_transform_settings(values)
-    text_transformer = TextTransformer(transform_settings)
+    window['btn_save_to_file'].update(disabled=True)
+    window['txt_save_status'].update("Saving...")
+    window.perform_long_operation(lambda: save_transformed_text(text, transform_settings, path), EVENT_SAVE_DONE)
+
+
+def save_transformed_text(text, transform_settings, path):
+    """
+    Transforms a text and writes the transformed text to a file block by block.
+    Runs in the background, so errors are returned instead of being raised.
+
+    Args:
+        text (str): The text to be transformed.
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+        path (str): The path of the file. Files ending with .gz are compressed by gzip.
 
-    transformation_success = False
+    Returns:
+        A tuple containing the path and the statistics of the text transformation, or the raised
+        TextTransformerError, OutputSinkError or OSError.
+    """
     try:
-        transform_result = text_transformer.transform(text)
-        transformation_success = True
-    except TextTransformerError as e:
-        errmsg = """ Please check your surrounding text. It seems to be invalid.\
-        A valid surrounding text must only contain the format code {{}} or {{0}}.\
-        
-        
-        Error message: {0}
-        """.format(str(e)).strip()
-        sg.popup_error(errmsg, title="Text transformation error")
-
-    if transformation_success:
-        print(transform_result)
-        window['fld_preview'].update(transform_result['transformed_text'])
-        txt_count_lines = "Preview contains {0} text items(s)".format(transform_result['count_text_items'])
-        window['txt_prv_count_lines'].update(txt_count_lines)
-
-        if transform_result['transformed_text'] == '':
-            window['btn_copy_to_clipboard'].update(disabled=True)
-        else:
-            window['btn_copy_to_clipboard'].update(disabled=False)
+        with sinks.FileSink(path) as sink:
+            stats = get_text_transformer(transform_settings).transform_into(text, sink)
+    except (TextTransformerError, sinks.OutputSinkError, OSError) as e:
+        return e
+    return path, stats
+
+
+def finished_save(window, values):
+    """
+    Displays the result of saving the transformed text to a file.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+    """
+    window['btn_save_to_file'].update(disabled=False)
+    save_result = values[EVENT_SAVE_DONE]
+    if isinstance(save_result, Exception):
+        window['txt_save_status'].update("Saving failed")
+        sg.popup_error("The transformed text can not be saved.\n\nError message: {0}".format(save_result),
+                       title="Save to file")
+        return
+
+    path, stats = save_result
+    window['txt_save_status'].update("Saved {0} text item(s) to {1}".format(stats['count_text_items'], path))
+
+
+def clicked_watch_clipboard(window, values, clipboard_watcher, result_cache):
+    """
+    Starts or stops watching the clipboard. Every new clipboard content is transformed in the background
+    using the selected preset, the results are displayed by finished_watch().
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        values (dict): The values dictionary returned by the windows.read() method.
+        clipboard_watcher (:obj:`ClipboardWatcher`): The running clipboard watcher or None.
+        result_cache (:obj:`TransformResultCache`): The cache keeping the results of text transformations.
 
+    Returns:
+        The running clipboard watcher or None if the clipboard is not watched.
+    """
+    if clipboard_watcher:
+        clipboard_watcher.stop()
+    if not values['chk_watch_clipboard']:
+        return None
+
+    def report_result(text, result):
+        window.write_event_value(EVENT_WATCH_DONE, result)
+
+    try:
+        return ClipboardWatcher(get_selected_transform_settings(window), report_result,
+                                write_back=values['chk_watch_write_back'], result_cache=result_cache)
+    except pyperclip.PyperclipException as e:
+        window['chk_watch_clipboard'].update(False)
+        sg.popup_error("The clipboard can not be watched.\n\nError message: {0}".format(e))
+        return None
+
+
+def clicked_watch_write_back(values, clipboard_watcher):
+    """
+    Lets the user choose if the clipboard watcher writes the transformed text back to the clipboard.
+
+    Args:
+        values (dict): The values dictionary returned by the windows.read() method.
+        clipboard_watcher (:obj:`ClipboardWatcher`): The running clipboard watcher or None.
+    """
+    if clipboard_watcher:
+        clipboard_watcher.write_back = values['chk_watch_write_back']
+
+
+def update_clipboard_watcher(window, clipboard_watcher):
+    """
+    Lets the clipboard watcher use the transform settings of the currently selected preset.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        clipboard_watcher (:obj:`ClipboardWatcher`): The running clipboard watcher or None.
+    """
+    if clipboard_watcher:
+        clipboard_watcher.transform_settings = get_selected_transform_settings(window)
 
-def clicked_copy_to_clipboard(values):
+
+def finished_watch(window, values, clipboard_watcher):
     """
-    Lets the user copy the preview of the transformed text to the clipboard.
+    Adds a clipboard content transformed by the clipboard watcher to the history.
+    Only the latest WATCH_HISTORY_SIZE entries are kept. If the watcher stopped because the clipboard
+    can not be accessed any more, the error is shown and the "Watch clipboard" checkbox is cleared.
 
     Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
         values (dict): The values dictionary returned by the windows.read() method.
+        clipboard_watcher (:obj:`ClipboardWatcher`): The running clipboard watcher or None.
+
+    Returns:
+        The running clipboard watcher or None if the clipboard is not watched any more.
     """
-    pyperclip.copy(values['fld_preview'])
+    transform_result = values[EVENT_WATCH_DONE]
+    if isinstance(transform_result, pyperclip.PyperclipException):
+        if clipboard_watcher is None or clipboard_watcher.error is not transform_result:
+            # The error stopped a watcher which has already been replaced or stopped by the user
+            return clipboard_watcher
+        window['chk_watch_clipboard'].update(False)
+        sg.popup_error("The clipboard can not be watched any more.\n\nError message: {0}".format(transform_result))
+        return None
+
+    if isinstance(transform_result, TextTransformerError):
+        entry = "{0} Error: {1}".format(time.strftime('%H:%M:%S'), transform_result.message)
+        transformed_text = None
+    else:
+        transformed_text = transform_result['transformed_text']
+        excerpt = ' '.join(transformed_text[:WATCH_HISTORY_EXCERPT_SIZE].split())
+        entry = "{0} {1} item(s): {2}".format(time.strftime('%H:%M:%S'), transform_result['count_text_items'],
+                                              excerpt)
 
+    history = window['lbx_watch_history']
+    history.metadata = ([transformed_text] + history.metadata)[:WATCH_HISTORY_SIZE]
+    entries = ([entry] + history.get_list_values())[:WATCH_HISTORY_SIZE]
+    history.update(entries)
+    return clipboard_watcher
 
-def typed_clipboard_content(window, values):
+
+def clicked_watch_history_item(window, clipboard_watcher):
+    """
+    Lets the user copy a transformed text of the history of the clipboard watcher to the clipboard.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+        clipboard_watcher (:obj:`ClipboardWatcher`): The running clipboard watcher or None.
+    """
+    history = window['lbx_watch_history']
+    selected_indexes = history.get_indexes()
+    if not selected_indexes:
+        return
+    transformed_text = history.metadata[selected_indexes[0]]
+    if transformed_text is not None:
+        copy_to_clipboard(transformed_text, clipboard_watcher)
+
+
+def typed_clipboard_content(window, values, preview_worker, input_buffer):
     """
     Reacts on the user typing in the text input field of the "Text input" frame.
-    Currently, it only updates the label showing the count of lines of the input text.
+    It updates the label showing the count of lines of the input text and refreshes the preview.
+    As the preview worker transforms the text incrementally, only the edited lines are transformed again.
 
     Args:
         window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
         values (dict): The values dictionary returned by the windows.read() method.
+        preview_worker (:obj:`PreviewWorker`): The worker transforming the text in the background.
+        input_buffer (:obj:`TextBuffer`): The buffer holding a large input text.
     """
     text = values['fld_clipboard_content']
-    update_count_lines(window, text)
+    update_count_lines(window, get_count_text_lines(text))
+    refresh_preview(window, values, preview_worker, input_buffer)
 
 
 def show_dialog_add_preset():
@@ -359,6 +961,36 @@ def show_dialog_add_preset():
                                               key='fld_escape_char',
                                               disabled=True)
          ],
+        [sg.Text('Chunk size', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_chunk_size', size=(7, 1)),
+         sg.Text('Text items per surrounding text, empty for all')],
+        [sg.Text('Sort', size=(9, 1)),
+         sg.Combo(list(SORT_MODE_NAMES.values()), default_value=SORT_MODE_NAMES[None], key='cmb_sort_mode',
+                  readonly=True),
+         sg.Checkbox('Remove duplicates', default=False, key='chk_remove_duplicates')],
+        [sg.Text('Range text', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_range_text', size=(30, 1)),
+         sg.Text('e.g. OR id BETWEEN {0} AND {1}')],
+        [sg.Text('Escape', size=(9, 1)),
+         sg.Combo(list(ESCAPE_DIALECT_NAMES.values()), default_value=ESCAPE_DIALECT_NAMES[None],
+                  key='cmb_escape_dialect', readonly=True),
+         sg.Text('Escapes every text item for a string literal')],
+        [sg.Text('Trim', size=(9, 1)),
+         sg.Combo(list(TRIM_MODE_NAMES.values()), default_value=TRIM_MODE_NAMES[TRIM_MODE_BOTH],
+                  key='cmb_trim_mode', readonly=True),
+         sg.Checkbox('Collapse whitespace', default=False, key='chk_collapse_whitespace'),
+         sg.Checkbox('Drop blank lines', default=True, key='chk_drop_blank_lines')],
+        [sg.Text('Columns', size=(9, 1)),
+         sg.Combo(list(COLUMN_DELIMITER_NAMES.values()), default_value=COLUMN_DELIMITER_NAMES[None],
+                  key='cmb_column_delimiter', readonly=True),
+         sg.InputText(default_text='', key='fld_columns', size=(12, 1)),
+         sg.Text("e.g. '1', 3 - empty for all")],
+        [sg.Text('Item template', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_item_template', size=(30, 1)),
+         sg.Text('e.g. ({index}, {item})')],
+        [sg.Text('Output text', size=(9, 1)),
+         sg.InputText(default_text='', key='fld_output_template', size=(30, 1)),
+         sg.Text('Placed around all chunks, e.g. BEGIN; {0}')],
         [sg.Text('Surrounding text')],
         [sg.Multiline('', size=(55, 3), key='fld_surrounding_text')]
     ]
@@ -392,6 +1024,61 @@ def show_dialog_add_preset():
     return tsp
 
 
+def show_dialog_preview_presets(presets, selected_presets, text):
+    """
+    Displays a modal dialog which lets the user preview the text transformed using all selected presets.
+    The text is split into its text items only once for all presets, see transform_many(). The transformation
+    runs in the background, and only the first page of every transformed text is displayed.
+
+    Args:
+        presets (:obj:`list` of :obj:`TransformSettingsPreset`): The presets to choose from.
+        selected_presets (:obj:`list` of :obj:`TransformSettingsPreset`): The presets selected initially.
+        text (str): The text to be transformed.
+    """
+    layout = [
+        [sg.Text('Select the presets to be compared')],
+        [sg.Listbox(values=presets, default_values=selected_presets, size=(30, 6), key='lbx_compared_presets',
+                    select_mode=sg.LISTBOX_SELECT_MODE_MULTIPLE)],
+        [sg.Multiline('', size=(80, 20), key='fld_presets_preview', disabled=True, write_only=True)],
+        [sg.Button('Preview', key='btn_preview'),
+         sg.Button('Close', key='btn_close')]
+    ]
+    window = sg.Window("Compare presets", layout, finalize=True, modal=True)
+
+    while True:
+        event, values = window.read()
+        if event == 'btn_preview':
+            chosen_presets = values['lbx_compared_presets']
+            if not chosen_presets:
+                sg.popup_ok("Please select at least one preset.")
+                continue
+            transform_settings_list = [preset.transform_settings for preset in chosen_presets]
+            window.perform_long_operation(
+                lambda: (chosen_presets, transform_many(text, transform_settings_list, return_errors=True)),
+                EVENT_PRESETS_PREVIEW_DONE)
+            window['btn_preview'].update(disabled=True)
+            window['fld_presets_preview'].update("Transforming...")
+        elif event == EVENT_PRESETS_PREVIEW_DONE:
+            chosen_presets, transform_results = values[EVENT_PRESETS_PREVIEW_DONE]
+            sections = []
+            for preset, transform_result in zip(chosen_presets, transform_results):
+                if isinstance(transform_result, TextTransformerError):
+                    sections.append("--- {0}: Error ---\n{1}".format(preset.name, transform_result.message))
+                    continue
+                transformed_text = transform_result['transformed_text']
+                section = "--- {0}: {1} item(s) ---\n{2}".format(preset.name, transform_result['count_text_items'],
+                                                                transformed_text[:PAGE_SIZE])
+                if len(transformed_text) > PAGE_SIZE:
+                    section += "\n[... {0} more characters]".format(len(transformed_text) - PAGE_SIZE)
+                sections.append(section)
+            window['fld_presets_preview'].update("\n\n".join(sections))
+            window['btn_preview'].update(disabled=False)
+        else:
+            break
+
+    window.close()
+
+
 def save_preferences(window, prefs):
     """
     Saves the current user preferences to a JSON file.
@@ -400,6 +1087,10 @@ def save_preferences(window, prefs):
         window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
         prefs (:obj:`VicoPreferences`): The preferences object to be used.
     """
+    # The window may be closed before the preferences loaded in the background were displayed.
+    # Saving the empty listbox then would overwrite the presets of the user.
+    if not window['lbx_presets'].metadata:
+        return
     presets = window['lbx_presets'].get_list_values()
     selected_preset_idx = window['lbx_presets'].get_indexes()[0]
     prefs.presets = presets
@@ -437,11 +1128,38 @@ def update_displayed_preset(window, chosen_tsp):
     window['fld_quote_char'].update(chosen_tsp.transform_settings.quote_char)
     window['fld_escape_char'].update(chosen_tsp.transform_settings.escape_char)
     window['fld_surrounding_text'].update(chosen_tsp.transform_settings.surrounding_text or '')
+    window['fld_chunk_size'].update(chosen_tsp.transform_settings.chunk_size or '')
+    window['cmb_sort_mode'].update(SORT_MODE_NAMES[chosen_tsp.transform_settings.sort_mode])
+    window['chk_remove_duplicates'].update(chosen_tsp.transform_settings.remove_duplicates)
+    window['fld_range_text'].update(chosen_tsp.transform_settings.range_text or '')
+    window['cmb_escape_dialect'].update(ESCAPE_DIALECT_NAMES[chosen_tsp.transform_settings.escape_dialect])
+    window['cmb_trim_mode'].update(TRIM_MODE_NAMES[chosen_tsp.transform_settings.trim_mode])
+    window['chk_collapse_whitespace'].update(chosen_tsp.transform_settings.collapse_whitespace)
+    window['chk_drop_blank_lines'].update(chosen_tsp.transform_settings.drop_blank_lines)
+    window['cmb_column_delimiter'].update(COLUMN_DELIMITER_NAMES.get(chosen_tsp.transform_settings.column_delimiter,
+                                                                     COLUMN_DELIMITER_NAMES[None]))
+    window['fld_columns'].update(format_columns(chosen_tsp.transform_settings.columns))
+    window['fld_item_template'].update(chosen_tsp.transform_settings.item_template or '')
+    window['fld_output_template'].update(chosen_tsp.transform_settings.output_template or '')
 
     values = {'chk_quote_text': chosen_tsp.transform_settings.quote_text}
     clicked_quote_text_checkbox(values, window)
 
 
+def get_selected_transform_settings(window):
+    """
+    Returns the transform settings of the preset selected in the listbox.
+
+    Args:
+        window (:obj:`PySimpleGUI.Window`): The window where the action should be performed.
+
+    Returns:
+        The transform settings of the selected preset.
+    """
+    selected_idx = window['lbx_presets'].get_indexes()[0]
+    return window['lbx_presets'].get_list_values()[selected_idx].transform_settings
+
+
 def get_transform_settings(values):
     """
     Returns the currently displayed transform settings.
@@ -458,12 +1176,154 @@ def get_transform_settings(values):
     quote_char = values['fld_quote_char']
     escape_char = values['fld_escape_char']
     surrounding_text = values['fld_surrounding_text']
+    chunk_size = get_chunk_size(values['fld_chunk_size'])
+    remove_duplicates = values['chk_remove_duplicates']
+    sort_mode = get_sort_mode(values['cmb_sort_mode'])
+    range_text = values['fld_range_text'].strip()
+    escape_dialect = get_escape_dialect(values['cmb_escape_dialect'])
+    trim_mode = get_trim_mode(values['cmb_trim_mode'])
+    collapse_whitespace = values['chk_collapse_whitespace']
+    drop_blank_lines = values['chk_drop_blank_lines']
+    column_delimiter = get_column_delimiter(values['cmb_column_delimiter'])
+    columns = get_columns(values['fld_columns'])
+    item_template = values['fld_item_template']
+    output_template = values['fld_output_template']
     transform_settings = TransformSettings(prefix=prefix, suffix=suffix, delimiter=delimiter, line_up=line_up,
                                            quote_text=quote_text, quote_char=quote_char,
-                                           escape_char=escape_char, surrounding_text=surrounding_text)
+                                           escape_char=escape_char, surrounding_text=surrounding_text,
+                                           chunk_size=chunk_size, remove_duplicates=remove_duplicates,
+                                           sort_mode=sort_mode, range_text=range_text,
+                                           escape_dialect=escape_dialect, trim_mode=trim_mode,
+                                           collapse_whitespace=collapse_whitespace,
+                                           drop_blank_lines=drop_blank_lines, column_delimiter=column_delimiter,
+                                           columns=columns, item_template=item_template,
+                                           output_template=output_template)
     return transform_settings
 
 
+def get_chunk_size(text):
+    """
+    Returns the chunk size entered by the user.
+
+    Args:
+        text (str): The content of the chunk size field.
+
+    Returns:
+        The chunk size as a number or None if the field is empty or does not contain a positive number.
+    """
+    text = text.strip()
+    if not text.isdigit():
+        return None
+    return int(text) or None
+
+
+def get_sort_mode(name):
+    """
+    Returns the sort mode chosen by the user.
+
+    Args:
+        name (str): The name of the sort mode selected in the sort combo box.
+
+    Returns:
+        The sort mode or None if the text items keep their order.
+    """
+    for sort_mode, sort_mode_name in SORT_MODE_NAMES.items():
+        if sort_mode_name == name:
+            return sort_mode
+    return None
+
+
+def get_escape_dialect(name):
+    """
+    Returns the escape dialect chosen by the user.
+
+    Args:
+        name (str): The name of the escape dialect selected in the escape combo box.
+
+    Returns:
+        The escape dialect or None if the text items are not escaped.
+    """
+    for escape_dialect, escape_dialect_name in ESCAPE_DIALECT_NAMES.items():
+        if escape_dialect_name == name:
+            return escape_dialect
+    return None
+
+
+def get_trim_mode(name):
+    """
+    Returns the trim mode chosen by the user.
+
+    Args:
+        name (str): The name of the trim mode selected in the trim combo box.
+
+    Returns:
+        The trim mode, TRIM_MODE_BOTH if the name is unknown.
+    """
+    for trim_mode, trim_mode_name in TRIM_MODE_NAMES.items():
+        if trim_mode_name == name:
+            return trim_mode
+    return TRIM_MODE_BOTH
+
+
+def get_column_delimiter(name):
+    """
+    Returns the column delimiter chosen by the user.
+
+    Args:
+        name (str): The name of the column delimiter selected in the columns combo box.
+
+    Returns:
+        The column delimiter or None if every line is a single text item.
+    """
+    for column_delimiter, column_delimiter_name in COLUMN_DELIMITER_NAMES.items():
+        if column_delimiter_name == name:
+            return column_delimiter
+    return None
+
+
+def get_columns(text):
+    """
+    Returns the columns entered by the user. The columns are separated by commas and numbered from 1.
+    A number in single quotes selects the column as an SQL string literal, a number in double quotes as a
+    quoted CSV field, e.g. '1', 3 results in the text items 'a', 42 for the row a<TAB>b<TAB>42.
+
+    Args:
+        text (str): The content of the columns field.
+
+    Returns:
+        The list of ColumnSettings objects, empty for all columns. Parts not denoting a column are skipped.
+    """
+    columns = []
+    for part in text.split(','):
+        part = part.strip()
+        quote_char = ''
+        if len(part) > 2 and part[0] == part[-1] and part[0] in COLUMN_QUOTE_DIALECTS:
+            quote_char, part = part[0], part[1:-1].strip()
+        if not part.isdigit() or int(part) < 1:
+            continue
+        columns.append(ColumnSettings(int(part) - 1, prefix=quote_char, suffix=quote_char,
+                                      escape_dialect=COLUMN_QUOTE_DIALECTS.get(quote_char)))
+    return columns
+
+
+def format_columns(columns):
+    """
+    Returns the text of the columns field displaying a list of columns. See also get_columns().
+
+    Args:
+        columns (:obj:`list` of :obj:`ColumnSettings`): The columns to be displayed.
+
+    Returns:
+        The columns as str.
+    """
+    parts = []
+    for column in columns:
+        quote_char = column.prefix if column.prefix == column.suffix and \
+            COLUMN_QUOTE_DIALECTS.get(column.prefix) == column.escape_dialect else ''
+        parts.append('{0}{1}{0}'.format(quote_char, column.index + 1))
+    return ', '.join(parts)
+
+
 def get_count_text_lines(text):
     """
     Returns the count of lines in a given text.
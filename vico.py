@@ -1,42 +1,241 @@
-import PySimpleGUI as sg
+import sys
+import argparse
 from preferences import VicoPreferences
-import ui
 
 WINDOW_TITLE = 'vico'
-DEBUG_MODE = True
 
 
-def main():
+def main(argv=None):
+    """
+    Runs vico. Without a command the GUI is shown, otherwise the given command is executed headless.
+    The GUI modules (PySimpleGUI, pyperclip) are only imported when the window is actually opened.
+
+    Args:
+        argv (:obj:`list` of :obj:`str`): The command line arguments. Default is sys.argv[1:].
+
+    Returns:
+        The exit status.
+    """
+    parser = create_argument_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        run_gui()
+        return 0
+
     prefs = VicoPreferences()
-    window = ui.prepare_main_window(WINDOW_TITLE, prefs)
+
+    if args.command == 'presets':
+        import headless
+        headless.list_presets(prefs)
+        return 0
+
+    if args.preset is None:
+        preset = prefs.selected_preset
+    else:
+        preset = prefs.find_preset(args.preset)
+        if preset is None:
+            parser.error("unknown preset: {0}".format(args.preset))
+
+    if args.command == 'transform':
+        return run_headless_transform(args, preset.transform_settings)
+
+    if args.command == 'watch':
+        import headless
+        return headless.run_watch(preset.transform_settings, write_back=not args.print_result,
+                                  min_interval=args.min_interval, max_size=args.max_size)
+
+    return 0
+
+
+def create_argument_parser():
+    """
+    Returns the parser for the command line arguments of vico.
+    """
+    parser = argparse.ArgumentParser(prog='vico',
+                                     description='Transforms a list of text items. '
+                                                 'Without a command the GUI is shown.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    transform_parser = subparsers.add_parser('transform',
+                                             help='transform text using a preset without showing the GUI')
+    transform_parser.add_argument('--preset',
+                                  help='name of the preset to be used (default: the selected preset)')
+    transform_parser.add_argument('-i', '--input',
+                                  help='file to read the text from (default: stdin)')
+    transform_parser.add_argument('-o', '--output',
+                                  help='file to write the transformed text to, compressed by gzip if its name '
+                                       'ends with .gz (default: stdout)')
+    transform_parser.add_argument('--clipboard', action='store_true',
+                                  help='write the transformed text to the clipboard using xclip or xsel '
+                                       'instead of stdout')
+    transform_parser.add_argument('--encoding', default='utf-8',
+                                  help='encoding of the input and output files (default: utf-8)')
+    transform_parser.add_argument('--workers', type=int, default=None,
+                                  help='count of processes to transform large input files in parallel '
+                                       '(only used together with --input and --output)')
+    transform_parser.add_argument('--sort-memory', type=int, default=None, metavar='MB',
+                                  help='megabytes of text items sorted in memory before they are sorted '
+                                       'using temporary files (default: 256)')
+    transform_parser.add_argument('--profile', action='store_true',
+                                  help='write the time spent in every stage of the transformation to stderr')
+
+    watch_parser = subparsers.add_parser('watch',
+                                         help='transform every new clipboard content using a preset '
+                                              'until Ctrl+C is pressed')
+    watch_parser.add_argument('--preset',
+                              help='name of the preset to be used (default: the selected preset)')
+    watch_parser.add_argument('--print', action='store_true', dest='print_result',
+                              help='write the transformed text to stdout instead of the clipboard')
+    watch_parser.add_argument('--min-interval', type=float, default=None,
+                              help='minimum interval in seconds between two transformations (default: 1.0)')
+    watch_parser.add_argument('--max-size', type=int, default=None,
+                              help='clipboard contents longer than this count of characters are not '
+                                   'transformed (default: 16777216)')
+
+    subparsers.add_parser('presets', help='list the names of the presets')
+
+    return parser
+
+
+def run_headless_transform(args, transform_settings):
+    """
+    Transforms the text from the input file or stdin and writes the result to the output file, the clipboard
+    or stdout. Except for a plain output file transformed from an input file, the result is written to an
+    output sink, which is aborted if the transformation fails.
+
+    Args:
+        args (:obj:`argparse.Namespace`): The parsed command line arguments.
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+
+    Returns:
+        The exit status.
+    """
+    import headless
+    import sinks
+
+    sort_memory_budget = args.sort_memory * 1024 * 1024 if args.sort_memory else None
+    if args.input and args.output and not args.clipboard and \
+            not args.output.lower().endswith(sinks.GZIP_EXTENSION):
+        return headless.run_transform_file(transform_settings, args.input, args.output, args.encoding,
+                                           workers=args.workers, sort_memory_budget=sort_memory_budget,
+                                           profile=args.profile)
+
+    # The input is opened first, so a missing input file does not leave an empty output file behind
+    if args.input:
+        try:
+            reader = open(args.input, 'r', encoding=args.encoding)
+        except OSError as e:
+            sys.stderr.write("vico: {0}\n".format(e))
+            return 1
+    else:
+        reader = sys.stdin
+
+    # The transformed text already contains the platform specific line separators,
+    # so the sinks do not translate them once again when writing the output.
+    try:
+        if args.clipboard:
+            writer = sinks.ClipboardSink()
+        elif args.output:
+            writer = sinks.FileSink(args.output, encoding=args.encoding)
+        else:
+            writer = sinks.StdoutSink()
+    except (sinks.OutputSinkError, OSError) as e:
+        if args.input:
+            reader.close()
+        sys.stderr.write("vico: {0}\n".format(_describe_error(e)))
+        return 1
+
+    # Every failure aborts the sink, so neither a truncated file nor a truncated clipboard content is left
+    status = 1
+    try:
+        status = headless.run_transform(transform_settings, reader, writer, sort_memory_budget=sort_memory_budget,
+                                        profile=args.profile)
+        if status == 0:
+            writer.close()
+    except (sinks.OutputSinkError, OSError, UnicodeError) as e:
+        sys.stderr.write("vico: {0}\n".format(_describe_error(e)))
+        status = 1
+    finally:
+        if args.input:
+            reader.close()
+        if status:
+            writer.abort()
+    return status
+
+
+def _describe_error(error):
+    """
+    Returns the message of an error of the headless transformation.
+    """
+    import sinks
+
+    if isinstance(error, sinks.OutputSinkError):
+        return error.message
+    return str(error)
+
+
+def run_gui():
+    import PySimpleGUI as sg
+    import ui
+    import tracing
+
+    # The tracing is off unless it is switched on by the environment variable VICO_TRACE
+    tracing.configure_tracing()
+
+    # The preferences are loaded in the background after the window is shown
+    prefs = VicoPreferences(autoload=False)
+    input_buffer = ui.create_input_buffer()
+    window = ui.prepare_main_window(WINDOW_TITLE, prefs, input_buffer)
+    result_cache = ui.create_result_cache()
+    preview_worker = ui.create_preview_worker(window, result_cache)
+    preview_buffer = ui.create_preview_buffer()
+    clipboard_watcher = None
 
     # Event Loop to process "events" and get the "values" of the inputs
     while True:
         event, values = window.read()
-        if DEBUG_MODE:
-            print(event, values)
+        dispatch_start = tracing.trace_event(event, values)
 
         # If the main window closes we need to save the preferences
         if event in (sg.WIN_CLOSED, sg.WINDOW_CLOSE_ATTEMPTED_EVENT):
+            preview_worker.stop()
+            if clipboard_watcher:
+                clipboard_watcher.stop()
             ui.save_preferences(window, prefs)
+            tracing.logger.info("result cache %s", result_cache.stats())
+            tracing.trace_handled(event, dispatch_start)
             break
 
+        # The preferences were loaded in the background after startup
+        if event == ui.EVENT_PREFERENCES_LOADED:
+            ui.loaded_preferences(window, prefs, values[ui.EVENT_PREFERENCES_LOADED])
+
+        # The content of the clipboard was read in the background after startup
+        if event == ui.EVENT_CLIPBOARD_LOADED:
+            ui.loaded_clipboard_content(window, values, input_buffer)
+
         # User clicked the "Copy from clipboard" button
         if event == 'btn_copy_from_clipboard':
-            ui.clicked_copy_from_clipboard(window)
+            ui.clicked_copy_from_clipboard(window, input_buffer)
 
         # User clicked the "Clear" button below the text input
         if event == 'btn_clear_text_input':
-            ui.clicked_clear_text_input(window)
+            ui.clicked_clear_text_input(window, input_buffer)
 
         # User clicked the "Quote text" checkbox
         if event == 'chk_quote_text':
             ui.clicked_quote_text_checkbox(values, window)
+            ui.refresh_preview(window, values, preview_worker, input_buffer)
+
+        # User changed one of the displayed transform settings
+        if event in ui.TRANSFORM_SETTINGS_KEYS:
+            ui.refresh_preview(window, values, preview_worker, input_buffer)
 
         # User clicked on an item in the listbox displaying the presets,
         # so we need to update the display transform settings accordingly
         if event == 'lbx_presets':
-            ui.clicked_preset_item(window, values)
+            ui.clicked_preset_item(window, values, preview_worker, input_buffer)
 
         # User clicked the "Add" button to add a new preset
         if event == 'btn_add_preset':
@@ -51,6 +250,10 @@ def main():
         if event == 'btn_del_preset':
             ui.clicked_delete_preset(window)
 
+        # User clicked the "Compare..." button to preview the text transformed using several presets
+        if event == 'btn_preview_presets':
+            ui.clicked_preview_presets(window, values, input_buffer)
+
         # User clicked the "Move up" button to move the selected preset up
         if event == 'btn_move_preset_up':
             ui.move_selected_preset(window, ui.MOVE_DIRECTION_UP)
@@ -61,18 +264,60 @@ def main():
 
         # User clicked the "Preview" button to preview the text transformation
         if event == 'btn_preview':
-            ui.clicked_show_preview(window, values)
+            ui.clicked_show_preview(window, values, preview_worker, input_buffer)
+
+        # The text transformation for the preview finished in the background
+        if event == ui.EVENT_PREVIEW_DONE:
+            ui.finished_preview(window, values, preview_worker, preview_buffer)
+
+        # User clicked the "Profile" checkbox below the preview
+        if event == 'chk_profile_preview':
+            ui.clicked_profile_checkbox(window, values, preview_worker, input_buffer)
+
+        # User clicked the "Load more" button below the preview
+        if event == 'btn_preview_load_more':
+            ui.clicked_load_more_preview(window, preview_buffer)
 
         # User clicked on the "Copy to clipboard" button
         if event == 'btn_copy_to_clipboard':
-            ui.clicked_copy_to_clipboard(values)
+            ui.clicked_copy_to_clipboard(preview_buffer, clipboard_watcher)
+
+        # User clicked on the "Save to file…" button below the preview
+        if event == 'btn_save_to_file':
+            ui.clicked_save_to_file(window, values, input_buffer)
+
+        # The transformed text was saved to a file in the background
+        if event == ui.EVENT_SAVE_DONE:
+            ui.finished_save(window, values)
+
+        # User clicked the "Watch clipboard" checkbox to start or stop watching the clipboard
+        if event == 'chk_watch_clipboard':
+            clipboard_watcher = ui.clicked_watch_clipboard(window, values, clipboard_watcher, result_cache)
+
+        # User clicked the "Write result to clipboard" checkbox of the clipboard watcher
+        if event == 'chk_watch_write_back':
+            ui.clicked_watch_write_back(values, clipboard_watcher)
+
+        # The selected preset may have changed, so the clipboard watcher has to use its transform settings
+        if event == 'lbx_presets' or event in ui.PRESET_BUTTON_KEYS:
+            ui.update_clipboard_watcher(window, clipboard_watcher)
+
+        # The clipboard watcher transformed a new clipboard content in the background
+        if event == ui.EVENT_WATCH_DONE:
+            clipboard_watcher = ui.finished_watch(window, values, clipboard_watcher)
+
+        # User clicked on an entry in the history of the clipboard watcher to copy its transformed text
+        if event == 'lbx_watch_history':
+            ui.clicked_watch_history_item(window, clipboard_watcher)
 
         # User typed in the clipboard content text input field
         if event == 'fld_clipboard_content':
-            ui.typed_clipboard_content(window, values)
+            ui.typed_clipboard_content(window, values, preview_worker, input_buffer)
+
+        tracing.trace_handled(event, dispatch_start)
 
     window.close()
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
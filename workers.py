@@ -0,0 +1,361 @@
+import time
+import threading
+import pyperclip
+from teksto import TextTransformerError, TransformCancelledError, TransformProfile, IncrementalTransform, \
+    get_text_transformer
+
+# Delay in seconds a preview request waits for a newer request before it is transformed
+PREVIEW_DEBOUNCE_DELAY = 0.3
+# Interval in seconds in which the clipboard watcher polls the clipboard
+WATCH_POLL_INTERVAL = 0.5
+# Minimum interval in seconds between two text transformations of the clipboard watcher
+WATCH_MIN_INTERVAL = 1.0
+# Clipboard contents longer than this count of characters are not transformed by the clipboard watcher
+WATCH_MAX_SIZE = 16 * 1024 * 1024
+
+
+class PreviewWorker(object):
+    """
+    Transforms texts for the preview on a background thread, so the event loop of the GUI is never blocked.
+
+    Requests are debounced: a request is only transformed if no newer request arrives within its delay.
+    A newer request also cancels the transformation of an older request at the next chunk boundary.
+    The texts are transformed incrementally, so after an edit of the text only the changed chunks
+    are transformed again.
+    The result of every finished transformation is handed to the callback together with the generation
+    of its request, so results of outdated requests can be told apart.
+
+    Attributes:
+        latest_generation (int): The generation of the latest request.
+        profile_enabled (bool): Indicates if the transformations are profiled. A profiled text is transformed
+            from scratch and the TransformProfile object is added to its result (key: 'profile').
+    """
+    def __init__(self, callback, debounce_delay=PREVIEW_DEBOUNCE_DELAY, result_cache=None):
+        """
+        Initializes a new instance of a PreviewWorker object and starts its background thread.
+
+        Args:
+            callback: A callable which is called on the background thread with the generation of the request,
+                the result of transform() or the raised TextTransformerError and the flag explicit
+                of the request.
+            debounce_delay (float): Delay in seconds a request waits for a newer request.
+                Default is PREVIEW_DEBOUNCE_DELAY.
+            result_cache (:obj:`TransformResultCache`): The cache used for explicit requests and requests
+                with changed transform settings. Default is None.
+        """
+        self._callback = callback
+        self._debounce_delay = debounce_delay
+        self._result_cache = result_cache
+        self._condition = threading.Condition()
+        self._pending_request = None
+        self._latest_generation = 0
+        self._cancel_event = threading.Event()
+        self._stopped = False
+        self.profile_enabled = False
+        # Only accessed by the background thread
+        self._incremental_transform = None
+
+        thread = threading.Thread(target=self._run, name='PreviewWorker', daemon=True)
+        thread.start()
+
+    @property
+    def latest_generation(self):
+        return self._latest_generation
+
+    def request(self, text, transform_settings, explicit=False):
+        """
+        Requests the transformation of a text. Any pending request is replaced and a running
+        transformation is cancelled.
+
+        Args:
+            text (str): The text to be transformed.
+            transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+            explicit (bool): Was the preview explicitly requested by the user? Explicit requests are
+                transformed immediately, other requests are debounced. Default is False.
+
+        Returns:
+            The generation of the request.
+        """
+        delay = 0 if explicit else self._debounce_delay
+        with self._condition:
+            self._latest_generation += 1
+            self._pending_request = (self._latest_generation, text, transform_settings, explicit,
+                                     time.monotonic() + delay)
+            self._cancel_event.set()
+            self._condition.notify()
+            return self._latest_generation
+
+    def stop(self):
+        """
+        Stops the background thread and cancels a running transformation.
+        """
+        with self._condition:
+            self._stopped = True
+            self._pending_request = None
+            self._cancel_event.set()
+            self._condition.notify()
+
+    def _run(self):
+        """
+        Waits for requests and transforms them until the worker is stopped.
+        """
+        while True:
+            with self._condition:
+                while not self._stopped and self._pending_request is None:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+
+                generation, text, transform_settings, explicit, due_time = self._pending_request
+                remaining_delay = due_time - time.monotonic()
+                if remaining_delay > 0:
+                    # Waiting for a newer request that replaces the pending one
+                    self._condition.wait(remaining_delay)
+                    continue
+
+                self._pending_request = None
+                cancel_event = threading.Event()
+                self._cancel_event = cancel_event
+
+            try:
+                result = self._transform(text, transform_settings, explicit, cancel_event)
+            except TransformCancelledError:
+                continue
+            except TextTransformerError as e:
+                result = e
+
+            if not cancel_event.is_set():
+                self._callback(generation, result, explicit)
+
+    def _transform(self, text, transform_settings, explicit, cancel_event):
+        """
+        Transforms the text of a request incrementally based on the previously transformed text.
+        If the transform settings changed, the text is transformed from scratch.
+        Explicit requests and requests with changed transform settings are looked up in the result cache first,
+        as they often repeat an earlier transformation. Requests caused by typing are not, the incremental
+        transformation is cheaper than computing the digest of the text for every keystroke.
+
+        Args:
+            text (str): The text to be transformed.
+            transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+            explicit (bool): Was the preview explicitly requested by the user?
+            cancel_event (:obj:`threading.Event`): The event signalling the transformation is to be cancelled.
+
+        Returns:
+            The result of the text transformation.
+        """
+        if self.profile_enabled:
+            # Profiling an incremental or cached transformation would only measure a part of the work
+            profile = TransformProfile()
+            result = get_text_transformer(transform_settings).transform(text, cancel_event=cancel_event,
+                                                                        profile=profile)
+            result['profile'] = profile
+            return result
+
+        settings_changed = self._incremental_transform is None or \
+            self._incremental_transform.transform_settings != transform_settings
+        use_result_cache = self._result_cache is not None and (explicit or settings_changed)
+        if use_result_cache:
+            result = self._result_cache.get(text, transform_settings)
+            if result is not None:
+                return result
+
+        if settings_changed:
+            self._incremental_transform = IncrementalTransform(transform_settings)
+        result = self._incremental_transform.update(text, cancel_event=cancel_event)
+        if use_result_cache:
+            self._result_cache.put(text, transform_settings, result)
+        return result
+
+
+class ClipboardWatcher(object):
+    """
+    Polls the clipboard on a background thread and transforms every new clipboard content.
+
+    Changes are detected by the length and the hash of the clipboard content, so the previous content
+    never has to be kept and compared as a whole. Transformations are rate limited: if the clipboard
+    changes faster than min_interval, only its latest content is transformed once the interval elapsed.
+    Contents longer than max_size are not transformed at all.
+    The result can be written back to the clipboard. Clipboard contents written by the watcher itself,
+    or announced by ignore(), are not transformed again.
+
+    If the clipboard can not be accessed any more, the watcher stops itself and hands the
+    pyperclip.PyperclipException to the callback in place of a result.
+
+    Attributes:
+        transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+        write_back (bool): Indicates if the transformed text is written back to the clipboard.
+        stopped (bool): Indicates if the watcher has been stopped.
+        error (:obj:`pyperclip.PyperclipException`): The error that stopped the watcher or None.
+    """
+    def __init__(self, transform_settings, callback=None, write_back=False, poll_interval=WATCH_POLL_INTERVAL,
+                 min_interval=WATCH_MIN_INTERVAL, max_size=WATCH_MAX_SIZE, result_cache=None):
+        """
+        Initializes a new instance of a ClipboardWatcher object and starts its background thread.
+        The current content of the clipboard is not transformed, only later changes are.
+
+        Args:
+            transform_settings (:obj:`TransformSettings`): The transform settings to be used.
+            callback: A callable which is called on the background thread with the clipboard content and
+                the result of transform(), a TextTransformerError or the pyperclip.PyperclipException
+                that stopped the watcher. Default is None.
+            write_back (bool): Indicates if the transformed text is written back to the clipboard.
+                Default is False.
+            poll_interval (float): Interval in seconds in which the clipboard is polled.
+                Default is WATCH_POLL_INTERVAL.
+            min_interval (float): Minimum interval in seconds between two transformations.
+                Default is WATCH_MIN_INTERVAL.
+            max_size (int): Clipboard contents longer than this count of characters are not transformed.
+                Default is WATCH_MAX_SIZE.
+            result_cache (:obj:`TransformResultCache`): The cache used for the transformations. Default is None.
+
+        Raises:
+            pyperclip.PyperclipException: If the clipboard can not be accessed.
+        """
+        self._transform_settings = transform_settings
+        self._callback = callback
+        self._write_back = write_back
+        self._poll_interval = poll_interval
+        self._min_interval = min_interval
+        self._max_size = max_size
+        self._result_cache = result_cache
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._error = None
+        self._last_fingerprint = ClipboardWatcher._fingerprint(pyperclip.paste())
+
+        thread = threading.Thread(target=self._run, name='ClipboardWatcher', daemon=True)
+        thread.start()
+
+    @property
+    def transform_settings(self):
+        return self._transform_settings
+
+    @transform_settings.setter
+    def transform_settings(self, transform_settings):
+        self._transform_settings = transform_settings
+
+    @property
+    def write_back(self):
+        return self._write_back
+
+    @write_back.setter
+    def write_back(self, write_back):
+        self._write_back = write_back
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    @property
+    def error(self):
+        return self._error
+
+    def ignore(self, text):
+        """
+        Announces a text that is about to be copied to the clipboard and must not be transformed,
+        e.g. a result copied by the user. Must be called before the text is copied.
+
+        Args:
+            text (str): The text to be ignored.
+        """
+        with self._lock:
+            self._last_fingerprint = ClipboardWatcher._fingerprint(text)
+
+    def stop(self):
+        """
+        Stops the background thread and cancels a running transformation.
+        """
+        self._stop_event.set()
+
+    def _run(self):
+        """
+        Polls the clipboard and transforms its new contents until the watcher is stopped
+        or the clipboard can not be accessed any more.
+        """
+        next_transform_time = 0
+        while not self._stop_event.wait(self._poll_interval):
+            try:
+                text = pyperclip.paste()
+            except pyperclip.PyperclipException as e:
+                self._stop_with_error(None, e)
+                return
+
+            fingerprint = ClipboardWatcher._fingerprint(text)
+            with self._lock:
+                if fingerprint == self._last_fingerprint:
+                    continue
+
+            remaining_delay = next_transform_time - time.monotonic()
+            if remaining_delay > 0:
+                # Polling once again after the delay, so only the latest content is transformed
+                if self._stop_event.wait(remaining_delay):
+                    return
+                continue
+
+            with self._lock:
+                self._last_fingerprint = fingerprint
+            next_transform_time = time.monotonic() + self._min_interval
+
+            try:
+                result = self._transform(text)
+            except TransformCancelledError:
+                return
+            except TextTransformerError as e:
+                result = e
+
+            if self._stop_event.is_set():
+                return
+            if self._write_back and not isinstance(result, TextTransformerError):
+                self.ignore(result['transformed_text'])
+                try:
+                    pyperclip.copy(result['transformed_text'])
+                except pyperclip.PyperclipException as e:
+                    self._stop_with_error(text, e)
+                    return
+            if self._callback:
+                self._callback(text, result)
+
+    def _stop_with_error(self, text, error):
+        """
+        Stops the watcher because the clipboard can not be accessed and reports the error to the callback.
+
+        Args:
+            text (str): The clipboard content being processed or None.
+            error (:obj:`pyperclip.PyperclipException`): The error raised by pyperclip.
+        """
+        self._error = error
+        self._stop_event.set()
+        if self._callback:
+            self._callback(text, error)
+
+    def _transform(self, text):
+        """
+        Transforms a clipboard content unless it is too large.
+
+        Args:
+            text (str): The clipboard content to be transformed.
+
+        Returns:
+            The result of the text transformation.
+
+        Raises:
+            TextTransformerError: If the text is too large or its transformation failed.
+            TransformCancelledError: If the watcher was stopped during the transformation.
+        """
+        if len(text) > self._max_size:
+            raise TextTransformerError("The clipboard content of {0} characters exceeds the limit of {1} "
+                                       "characters and is not transformed.".format(len(text), self._max_size))
+
+        if self._result_cache is not None:
+            return self._result_cache.transform(text, self._transform_settings, cancel_event=self._stop_event)
+        text_transformer = get_text_transformer(self._transform_settings)
+        return text_transformer.transform(text, cancel_event=self._stop_event)
+
+    @staticmethod
+    def _fingerprint(text):
+        """
+        Returns a cheap fingerprint of a text to detect changes of the clipboard.
+        """
+        text = text or ''
+        return len(text), hash(text)